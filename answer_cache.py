@@ -0,0 +1,136 @@
+"""
+Answer Cache
+Bounded LRU cache of final answers keyed by session, normalized question and
+the settings that produced the answer, so a repeated question against the
+same document skips retrieval, extraction and generation. A session's answers
+are dropped whenever its index is rebuilt or cleaned up.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from embedding_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache of answers, invalidated per session.
+
+    Answers computed while any session was invalidated are not cached: a
+    single epoch counter covers every session, so its size stays fixed.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize answer cache.
+
+        Args:
+            max_entries: Maximum number of cached answers across all sessions
+        """
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # (session_id, normalized question, settings) -> answer
+        self._epoch = 0  # number of invalidations so far, across all sessions
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self) -> int:
+        """
+        Get the invalidation counter.
+
+        Read it before answering and pass it to put(), so an answer computed
+        from an index that was replaced meanwhile is not cached.
+
+        Returns:
+            Current generation of the cache
+        """
+        with self._lock:
+            return self._epoch
+
+    def get(self, session_id: str, question: str, settings: Hashable) -> Optional[str]:
+        """
+        Look up an answer.
+
+        Args:
+            session_id: Session identifier
+            question: Question text
+            settings: Answering settings the answer must have been produced with
+
+        Returns:
+            Cached answer or None
+        """
+        key = (session_id, normalize_query(question), settings)
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, session_id: str, question: str, settings: Hashable, answer: str, generation: int):
+        """
+        Store an answer.
+
+        Args:
+            session_id: Session identifier
+            question: Question text
+            settings: Answering settings the answer was produced with
+            answer: Answer text
+            generation: Value of generation() read before answering
+        """
+        key = (session_id, normalize_query(question), settings)
+        with self._lock:
+            if self._epoch != generation:
+                # A session was re-indexed or cleaned up while answering
+                return
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str):
+        """
+        Drop every cached answer of a session.
+
+        Args:
+            session_id: Session identifier
+        """
+        with self._lock:
+            self._epoch += 1
+            keys = [key for key in self._entries if key[0] == session_id]
+            for key in keys:
+                del self._entries[key]
+
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached answers for session {session_id}")
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and max_entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
@@ -1,8 +1,12 @@
-from flask import Flask, render_template, request, jsonify, session, send_file
+from flask import Flask, Response, render_template, request, jsonify, session, send_file, stream_with_context
 from werkzeug.utils import secure_filename
 import os
+import re
 import pickle
+import shutil
 import uuid
+import threading
+import json
 import logging
 from pathlib import Path
 import torch
@@ -10,6 +14,7 @@ import numpy as np
 import time
 from datetime import datetime
 from pdf_processor import PDFProcessor
+from page_ranges import parse_page_ranges, select_pages
 from qa_engine import QAEngine
 from config import QA_CONFIG, PDF_CONFIG, FLASK_CONFIG
 
@@ -41,13 +46,33 @@ qa_engine = QAEngine(
     embedder_model=EMBEDDING_CONFIG['model_name'],
     gpt2_model=GENERATOR_CONFIG.get('model_name', 'none'),
     use_advanced_qa=QA_CONFIG['use_advanced_qa'],
-    advanced_qa_model=QA_CONFIG['advanced_qa_model']
+    advanced_qa_model=QA_CONFIG['advanced_qa_model'],
+    cache_max_bytes=QA_CONFIG.get('session_cache_mb', 512) * 1024 * 1024,
+    cache_ttl=QA_CONFIG.get('session_cache_ttl', 1800),
+    retrieval_mode=QA_CONFIG.get('retrieval_mode', 'hybrid'),
+    fusion=QA_CONFIG.get('fusion', 'rrf'),
+    bm25_weight=QA_CONFIG.get('bm25_weight', 0.5),
+    index_type=QA_CONFIG.get('index_type', 'auto'),
+    index_latency_target_ms=QA_CONFIG.get('index_latency_target_ms', 20),
+    index_memory_budget_mb=QA_CONFIG.get('index_memory_budget_mb', 1024),
+    query_cache_size=QA_CONFIG.get('query_cache_size', 1024),
+    answer_cache_size=QA_CONFIG.get('answer_cache_size', 256),
+    lazy_load=QA_CONFIG.get('lazy_model_loading', True),
+    quantization=QA_CONFIG.get('quantization', 'none'),
+    quantized_models=QA_CONFIG.get('quantized_models'),
+    embedder_backend=QA_CONFIG.get('embedder_backend', 'pytorch'),
+    advanced_qa_scope=QA_CONFIG.get('advanced_qa_scope', 'document'),
+    advanced_qa_top_k=QA_CONFIG.get('advanced_qa_top_k', 5)
 )
 
+if QA_CONFIG.get('warmup_models'):
+    # Warm up without holding back startup; requests meanwhile wait on the model locks
+    threading.Thread(target=qa_engine.warmup, args=(QA_CONFIG['warmup_models'],), daemon=True).start()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
-def log_performance(session_id, question, answer, response_time, model_info):
+def log_performance(session_id, question, answer, response_time, model_info, cache_hit=False):
     """Log performance metrics to a single TXT file."""
     # Use a single performance log file for all sessions
     log_file = Path('logs') / 'performance.txt'
@@ -60,6 +85,7 @@ Session ID: {session_id}
 Timestamp: {timestamp}
 Question: {question}
 Response Time: {response_time:.3f} seconds
+Answer Cache: {'hit' if cache_hit else 'miss'}
 Models Used:
   - Embedding: {model_info['embedding']}
   - QA Model: {model_info['qa_model']}
@@ -75,6 +101,58 @@ Answer:
 
     return str(log_file)
 
+def cleanup_session_images(session_id):
+    """
+    Remove a session's extracted images and image metadata.
+
+    The image inventory holds the path of the uploaded PDF, so it must go
+    along with the PDF.
+    """
+    for name in (f"{session_id}_images.pkl", f"{session_id}_image_inventory.pkl"):
+        path = Path('data') / name
+        if path.exists():
+            path.unlink()
+
+    shutil.rmtree(os.path.join('images', session_id), ignore_errors=True)
+
+def materialize_session_images(session_id, pages=None):
+    """
+    Decode and save a session's lazily inventoried images.
+
+    Extracted files are cached on disk; when all pages are materialized the
+    metadata is saved so later requests skip the PDF entirely.
+
+    Returns:
+        List of image metadata, or None if the session has no image inventory
+    """
+    inventory_path = Path('data') / f"{session_id}_image_inventory.pkl"
+
+    if not inventory_path.exists():
+        return None
+
+    with open(inventory_path, 'rb') as f:
+        lazy_images = pickle.load(f)
+
+    pdf_processor = PDFProcessor(
+        extract_images=True,
+        backend=PDF_CONFIG.get('backend', 'pymupdf'),
+        dedupe_images=PDF_CONFIG.get('dedupe_images', True),
+        min_image_area=PDF_CONFIG.get('min_image_area', 1024)
+    )
+    images_info = pdf_processor.materialize_images(
+        lazy_images['pdf_path'],
+        os.path.join('images', session_id),
+        lazy_images['inventory'],
+        pages=pages
+    )
+
+    if pages is None:
+        images_metadata_path = Path('data') / f"{session_id}_images.pkl"
+        with open(images_metadata_path, 'wb') as f:
+            pickle.dump(images_info, f)
+
+    return images_info
+
 @app.route('/')
 def index():
     return render_template('upload.html')
@@ -121,51 +199,101 @@ def upload_pdf():
         # Check if user wants to extract images (default: False)
         extract_images = request.form.get('extract_images', 'false').lower() == 'true'
 
-        pdf_processor = PDFProcessor(
-            chunk_size=PDF_CONFIG.get('chunk_size', 400),
-            chunk_overlap=PDF_CONFIG.get('chunk_overlap', 50),
-            extract_images=extract_images
-        )
-        text = pdf_processor.extract_text(filepath)
-
-        if not text or len(text.strip()) < 10:
+        # Optional page selection, e.g. "1-20, 35"; only these pages are extracted and embedded
+        pages = request.form.get('pages', '').strip() or None
+        try:
+            parse_page_ranges(pages)
+        except ValueError as e:
             os.remove(filepath)
-            return jsonify({'error': 'Could not extract text from PDF. The file may be empty or corrupted.'}), 400
-
-        # Split into chunks
-        chunks = pdf_processor.split_into_chunks(text)
-
-        if not chunks:
-            os.remove(filepath)
-            return jsonify({'error': 'Could not create text chunks from PDF.'}), 400
+            return jsonify({'error': str(e)}), 400
+
+        # Token mode sizes chunks with the embedder's tokenizer so no text is cut off at embedding time
+        if PDF_CONFIG.get('chunk_unit', 'tokens') == 'tokens':
+            tokenizer, max_tokens = qa_engine.get_embedder_tokenizer()
+            chunking = {
+                'chunk_size': PDF_CONFIG.get('chunk_size_tokens', 256),
+                'chunk_overlap': PDF_CONFIG.get('chunk_overlap_tokens', 32),
+                'chunk_unit': 'tokens',
+                'tokenizer': tokenizer,
+                'max_tokens': max_tokens
+            }
+        else:
+            chunking = {
+                'chunk_size': PDF_CONFIG.get('chunk_size', 400),
+                'chunk_overlap': PDF_CONFIG.get('chunk_overlap', 50)
+            }
 
-        logger.info(f"Created {len(chunks)} chunks from PDF")
+        pdf_processor = PDFProcessor(
+            **chunking,
+            extract_images=extract_images,
+            workers=PDF_CONFIG.get('extraction_workers', 0),
+            parallel_min_pages=PDF_CONFIG.get('parallel_min_pages', 50),
+            lazy_images=PDF_CONFIG.get('lazy_images', True),
+            backend=PDF_CONFIG.get('backend', 'pymupdf'),
+            dedupe_images=PDF_CONFIG.get('dedupe_images', True),
+            min_image_area=PDF_CONFIG.get('min_image_area', 1024),
+            strip_repeated_lines=PDF_CONFIG.get('strip_repeated_lines', False),
+            repeated_line_ratio=PDF_CONFIG.get('repeated_line_ratio', 0.5)
+        )
 
-        # Extract images from PDF
+        # A selection entirely past the last page would otherwise look like an empty PDF
+        if pages is not None:
+            total_pages = pdf_processor.page_count(filepath)
+            if total_pages is not None and not select_pages(pages, total_pages):
+                os.remove(filepath)
+                return jsonify({
+                    'error': f"Page selection '{pages}' is outside the document; "
+                             f"valid pages are 1-{total_pages}"
+                }), 400
+
+        # Stream pages -> chunks -> embeddings so the full text is never held at once;
+        # chunk records carry page/offset provenance for citations. Embedded images
+        # are written to disk during the same pass over the pages.
         images_dir = os.path.join('images', session_id)
-        images_info = pdf_processor.extract_images(filepath, images_dir)
-        logger.info(f"Extracted {len(images_info)} images from PDF")
+        chunks = pdf_processor.iter_chunk_records(pdf_processor.iter_pages(filepath, images_dir=images_dir, pages=pages))
 
-        # Save images metadata with session
-        if images_info:
-            images_metadata_path = Path('data') / f"{session_id}_images.pkl"
-            with open(images_metadata_path, 'wb') as f:
-                pickle.dump(images_info, f)
+        if not qa_engine.create_index(chunks, session_id) or pdf_processor.stats['characters'] < 10:
+            qa_engine.cleanup_session(session_id)
+            cleanup_session_images(session_id)
+            os.remove(filepath)
+            return jsonify({'error': 'Could not extract text from PDF. The file may be empty or corrupted.'}), 400
 
-        # Create embeddings and index
-        qa_engine.create_index(chunks, session_id)
+        num_chunks = pdf_processor.stats['chunks']
+        chunks_saved_estimate = pdf_processor.stats['chunks_saved_estimate']
+        logger.info(f"Created {num_chunks} chunks from PDF (an estimated {chunks_saved_estimate} saved by header/footer stripping)")
+
+        num_images = pdf_processor.stats['images']
+
+        if pdf_processor.lazy_images:
+            # Images are decoded on first request to /images or /image/...
+            if pdf_processor.image_inventory:
+                inventory_path = Path('data') / f"{session_id}_image_inventory.pkl"
+                with open(inventory_path, 'wb') as f:
+                    pickle.dump({'pdf_path': filepath, 'inventory': pdf_processor.image_inventory}, f)
+            logger.info(f"Found {num_images} images in PDF (extraction deferred)")
+        else:
+            images_info = pdf_processor.images_info
+            logger.info(f"Extracted {num_images} unique images from PDF ({len(images_info) - num_images} repeats)")
+
+            # Save images metadata with session
+            if images_info:
+                images_metadata_path = Path('data') / f"{session_id}_images.pkl"
+                with open(images_metadata_path, 'wb') as f:
+                    pickle.dump(images_info, f)
 
         # Save metadata
         metadata = {
             'filename': filename,
-            'num_chunks': len(chunks),
-            'num_images': len(images_info),
+            'num_chunks': num_chunks,
+            'chunks_saved_estimate': chunks_saved_estimate,
+            'num_images': num_images,
+            'pages': pages or 'all',
             'session_id': session_id
         }
 
         return jsonify({
             'success': True,
-            'message': f'PDF processed successfully! Created {len(chunks)} text chunks.',
+            'message': f'PDF processed successfully! Created {num_chunks} text chunks.',
             'metadata': metadata
         }), 200
 
@@ -173,35 +301,73 @@ def upload_pdf():
         logger.error(f"Error processing PDF: {str(e)}")
         return jsonify({'error': f'Error processing PDF: {str(e)}'}), 500
 
-@app.route('/ask', methods=['POST'])
-def ask_question():
-    try:
-        data = request.get_json()
+def parse_question_request():
+    """
+    Validate the question in the request body.
 
-        if not data or 'question' not in data:
-            return jsonify({'error': 'No question provided'}), 400
+    Returns:
+        Tuple of (question, session_id, None), or (None, None, error response)
+    """
+    data = request.get_json()
 
-        question = data['question'].strip()
+    if not data or 'question' not in data:
+        return None, None, (jsonify({'error': 'No question provided'}), 400)
 
-        if not question:
-            return jsonify({'error': 'Question cannot be empty'}), 400
+    question = data['question'].strip()
 
-        if len(question) > 500:
-            return jsonify({'error': 'Question is too long. Maximum 500 characters.'}), 400
+    if not question:
+        return None, None, (jsonify({'error': 'Question cannot be empty'}), 400)
 
-        session_id = session.get('session_id')
+    if len(question) > 500:
+        return None, None, (jsonify({'error': 'Question is too long. Maximum 500 characters.'}), 400)
 
-        if not session_id:
-            return jsonify({'error': 'No PDF uploaded. Please upload a PDF first.'}), 400
+    session_id = session.get('session_id')
+
+    if not session_id:
+        return None, None, (jsonify({'error': 'No PDF uploaded. Please upload a PDF first.'}), 400)
+
+    return question, session_id, None
+
+def get_answer_options():
+    """
+    Answer mode shared by /ask and /ask/stream.
+
+    Returns:
+        Keyword arguments (use_extractive, use_full_context) for the QA engine
+    """
+    return {
+        'use_extractive': not GENERATOR_CONFIG.get('use_generator', False),
+        'use_full_context': QA_CONFIG.get('use_full_context', True)
+    }
+
+def get_model_info():
+    """Models reported in the performance log."""
+    return {
+        'embedding': EMBEDDING_CONFIG.get('model_name', 'Unknown'),
+        'qa_model': QA_CONFIG.get('advanced_qa_model', 'Extractive') if QA_CONFIG.get('use_advanced_qa') else 'Extractive',
+        'generator': GENERATOR_CONFIG.get('model_name', 'None')
+    }
+
+def sse_event(data, event=None):
+    """Format one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.route('/ask', methods=['POST'])
+def ask_question():
+    try:
+        question, session_id, error = parse_question_request()
+        if error:
+            return error
 
         # Track response time
         start_time = time.time()
 
-        # Generate answer with full context enabled
-        answer = qa_engine.answer_question(
+        # Generate answer in the configured mode
+        answer, cache_hit = qa_engine.answer_question_with_cache_info(
             question,
             session_id,
-            use_full_context=QA_CONFIG.get('use_full_context', True)
+            **get_answer_options()
         )
 
         # Calculate response time
@@ -211,26 +377,82 @@ def ask_question():
             return jsonify({'error': 'Could not generate an answer. Please try rephrasing your question.'}), 500
 
         # Log performance
-        model_info = {
-            'embedding': EMBEDDING_CONFIG.get('model_name', 'Unknown'),
-            'qa_model': QA_CONFIG.get('advanced_qa_model', 'Extractive') if QA_CONFIG.get('use_advanced_qa') else 'Extractive',
-            'generator': GENERATOR_CONFIG.get('model_name', 'None')
-        }
-
-        log_file = log_performance(session_id, question, answer, response_time, model_info)
+        log_file = log_performance(session_id, question, answer, response_time, get_model_info(), cache_hit)
         logger.info(f"Logged performance to: {log_file}")
 
         return jsonify({
             'success': True,
             'answer': answer,
             'question': question,
-            'response_time': round(response_time, 3)
+            'response_time': round(response_time, 3),
+            'cached': cache_hit
         }), 200
 
     except Exception as e:
         logger.error(f"Error answering question: {str(e)}")
         return jsonify({'error': f'Error generating answer: {str(e)}'}), 500
 
+@app.route('/ask/stream', methods=['POST'])
+def ask_question_stream():
+    """
+    Answer a question as server-sent events.
+
+    Generated answers are sent piece by piece as 'data: {"token": ...}'
+    events while the model runs; extractive answers arrive as one piece.
+    The stream ends with an 'event: done' carrying the final cleaned answer,
+    or an 'event: error'.
+    """
+    question, session_id, error = parse_question_request()
+    if error:
+        return error
+
+    answer_options = get_answer_options()
+
+    def generate():
+        start_time = time.time()
+        first_token_time = None
+        try:
+            for event in qa_engine.answer_question_stream(
+                question,
+                session_id,
+                **answer_options
+            ):
+                if 'token' in event:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    yield sse_event({'token': event['token']})
+                    continue
+
+                answer = event['answer']
+                response_time = time.time() - start_time
+                if first_token_time is None:
+                    first_token_time = response_time
+                if not answer:
+                    yield sse_event({'error': 'Could not generate an answer. Please try rephrasing your question.'}, 'error')
+                    return
+
+                log_file = log_performance(session_id, question, answer, response_time, get_model_info(), event['cached'])
+                logger.info(f"Logged performance to: {log_file} (first token after {first_token_time:.3f}s)")
+
+                yield sse_event({
+                    'success': True,
+                    'answer': answer,
+                    'question': question,
+                    'response_time': round(response_time, 3),
+                    'first_token_time': round(first_token_time, 3),
+                    'cached': event['cached']
+                }, 'done')
+
+        except Exception as e:
+            logger.error(f"Error streaming answer: {str(e)}")
+            yield sse_event({'error': f'Error generating answer: {str(e)}'}, 'error')
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/reset', methods=['POST'])
 def reset_session():
     try:
@@ -239,6 +461,7 @@ def reset_session():
         if session_id:
             # Clean up files
             qa_engine.cleanup_session(session_id)
+            cleanup_session_images(session_id)
 
             # Clean up uploaded PDF
             for file in os.listdir(app.config['UPLOAD_FOLDER']):
@@ -285,20 +508,34 @@ def get_images():
         # Load images metadata
         images_metadata_path = Path('data') / f"{session_id}_images.pkl"
 
-        if not images_metadata_path.exists():
-            return jsonify({'images': []}), 200
-
-        with open(images_metadata_path, 'rb') as f:
-            images_info = pickle.load(f)
-
-        # Convert absolute paths to relative URLs
+        if images_metadata_path.exists():
+            with open(images_metadata_path, 'rb') as f:
+                images_info = pickle.load(f)
+        else:
+            # Lazy mode: extract on first request, cached on disk afterwards
+            images_info = materialize_session_images(session_id)
+            if images_info is None:
+                return jsonify({'images': []}), 200
+
+        # Convert absolute paths to relative URLs; repeated images are listed
+        # once with every page they appear on
         images_list = []
+        images_by_filename = {}
         for img in images_info:
-            images_list.append({
+            listed = images_by_filename.get(img['filename'])
+            if listed:
+                if img['page'] not in listed['pages']:
+                    listed['pages'].append(img['page'])
+                continue
+
+            listed = {
                 'page': img['page'],
+                'pages': [img['page']],
                 'filename': img['filename'],
                 'url': f"/image/{session_id}/{img['filename']}"
-            })
+            }
+            images_by_filename[img['filename']] = listed
+            images_list.append(listed)
 
         return jsonify({
             'success': True,
@@ -319,8 +556,15 @@ def serve_image(session_id, filename):
         if current_session_id != session_id:
             return jsonify({'error': 'Unauthorized'}), 403
 
+        filename = secure_filename(filename)
         image_path = Path('images') / session_id / filename
 
+        if not image_path.exists():
+            # Lazy mode: extract just the requested page (filenames are page_<n>_img_<k>.<ext>)
+            page_match = re.match(r'page_(\d+)_img_', filename)
+            if page_match:
+                materialize_session_images(session_id, pages=[int(page_match.group(1))])
+
         if not image_path.exists():
             return jsonify({'error': 'Image not found'}), 404
 
@@ -330,11 +574,47 @@ def serve_image(session_id, filename):
         logger.error(f"Error serving image: {str(e)}")
         return jsonify({'error': f'Error serving image: {str(e)}'}), 500
 
+@app.route('/warmup', methods=['POST'])
+def warmup_models():
+    """
+    Load models ahead of the first question.
+
+    Body (optional): {"models": ["embedder", "qa", "generator"]}; all enabled
+    models by default. Responds 200 when every requested model is ready or
+    disabled, 503 otherwise.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        names = data.get('models')
+        if names is not None and not isinstance(names, list):
+            return jsonify({'error': 'models must be a list'}), 400
+
+        start_time = time.time()
+        try:
+            status = qa_engine.warmup(names)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        ready = all(model['state'] in ('ready', 'disabled') for model in status.values())
+        return jsonify({
+            'success': ready,
+            'models': status,
+            'warmup_time': round(time.time() - start_time, 3)
+        }), 200 if ready else 503
+
+    except Exception as e:
+        logger.error(f"Error warming up models: {str(e)}")
+        return jsonify({'error': f'Error warming up models: {str(e)}'}), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy',
-        'models_loaded': qa_engine.is_ready()
+        'models_loaded': qa_engine.is_ready(),
+        'models': qa_engine.model_status(),
+        'session_cache': qa_engine.cache_stats(),
+        'query_cache': qa_engine.query_cache_stats(),
+        'answer_cache': qa_engine.answer_cache_stats()
     }), 200
 
 if __name__ == '__main__':
@@ -17,6 +17,7 @@ from typing import Optional
 
 # Import components
 from vision_pdf_processor import VisionPDFProcessor
+from page_ranges import parse_page_ranges, select_pages
 from vision_qa_engine import VisionQAEngine
 from unified_model_selector import select_model_interactive
 
@@ -117,7 +118,15 @@ def upload_file():
         dpi = int(request.form.get('dpi', 150))
         extract_images = request.form.get('extract_images', 'true').lower() == 'true'
 
-        logger.info(f"Processing PDF with DPI={dpi}, extract_images={extract_images}")
+        # Optional page selection, e.g. "1-20, 35"; only these pages are rendered and indexed
+        pages = request.form.get('pages', '').strip() or None
+        try:
+            parse_page_ranges(pages)
+        except ValueError as e:
+            os.remove(filepath)
+            return jsonify({'error': str(e)}), 400
+
+        logger.info(f"Processing PDF with DPI={dpi}, extract_images={extract_images}, pages={pages or 'all'}")
 
         processor = VisionPDFProcessor(
             dpi=dpi,
@@ -126,9 +135,19 @@ def upload_file():
             batch_size=10
         )
 
+        # A selection entirely past the last page would otherwise fail at indexing
+        if pages is not None:
+            total_pages = processor.page_count(filepath)
+            if total_pages is not None and not select_pages(pages, total_pages):
+                os.remove(filepath)
+                return jsonify({
+                    'error': f"Page selection '{pages}' is outside the document; "
+                             f"valid pages are 1-{total_pages}"
+                }), 400
+
         # Process PDF
         start_time = time.time()
-        result = processor.process_pdf(filepath, output_dir)
+        result = processor.process_pdf(filepath, output_dir, pages=pages)
         processing_time = time.time() - start_time
 
         if not result:
@@ -145,7 +164,8 @@ def upload_file():
             session_id=session_id,
             page_images=result['page_images'],
             page_texts=result['page_text'],
-            metadata=result['metadata']
+            metadata=result['metadata'],
+            page_numbers=result['page_numbers']
         )
 
         index_time = time.time() - index_start
@@ -159,6 +179,7 @@ def upload_file():
         metadata = {
             'filename': filename,
             'total_pages': result['metadata']['total_pages'],
+            'processed_pages': result['metadata']['processed_pages'],
             'session_id': session_id,
             'processing_time': processing_time,
             'index_time': index_time,
@@ -14,6 +14,7 @@ import time
 from datetime import datetime
 
 from vision_pdf_processor import VisionPDFProcessor
+from page_ranges import parse_page_ranges, select_pages
 from vision_qa_engine import VisionQAEngine
 
 # Configure logging
@@ -135,7 +136,15 @@ def upload_pdf():
         dpi = int(request.form.get('dpi', 150))
         extract_images = request.form.get('extract_images', 'true').lower() == 'true'
 
-        logger.info(f"Processing PDF with DPI={dpi}, extract_images={extract_images}")
+        # Optional page selection, e.g. "1-20, 35"; only these pages are rendered and indexed
+        pages = request.form.get('pages', '').strip() or None
+        try:
+            parse_page_ranges(pages)
+        except ValueError as e:
+            os.remove(filepath)
+            return jsonify({'error': str(e)}), 400
+
+        logger.info(f"Processing PDF with DPI={dpi}, extract_images={extract_images}, pages={pages or 'all'}")
 
         processor = VisionPDFProcessor(
             dpi=dpi,
@@ -144,9 +153,19 @@ def upload_pdf():
             batch_size=10
         )
 
+        # A selection entirely past the last page would otherwise fail at indexing
+        if pages is not None:
+            total_pages = processor.page_count(filepath)
+            if total_pages is not None and not select_pages(pages, total_pages):
+                os.remove(filepath)
+                return jsonify({
+                    'error': f"Page selection '{pages}' is outside the document; "
+                             f"valid pages are 1-{total_pages}"
+                }), 400
+
         # Process PDF
         start_time = time.time()
-        result = processor.process_pdf(filepath, output_dir)
+        result = processor.process_pdf(filepath, output_dir, pages=pages)
         processing_time = time.time() - start_time
 
         if not result:
@@ -163,7 +182,8 @@ def upload_pdf():
             session_id=session_id,
             page_images=result['page_images'],
             page_texts=result['page_text'],
-            metadata=result['metadata']
+            metadata=result['metadata'],
+            page_numbers=result['page_numbers']
         )
 
         index_time = time.time() - index_start
@@ -177,6 +197,7 @@ def upload_pdf():
         metadata = {
             'filename': filename,
             'total_pages': result['metadata']['total_pages'],
+            'processed_pages': result['metadata']['processed_pages'],
             'num_page_images': len(result['page_images']),
             'num_embedded_images': len(result['embedded_images']),
             'processing_time': round(processing_time, 2),
@@ -188,7 +209,7 @@ def upload_pdf():
 
         return jsonify({
             'success': True,
-            'message': f'PDF processed successfully! {metadata["total_pages"]} pages indexed.',
+            'message': f'PDF processed successfully! {metadata["processed_pages"]} pages indexed.',
             'metadata': metadata
         }), 200
 
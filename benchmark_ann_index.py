@@ -0,0 +1,105 @@
+"""
+ANN Index Benchmark
+Compares the vector index types from vector_index.py on synthetic clustered
+embeddings: build time, recall@k against exact search, per-query latency and
+serialized size. Also prints which type choose_index would pick automatically.
+
+Usage:
+    python benchmark_ann_index.py
+    python benchmark_ann_index.py --vectors 10000 100000 --dim 384 --k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+import faiss
+
+from vector_index import choose_index, build_index, INDEX_TYPES, IVFPQ_MIN_VECTORS
+
+
+def generate_vectors(num_vectors: int, dimension: int, num_queries: int, seed: int = 0):
+    """
+    Generate normalized embedding-like vectors and queries.
+
+    Sentence embeddings are clustered and have a low intrinsic dimension, so
+    points are drawn around cluster centers in a small latent space and
+    projected to the full dimension, plus a little isotropic noise.
+    """
+    rng = np.random.default_rng(seed)
+    latent_dim = min(32, dimension)
+    num_clusters = max(8, num_vectors // 500)
+    centers = rng.standard_normal((num_clusters, latent_dim)).astype(np.float32)
+    projection = rng.standard_normal((latent_dim, dimension)).astype(np.float32) / np.sqrt(latent_dim)
+
+    def sample(count):
+        latent = centers[rng.integers(num_clusters, size=count)]
+        latent = latent + 0.5 * rng.standard_normal((count, latent_dim)).astype(np.float32)
+        points = latent @ projection + 0.05 * rng.standard_normal((count, dimension)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(num_vectors), sample(num_queries)
+
+
+def measure(index: faiss.Index, queries: np.ndarray, k: int):
+    """Search one query at a time, as the QA engines do; returns (ids, mean ms)."""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    start = time.perf_counter()
+    for i, query in enumerate(queries):
+        _, ids[i] = index.search(query.reshape(1, -1), k)
+    return ids, (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def recall_at_k(ids: np.ndarray, exact_ids: np.ndarray) -> float:
+    """Fraction of the exact top-k found by the approximate search."""
+    found = sum(len(set(row) & set(exact_row)) for row, exact_row in zip(ids, exact_ids))
+    return found / exact_ids.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types used by the QA engines")
+    parser.add_argument('--vectors', type=int, nargs='+', default=[10000, 50000], help="Corpus sizes")
+    parser.add_argument('--dim', type=int, default=384, help="Vector dimension (all-MiniLM-L6-v2: 384)")
+    parser.add_argument('--queries', type=int, default=200, help="Number of queries")
+    parser.add_argument('--k', type=int, default=10, help="Neighbors per query")
+    parser.add_argument('--types', nargs='+', default=list(INDEX_TYPES), help="Index types to compare")
+    args = parser.parse_args()
+
+    faiss.omp_set_num_threads(1)
+
+    print("=" * 78)
+    print(f"{'vectors':>8}  {'type':<7}{'build (s)':>11}{'recall@' + str(args.k):>11}"
+          f"{'query (ms)':>12}{'size (MB)':>11}  auto")
+    print("=" * 78)
+
+    for num_vectors in args.vectors:
+        vectors, queries = generate_vectors(num_vectors, args.dim, args.queries)
+        auto = choose_index(num_vectors, args.dim)['type']
+
+        exact_ids = None
+        for index_type in ['flat'] + [t for t in args.types if t != 'flat']:
+            if index_type == 'ivfpq' and num_vectors < IVFPQ_MIN_VECTORS:
+                print(f"{num_vectors:>8}  {index_type:<7}  (needs at least {IVFPQ_MIN_VECTORS} vectors)")
+                continue
+            params = choose_index(num_vectors, args.dim, index_type=index_type)
+
+            start = time.perf_counter()
+            index = build_index(vectors, params)
+            build_seconds = time.perf_counter() - start
+
+            ids, latency_ms = measure(index, queries, args.k)
+            if exact_ids is None:
+                exact_ids = ids
+            if index_type not in args.types:
+                continue
+
+            size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+            marker = "<-" if index_type == auto else ""
+            print(f"{num_vectors:>8}  {index_type:<7}{build_seconds:>11.2f}{recall_at_k(ids, exact_ids):>11.3f}"
+                  f"{latency_ms:>12.3f}{size_mb:>11.1f}  {marker}")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
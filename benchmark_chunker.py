@@ -0,0 +1,118 @@
+"""
+Chunker Benchmark
+Compares PDFProcessor.split_into_chunks against the previous quadratic
+overlap implementation on large synthetic documents and verifies that
+both produce identical chunks.
+
+Usage:
+    python benchmark_chunker.py
+    python benchmark_chunker.py --words 2000000 --chunk-size 400 --overlap 50
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from pdf_processor import PDFProcessor
+
+
+def legacy_split_into_chunks(processor: PDFProcessor, text: str) -> List[str]:
+    """Reference copy of the original chunker (re-splits sentences for every overlap)."""
+    sentences = processor._split_into_sentences(text)
+
+    chunks = []
+    current_chunk = []
+    current_word_count = 0
+
+    for sentence in sentences:
+        sentence_words = sentence.split()
+        sentence_word_count = len(sentence_words)
+
+        if current_word_count + sentence_word_count > processor.chunk_size and current_chunk:
+            chunks.append(' '.join(current_chunk))
+
+            overlap_words = []
+            overlap_count = 0
+
+            for sent in reversed(current_chunk):
+                sent_words = sent.split()
+                if overlap_count + len(sent_words) <= processor.chunk_overlap:
+                    overlap_words.insert(0, sent)
+                    overlap_count += len(sent_words)
+                else:
+                    break
+
+            current_chunk = overlap_words
+            current_word_count = overlap_count
+
+        current_chunk.append(sentence)
+        current_word_count += sentence_word_count
+
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+
+    return chunks
+
+
+def generate_text(num_words: int, seed: int = 42) -> str:
+    """Generate sentence-structured text with a realistic spread of sentence lengths."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "engine", "valve", "pressure", "torque", "assembly", "bolt", "inspect",
+        "replace", "total", "amount", "invoice", "vendor", "service", "interval",
+        "the", "a", "of", "and", "to", "with", "for", "is", "on", "check",
+    ]
+
+    sentences = []
+    words_written = 0
+    while words_written < num_words:
+        # Mostly normal sentences, with occasional very long table-like runs
+        length = rng.randint(3, 30) if rng.random() > 0.01 else rng.randint(200, 600)
+        words = [rng.choice(vocabulary) for _ in range(length)]
+        sentences.append(words[0].capitalize() + " " + " ".join(words[1:]) + ".")
+        words_written += length
+
+    return " ".join(sentences)
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sentence-aware chunker")
+    parser.add_argument('--words', type=int, default=1_000_000, help="Words in the synthetic document")
+    parser.add_argument('--chunk-size', type=int, default=400, help="Words per chunk")
+    parser.add_argument('--overlap', type=int, default=50, help="Overlapping words between chunks")
+    args = parser.parse_args()
+
+    print(f"Generating {args.words:,} words of text...")
+    text = generate_text(args.words)
+
+    configs = [(args.chunk_size, args.overlap), (args.chunk_size, args.chunk_size // 2), (100, 90)]
+
+    print("=" * 70)
+    print(f"{'chunk/overlap':<16}{'chunks':>10}{'legacy (s)':>14}{'new (s)':>12}{'speedup':>10}  same")
+    print("=" * 70)
+
+    for chunk_size, overlap in configs:
+        processor = PDFProcessor(chunk_size=chunk_size, chunk_overlap=overlap, extract_images=False)
+
+        legacy_chunks, legacy_time = time_call(legacy_split_into_chunks, processor, text)
+        new_chunks, new_time = time_call(processor.split_into_chunks, text)
+
+        same = legacy_chunks == new_chunks
+        print(f"{f'{chunk_size}/{overlap}':<16}{len(new_chunks):>10,}{legacy_time:>14.3f}{new_time:>12.3f}"
+              f"{legacy_time / new_time:>9.1f}x  {'yes' if same else 'NO'}")
+
+        if not same:
+            raise SystemExit("Chunk output differs from the legacy implementation")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
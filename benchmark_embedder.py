@@ -0,0 +1,119 @@
+"""
+Embedder Backend Benchmark
+Compares encoding throughput of the sentence transformer on the PyTorch path
+against the exported backends from embedder_backends.py (TorchScript, and
+ONNX Runtime when installed) for the two hot paths of the QA engine:
+chunk-sized passages encoded in batches at upload, and short questions
+encoded one at a time at query time. Reports export/load time, sentences
+per second and the largest difference from the PyTorch embeddings.
+
+The first run exports the model (cached next to it, or under --cache-dir);
+later runs reuse the export.
+
+Usage:
+    python benchmark_embedder.py
+    python benchmark_embedder.py --model all-MiniLM-L6-v2 --passages 2000 --batch-size 64
+    python benchmark_embedder.py --backends pytorch torchscript --threads 4
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer
+
+from embedder_backends import load_embedder_backend, embedder_backend_name, onnxruntime
+
+WORDS = (
+    "invoice total amount due payment vendor date pump pressure filter torque bolt motor "
+    "rated speed warranty shipment delivery consignee gasket cylinder hydraulic valve "
+    "maintenance schedule hours replace check level oil temperature insulation class"
+).split()
+
+
+def generate_sentences(count: int, min_words: int, max_words: int, seed: int = 0):
+    """Random sentences over a small technical/invoice vocabulary."""
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+        for _ in range(count)
+    ]
+
+
+def measure(embedder, sentences, batch_size: int, repeats: int):
+    """
+    Encode all sentences repeats times.
+
+    batch_size 1 encodes one sentence per call, as get_relevant_chunks does
+    for a question.
+
+    Returns:
+        Tuple of (embeddings, sentences per second)
+    """
+    def encode():
+        if batch_size == 1:
+            return np.vstack([embedder.encode([sentence], convert_to_numpy=True) for sentence in sentences])
+        return embedder.encode(sentences, batch_size=batch_size, convert_to_numpy=True)
+
+    embeddings = encode()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        embeddings = encode()
+    return embeddings, repeats * len(sentences) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exported embedder backends against PyTorch")
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help="Sentence transformer name or path")
+    parser.add_argument('--passages', type=int, default=256, help="Chunk-sized passages to encode")
+    parser.add_argument('--queries', type=int, default=200, help="Questions to encode one at a time")
+    parser.add_argument('--batch-size', type=int, default=64, help="Passages per forward pass")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed passes")
+    parser.add_argument('--threads', type=int, default=1, help="torch / ONNX Runtime CPU threads")
+    parser.add_argument('--backends', nargs='+', default=['pytorch', 'torchscript', 'onnx'],
+                        help="Backends to compare")
+    parser.add_argument('--cache-dir', default='models', help="Export cache for models not stored locally")
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    model = SentenceTransformer(args.model, device='cpu')
+    workloads = [
+        (f"passages/{args.batch_size}", generate_sentences(args.passages, 60, 200), args.batch_size),
+        ("queries/1", generate_sentences(args.queries, 4, 14, seed=1), 1),
+    ]
+
+    print("=" * 80)
+    print(f"{'backend':<13}{'workload':<15}{'load (s)':>10}{'sent/s':>12}{'speedup':>10}{'max diff':>12}")
+    print("=" * 80)
+
+    baselines = {name: measure(model, sentences, batch_size, args.repeats) for name, sentences, batch_size in workloads}
+
+    for backend in args.backends:
+        if backend == 'pytorch':
+            for name, _, _ in workloads:
+                print(f"{'pytorch':<13}{name:<15}{'':>10}{baselines[name][1]:>12.1f}{'1.00x':>10}{'':>12}")
+            continue
+        if backend == 'onnx' and onnxruntime is None:
+            print(f"{'onnx':<13}  (onnxruntime is not installed)")
+            continue
+
+        start = time.perf_counter()
+        embedder = load_embedder_backend(model, backend, args.model, fallback_dir=args.cache_dir)
+        load_seconds = time.perf_counter() - start
+        if embedder_backend_name(embedder) != backend:
+            print(f"{backend:<13}  (unavailable, fell back to {embedder_backend_name(embedder)})")
+            continue
+
+        for name, sentences, batch_size in workloads:
+            reference, baseline = baselines[name]
+            embeddings, rate = measure(embedder, sentences, batch_size, args.repeats)
+            difference = float(np.abs(embeddings - reference).max())
+            print(f"{backend:<13}{name:<15}{load_seconds:>10.2f}{rate:>12.1f}{rate / baseline:>9.2f}x{difference:>12.1e}")
+
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+PDF Backend Benchmark
+Measures text extraction throughput (pages/sec) and peak RSS for each
+PDFProcessor backend on generated test PDFs.
+
+Each backend run happens in a fresh subprocess so peak RSS is not polluted
+by earlier runs.
+
+Usage:
+    python benchmark_pdf_backends.py
+    python benchmark_pdf_backends.py --pages 50 500 2000 --backends pypdf pymupdf
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def generate_pdf(path: Path, num_pages: int, seed: int = 0):
+    """Generate a text-heavy PDF with PyMuPDF."""
+    import fitz
+
+    rng = random.Random(seed)
+    vocabulary = [
+        "engine", "valve", "pressure", "torque", "assembly", "bolt", "inspect",
+        "replace", "total", "amount", "invoice", "vendor", "service", "interval",
+    ]
+
+    doc = fitz.open()
+    for page_num in range(num_pages):
+        page = doc.new_page()
+        lines = []
+        for _ in range(45):
+            words = [rng.choice(vocabulary) for _ in range(rng.randint(6, 14))]
+            lines.append(" ".join(words).capitalize() + ".")
+        page.insert_text((40, 50), "\n".join(lines), fontsize=9)
+        page.insert_text((40, 810), f"Page {page_num + 1} of {num_pages}", fontsize=8)
+    doc.save(str(path))
+    doc.close()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_worker(backend: str, pdf_path: str):
+    """Extract all pages with one backend and print the measurements as JSON."""
+    from pdf_processor import PDFProcessor
+
+    processor = PDFProcessor(extract_images=False, workers=1, backend=backend)
+
+    start = time.perf_counter()
+    pages = 0
+    characters = 0
+    for _, page_text in processor.iter_pages(pdf_path):
+        pages += 1
+        characters += len(page_text)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'backend': processor.backend.name,
+        'pages': pages,
+        'characters': characters,
+        'seconds': elapsed,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDFProcessor text extraction backends")
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 500], help="Page counts of generated PDFs")
+    parser.add_argument('--backends', nargs='+', default=['pypdf', 'pymupdf'], help="Backends to compare")
+    parser.add_argument('--worker', nargs=2, metavar=('BACKEND', 'PDF'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(*args.worker)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print("=" * 70)
+        print(f"{'pages':>7}  {'backend':<10}{'seconds':>10}{'pages/sec':>12}{'peak RSS (MB)':>16}")
+        print("=" * 70)
+
+        for num_pages in args.pages:
+            pdf_path = Path(tmp_dir) / f"bench_{num_pages}.pdf"
+            generate_pdf(pdf_path, num_pages)
+
+            for backend in args.backends:
+                output = subprocess.run(
+                    [sys.executable, __file__, '--worker', backend, str(pdf_path)],
+                    capture_output=True, text=True, check=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+
+                if result['backend'] != backend:
+                    print(f"{num_pages:>7}  {backend:<10}  (not installed, skipped)")
+                    continue
+
+                print(f"{num_pages:>7}  {backend:<10}{result['seconds']:>10.2f}"
+                      f"{result['pages'] / result['seconds']:>12.1f}{result['peak_rss_mb']:>16.1f}")
+
+        print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
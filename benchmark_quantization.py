@@ -0,0 +1,226 @@
+"""
+Quantization Benchmark
+Compares fp32 against int8 dynamic quantization (QA_CONFIG['quantization'])
+for each model QAEngine loads - the sentence transformer, the advanced QA
+pipeline and the generator - on a fixed set of document/question pairs:
+load time, resident memory added by the model, per-item latency and how
+often the int8 model agrees with fp32.
+
+Each model and precision is loaded in a fresh process so memory figures do
+not include the other runs. The generator decodes greedily so both
+precisions are compared on deterministic output.
+
+Usage:
+    python benchmark_quantization.py
+    python benchmark_quantization.py --models embedder qa --qa-model distilbert-base-cased-distilled-squad
+    python benchmark_quantization.py --generator gpt2 --max-new-tokens 32
+"""
+
+import argparse
+import ctypes
+import gc
+import multiprocessing
+import resource
+import tempfile
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+FIXTURES = [
+    ("Invoice INV-2023-0412 issued by Apex Industrial Supplies Pvt. Ltd. on 14 March 2023. "
+     "The total amount due is Rs. 48,250.00 including 18% GST. Payment is due within 30 days.",
+     "What is the total amount due?"),
+    ("Invoice INV-2023-0412 issued by Apex Industrial Supplies Pvt. Ltd. on 14 March 2023. "
+     "The total amount due is Rs. 48,250.00 including 18% GST. Payment is due within 30 days.",
+     "Who issued the invoice?"),
+    ("The hydraulic pump P-220 operates at a maximum pressure of 210 bar. Replace the filter "
+     "element every 500 operating hours and check the oil level before each shift.",
+     "What is the maximum operating pressure?"),
+    ("The hydraulic pump P-220 operates at a maximum pressure of 210 bar. Replace the filter "
+     "element every 500 operating hours and check the oil level before each shift.",
+     "How often should the filter be replaced?"),
+    ("Tighten the cylinder head bolts in three passes to a final torque of 45 Nm, working "
+     "from the center outwards. Use a new gasket whenever the head is removed.",
+     "What torque should the cylinder head bolts be tightened to?"),
+    ("The warranty covers manufacturing defects for 24 months from the date of delivery. "
+     "Damage caused by improper installation or unauthorized repairs is not covered.",
+     "How long is the warranty period?"),
+    ("Shipment 7781 left the Pune warehouse on 2 June 2023 and was delivered to Chennai on "
+     "5 June 2023. The consignee was Mr. Ravi Kumar of Southern Motors.",
+     "Who was the consignee?"),
+    ("The motor is rated at 7.5 kW, 415 V, 50 Hz, and runs at 1440 rpm at full load. "
+     "Insulation class F allows a winding temperature of up to 155 degrees Celsius.",
+     "What is the rated speed of the motor?"),
+]
+
+MODEL_CHOICES = ('embedder', 'qa', 'generator')
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Not Linux: fall back to the peak RSS (KB on Linux, bytes on macOS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def release_freed_memory():
+    """Return freed heap memory to the OS so RSS reflects live objects (glibc only)."""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def run_variant(model: str, precision: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Load one model at one precision and run the fixtures through it.
+
+    Runs in its own process.
+
+    Returns:
+        Dictionary with load_seconds, rss_mb, latency_ms and outputs
+    """
+    import torch
+    from qa_engine import QAEngine
+
+    torch.set_num_threads(args.threads)
+    torch.manual_seed(0)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = QAEngine(
+            embedder_model=args.embedder,
+            gpt2_model=args.generator if model == 'generator' else 'none',
+            data_dir=data_dir,
+            use_advanced_qa=model == 'qa',
+            advanced_qa_model=args.qa_model,
+            quantization='int8' if precision == 'int8' else 'none',
+            quantized_models=[model]
+        )
+
+        release_freed_memory()
+        rss_before = current_rss_mb()
+        status = engine.warmup([model])[model]
+        if status['state'] != 'ready':
+            raise RuntimeError(f"{model} failed to load: {status['error']}")
+        # Quantizing replaces the fp32 weights; count only what is still held
+        release_freed_memory()
+        rss_after = current_rss_mb()
+
+        contexts = [context for context, _ in FIXTURES]
+        questions = [question for _, question in FIXTURES]
+
+        if model == 'embedder':
+            def run():
+                return engine.embedder.encode(contexts + questions, convert_to_numpy=True)
+            items = len(contexts) + len(questions)
+        elif model == 'qa':
+            def run():
+                return [
+                    engine.qa_pipeline(question=question, context=context)['answer']
+                    for context, question in FIXTURES
+                ]
+            items = len(FIXTURES)
+        else:
+            def run():
+                answers = []
+                for context, question in FIXTURES:
+                    kwargs = engine._generation_kwargs(
+                        engine._create_prompt(context, question), args.max_new_tokens, 1.0, 0, 1.0
+                    )
+                    # Greedy decoding, so fp32 and int8 outputs are comparable
+                    for key in ('temperature', 'top_k', 'top_p'):
+                        kwargs.pop(key)
+                    kwargs['do_sample'] = False
+                    with torch.no_grad():
+                        output_ids = engine.model.generate(**kwargs)
+                    if not engine.is_seq2seq:
+                        output_ids = output_ids[:, kwargs['input_ids'].shape[-1]:]
+                    answers.append(engine.tokenizer.decode(output_ids[0], skip_special_tokens=True))
+                return answers
+            items = len(FIXTURES)
+
+        outputs = run()  # warm-up pass
+        start = time.perf_counter()
+        for _ in range(args.repeats):
+            run()
+        latency_ms = (time.perf_counter() - start) * 1000 / (args.repeats * items)
+
+    return {
+        'precision': status['precision'],
+        'load_seconds': status['load_seconds'],
+        'rss_mb': rss_after - rss_before,
+        'latency_ms': latency_ms,
+        'outputs': outputs
+    }
+
+
+def agreement(model: str, fp32_outputs: Any, int8_outputs: Any) -> str:
+    """Describe how closely int8 outputs match fp32 outputs."""
+    if model == 'embedder':
+        a = np.asarray(fp32_outputs, dtype=np.float32)
+        b = np.asarray(int8_outputs, dtype=np.float32)
+        a /= np.linalg.norm(a, axis=1, keepdims=True)
+        b /= np.linalg.norm(b, axis=1, keepdims=True)
+        cosine = float(np.mean(np.sum(a * b, axis=1)))
+
+        # Does each question still retrieve the same context?
+        n = len(FIXTURES)
+        same_top1 = np.mean(
+            np.argmax(a[n:] @ a[:n].T, axis=1) == np.argmax(b[n:] @ b[:n].T, axis=1)
+        )
+        return f"cos {cosine:.4f}, top-1 {same_top1:.0%}"
+
+    matches = sum(x.strip() == y.strip() for x, y in zip(fp32_outputs, int8_outputs))
+    return f"exact {matches}/{len(fp32_outputs)}"
+
+
+def run_in_process(model: str, precision: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run a variant in a fresh process so its memory is measured in isolation."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(run_variant, (model, precision, args))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark int8 dynamic quantization of the QA engine models")
+    parser.add_argument('--models', nargs='+', default=list(MODEL_CHOICES), choices=MODEL_CHOICES,
+                        help="Models to benchmark")
+    parser.add_argument('--embedder', default='all-MiniLM-L6-v2', help="Sentence transformer")
+    parser.add_argument('--qa-model', default='distilbert-base-cased-distilled-squad', help="Extractive QA model")
+    parser.add_argument('--generator', default='gpt2', help="Generator model")
+    parser.add_argument('--max-new-tokens', type=int, default=32, help="Tokens generated per question")
+    parser.add_argument('--repeats', type=int, default=3, help="Timed passes over the fixtures")
+    parser.add_argument('--threads', type=int, default=1, help="torch CPU threads")
+    args = parser.parse_args()
+
+    print("=" * 86)
+    print(f"{'model':<10}{'precision':<11}{'load (s)':>10}{'RSS (MB)':>10}{'ms/item':>10}{'speedup':>9}  agreement")
+    print("=" * 86)
+
+    for model in args.models:
+        results: Dict[str, Dict[str, Any]] = {}
+        for precision in ('fp32', 'int8'):
+            results[precision] = run_in_process(model, precision, args)
+
+        for precision, result in results.items():
+            if precision == 'fp32':
+                speedup, agrees = "", ""
+            else:
+                speedup = f"{results['fp32']['latency_ms'] / result['latency_ms']:.2f}x"
+                agrees = agreement(model, results['fp32']['outputs'], result['outputs'])
+            print(f"{model:<10}{result['precision']:<11}{result['load_seconds']:>10.2f}{result['rss_mb']:>10.1f}"
+                  f"{result['latency_ms']:>10.2f}{speedup:>9}  {agrees}")
+
+    print("=" * 86)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+BM25 Lexical Index
+Sparse term -> chunk postings built at indexing time so retrieval can match
+exact part numbers, codes and other identifiers that dense embeddings tend to
+miss, plus the rank fusion used to combine BM25 with FAISS results.
+
+File (next to the FAISS index):
+    {session_id}_bm25.npz  vocabulary + CSR postings (chunk ids, term counts)
+                           + chunk lengths
+"""
+
+import logging
+import math
+import re
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words, plus identifiers joined by - . / : (e.g. "AB-1234/X", "v2.1.0"). An
+# identifier is indexed both whole and as its parts, so "ab-1234" in a query
+# matches exactly while "1234" alone still finds it.
+TOKEN_PATTERN = re.compile(r'\w+(?:[-./:]\w+)*')
+PART_PATTERN = re.compile(r'\w+')
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Reciprocal rank fusion constant (Cormack et al.)
+RRF_K = 60
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """
+    Split text into lowercase BM25 terms.
+
+    Args:
+        text: Text to tokenize
+
+    Yields:
+        Terms; compound identifiers are followed by their parts
+    """
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group(0)
+        yield token
+        if not token.isalnum():
+            yield from PART_PATTERN.findall(token)
+
+
+class BM25IndexWriter:
+    """Streams chunks into BM25 postings and saves them on close."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a BM25 index for writing.
+
+        Args:
+            path: Destination of the postings archive (.npz)
+        """
+        self.path = Path(path)
+        self._postings = {}  # term -> (array of chunk ids, array of term counts)
+        self._lengths = array('I')
+
+    def add_chunk(self, chunk: str):
+        """
+        Add the next chunk.
+
+        Args:
+            chunk: Chunk text
+        """
+        chunk_id = len(self._lengths)
+        counts = Counter(tokenize(chunk))
+        for term, count in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array('I'), array('I'))
+            postings[0].append(chunk_id)
+            postings[1].append(count)
+        self._lengths.append(sum(counts.values()))
+
+    def close(self):
+        """Write the postings archive."""
+        terms = sorted(self._postings)
+        counts = np.array([len(self._postings[term][0]) for term in terms], dtype=np.int64)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        ids = np.empty(int(offsets[-1]), dtype=np.uint32)
+        tfs = np.empty(int(offsets[-1]), dtype=np.uint32)
+        for i, term in enumerate(terms):
+            chunk_ids, term_counts = self._postings[term]
+            ids[offsets[i]:offsets[i + 1]] = np.frombuffer(chunk_ids, dtype=np.uint32)
+            tfs[offsets[i]:offsets[i + 1]] = np.frombuffer(term_counts, dtype=np.uint32)
+
+        # Terms never contain newlines, so the vocabulary is one newline-joined blob
+        vocabulary = np.frombuffer('\n'.join(terms).encode('utf-8'), dtype=np.uint8)
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+
+        with open(self.path, 'wb') as f:
+            np.savez(f, vocabulary=vocabulary, offsets=offsets, ids=ids, tfs=tfs, lengths=lengths)
+
+        logger.info(f"Built BM25 index: {len(lengths)} chunks, {len(terms)} terms")
+        self._postings = {}
+
+    def abort(self):
+        """Discard the postings."""
+        self._postings = {}
+
+    def __enter__(self) -> 'BM25IndexWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BM25Index:
+    """Read-only BM25 index over a session's chunks."""
+
+    def __init__(
+        self,
+        vocabulary: str,
+        offsets: np.ndarray,
+        ids: np.ndarray,
+        tfs: np.ndarray,
+        lengths: np.ndarray
+    ):
+        """
+        Initialize BM25 index.
+
+        Args:
+            vocabulary: Newline-joined sorted terms
+            offsets: Postings offsets per term (len(terms) + 1)
+            ids: Concatenated chunk-id postings
+            tfs: Term counts matching ids
+            lengths: Number of terms in each chunk
+        """
+        self.terms = {term: i for i, term in enumerate(vocabulary.split('\n'))} if vocabulary else {}
+        self.offsets = offsets
+        self.ids = ids
+        self.tfs = tfs.astype(np.float32)
+        self.lengths = lengths.astype(np.float32)
+        self.avg_length = float(self.lengths.mean()) if len(self.lengths) else 0.0
+
+        # Arrays plus a rough per-entry estimate for the term dict
+        self.nbytes = (
+            offsets.nbytes + ids.nbytes + self.tfs.nbytes + self.lengths.nbytes
+            + len(vocabulary) * 2 + len(self.terms) * 100
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional['BM25Index']:
+        """
+        Load an index written by BM25IndexWriter.
+
+        Args:
+            path: Path to the postings archive
+
+        Returns:
+            BM25Index instance or None if missing/unreadable
+        """
+        try:
+            if not Path(path).exists():
+                return None
+
+            with np.load(path, allow_pickle=False) as data:
+                vocabulary = data['vocabulary'].tobytes().decode('utf-8')
+                return cls(vocabulary, data['offsets'], data['ids'], data['tfs'], data['lengths'])
+
+        except Exception as e:
+            logger.error(f"Error loading BM25 index: {str(e)}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Rank chunks by BM25 score.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+
+        Returns:
+            List of (chunk_id, score), best first; chunks sharing no term with
+            the query are left out
+        """
+        num_chunks = len(self.lengths)
+        if num_chunks == 0 or top_k <= 0:
+            return []
+
+        scores = np.zeros(num_chunks, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            chunk_ids = self.ids[start:end]
+            tf = self.tfs[start:end]
+
+            idf = math.log(1 + (num_chunks - len(chunk_ids) + 0.5) / (len(chunk_ids) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[chunk_ids] / self.avg_length)
+            # Postings hold each chunk once per term, so plain fancy-index += is safe
+            scores[chunk_ids] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        order = matched[np.argsort(-scores[matched], kind='stable')]
+
+        return [(int(i), float(scores[i])) for i in order]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    Combine rankings with reciprocal rank fusion: score = sum of 1 / (k + rank).
+
+    Args:
+        rankings: Lists of ids, best first
+        k: Fusion constant; larger values flatten the contribution of top ranks
+
+    Returns:
+        List of (id, fused_score), best first
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
+
+
+def weighted_fusion(
+    dense: Sequence[Tuple[int, float]],
+    lexical: Sequence[Tuple[int, float]],
+    lexical_weight: float = 0.5
+) -> List[Tuple[int, float]]:
+    """
+    Combine dense and BM25 scores as a weighted sum.
+
+    Cosine similarities are used as-is; BM25 scores are divided by the best
+    BM25 score so both lie on a comparable 0-1 scale. A result missing from
+    one list contributes 0 for that list.
+
+    Args:
+        dense: (id, cosine similarity) results
+        lexical: (id, BM25 score) results, best first
+        lexical_weight: Weight of the BM25 score (dense gets 1 - lexical_weight)
+
+    Returns:
+        List of (id, fused_score), best first
+    """
+    fused: Dict[int, float] = {}
+    for item, score in dense:
+        fused[item] = (1 - lexical_weight) * score
+
+    if lexical:
+        best = lexical[0][1]
+        for item, score in lexical:
+            fused[item] = fused.get(item, 0.0) + lexical_weight * score / best
+
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
@@ -0,0 +1,162 @@
+"""
+Chunk Provenance Table
+Array-backed record of where each chunk came from (page range and character
+offsets), stored next to the FAISS index so answers can cite pages without
+rescanning the document.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any, Iterable, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkProvenance:
+    """
+    Per-chunk page numbers and character offsets held in numpy arrays.
+
+    Two page lookup tables are precomputed so that finding the chunks that
+    overlap a page range is a pair of array reads instead of a scan.
+    """
+
+    def __init__(
+        self,
+        page_start: np.ndarray,
+        page_end: np.ndarray,
+        char_start: np.ndarray,
+        char_end: np.ndarray
+    ):
+        """
+        Initialize provenance table.
+
+        Args:
+            page_start: First page (1-based) of each chunk
+            page_end: Last page (1-based) of each chunk
+            char_start: Start offset of each chunk in the cleaned document text
+            char_end: End offset of each chunk in the cleaned document text
+        """
+        self.page_start = np.asarray(page_start, dtype=np.int32)
+        self.page_end = np.asarray(page_end, dtype=np.int32)
+        self.char_start = np.asarray(char_start, dtype=np.int64)
+        self.char_end = np.asarray(char_end, dtype=np.int64)
+
+        # Chunks are emitted in document order, so both page columns are sorted.
+        # first_chunk[p]: first chunk ending on or after page p
+        # last_chunk[p]:  last chunk starting on or before page p
+        num_pages = int(self.page_end.max()) if len(self.page_end) else 0
+        pages = np.arange(num_pages + 2)
+        self.first_chunk = np.searchsorted(self.page_end, pages, side='left').astype(np.int32)
+        self.last_chunk = (np.searchsorted(self.page_start, pages, side='right') - 1).astype(np.int32)
+        self.num_pages = num_pages
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'ChunkProvenance':
+        """
+        Build a provenance table from PDFProcessor.iter_chunk_records output.
+
+        Args:
+            records: Chunk records with page_start, page_end, char_start, char_end
+
+        Returns:
+            ChunkProvenance instance
+        """
+        records = list(records)
+        return cls(
+            page_start=[r['page_start'] for r in records],
+            page_end=[r['page_end'] for r in records],
+            char_start=[r['char_start'] for r in records],
+            char_end=[r['char_end'] for r in records]
+        )
+
+    def __len__(self) -> int:
+        return len(self.page_start)
+
+    def pages(self, chunk_idx: int) -> Tuple[int, int]:
+        """
+        Get the page range a chunk was taken from.
+
+        Args:
+            chunk_idx: Chunk index
+
+        Returns:
+            Tuple of (first_page, last_page), 1-based and inclusive
+        """
+        return int(self.page_start[chunk_idx]), int(self.page_end[chunk_idx])
+
+    def offsets(self, chunk_idx: int) -> Tuple[int, int]:
+        """
+        Get the character offsets of a chunk in the cleaned document text.
+
+        Args:
+            chunk_idx: Chunk index
+
+        Returns:
+            Tuple of (char_start, char_end)
+        """
+        return int(self.char_start[chunk_idx]), int(self.char_end[chunk_idx])
+
+    def chunks_for_pages(self, first_page: int, last_page: int) -> range:
+        """
+        Get the indexes of all chunks overlapping a page range in O(1).
+
+        Args:
+            first_page: First page (1-based, inclusive)
+            last_page: Last page (1-based, inclusive)
+
+        Returns:
+            Range of chunk indexes (empty if no chunk overlaps)
+        """
+        first_page = min(max(first_page, 0), self.num_pages + 1)
+        last_page = min(max(last_page, 0), self.num_pages + 1)
+
+        lo = int(self.first_chunk[first_page])
+        hi = int(self.last_chunk[last_page]) + 1
+        return range(lo, max(lo, hi))
+
+    def save(self, path: Path) -> bool:
+        """
+        Save the table as an uncompressed .npz archive.
+
+        Args:
+            path: Output path
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with open(path, 'wb') as f:
+                np.savez(
+                    f,
+                    page_start=self.page_start,
+                    page_end=self.page_end,
+                    char_start=self.char_start,
+                    char_end=self.char_end
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving chunk provenance: {str(e)}")
+            return False
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['ChunkProvenance']:
+        """
+        Load a table saved with save().
+
+        Args:
+            path: Path to the .npz archive
+
+        Returns:
+            ChunkProvenance instance or None if missing/unreadable
+        """
+        try:
+            if not Path(path).exists():
+                return None
+
+            with np.load(path, allow_pickle=False) as data:
+                return cls(data['page_start'], data['page_end'], data['char_start'], data['char_end'])
+
+        except Exception as e:
+            logger.error(f"Error loading chunk provenance: {str(e)}")
+            return None
@@ -0,0 +1,209 @@
+"""
+Memory-Mapped Chunk Store
+Binary, append-only storage for text chunks: one UTF-8 blob plus an offsets
+array, opened with mmap so reading a single chunk is O(1) and opening a store
+costs the same regardless of document size.
+
+File layout (all integers little-endian):
+    header   magic b'PQCS' | version u32 | count u64 | offsets_pos u64
+    blob     UTF-8 bytes of every chunk, back to back
+    offsets  (count + 1) x u64 byte offsets into the blob, 8-byte aligned
+"""
+
+import logging
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PQCS'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQ')
+
+
+class ChunkStoreWriter:
+    """Streams chunks to a new chunk store file."""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a chunk store for writing.
+
+        The file is written under a temporary name and moved into place on
+        close(), so readers never observe a partially written store.
+
+        Args:
+            path: Destination path of the store
+        """
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._offsets = array('Q', [0])
+
+    def append(self, text: str) -> int:
+        """
+        Append a chunk.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Index of the appended chunk
+        """
+        data = text.encode('utf-8')
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+        return len(self._offsets) - 2
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def close(self):
+        """Write the offsets array and header, then publish the file."""
+        if self._file is None:
+            return
+
+        blob_end = HEADER.size + self._offsets[-1]
+        padding = -blob_end % 8
+        self._file.write(b'\0' * padding)
+
+        self._file.write(np.frombuffer(self._offsets, dtype=np.uint64).astype('<u8', copy=False).tobytes())
+
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, len(self), blob_end + padding))
+        self._file.close()
+        self._file = None
+
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discard the partially written store."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+    def __enter__(self) -> 'ChunkStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ChunkStore:
+    """
+    Read-only, memory-mapped view of a chunk store.
+
+    Chunks are decoded on access; get_bytes() returns a zero-copy view into
+    the mapping.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a chunk store.
+
+        Args:
+            path: Path to the store file
+
+        Raises:
+            ValueError: If the file is not a chunk store
+        """
+        self.path = Path(path)
+
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, count, offsets_pos = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Not a chunk store (version {VERSION}): {self.path}")
+        except Exception:
+            self._mmap.close()
+            raise
+
+        self._view = memoryview(self._mmap)
+        self.offsets = np.frombuffer(self._mmap, dtype='<u8', count=count + 1, offset=offsets_pos)
+
+        self.nbytes = len(self._mmap)
+
+    @classmethod
+    def open(cls, path: Union[str, Path]) -> Optional['ChunkStore']:
+        """
+        Open a chunk store, returning None if it is missing or unreadable.
+
+        Args:
+            path: Path to the store file
+
+        Returns:
+            ChunkStore instance or None
+        """
+        try:
+            if not Path(path).exists():
+                return None
+            return cls(path)
+        except Exception as e:
+            logger.error(f"Error opening chunk store {path}: {str(e)}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get_bytes(self, idx: int) -> memoryview:
+        """
+        Get the UTF-8 bytes of a chunk without copying.
+
+        Args:
+            idx: Chunk index
+
+        Returns:
+            memoryview into the mapped file
+        """
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Chunk index out of range: {idx}")
+
+        start = HEADER.size + int(self.offsets[idx])
+        end = HEADER.size + int(self.offsets[idx + 1])
+        return self._view[start:end]
+
+    def __getitem__(self, idx: int) -> str:
+        return str(self.get_bytes(idx), 'utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def close(self):
+        """
+        Unmap the file.
+
+        If callers still hold views from get_bytes(), the mapping is released
+        by the garbage collector once the last view goes away.
+        """
+        if self._mmap is None:
+            return
+
+        self.offsets = None
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            logger.warning(f"Chunk store {self.path} closed with live views; deferring unmap")
+        self._view = None
+        self._mmap = None
+
+    def __enter__(self) -> 'ChunkStore':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -13,6 +13,8 @@ import torch
 from PIL import Image
 import pickle
 
+from embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,7 +28,11 @@ class ColPaliRetriever:
         self,
         model_name: str = "vidore/colpali",
         device: str = None,
-        use_half_precision: bool = True
+        use_half_precision: bool = True,
+        index_type: str = 'auto',
+        index_latency_target_ms: float = 20.0,
+        index_memory_budget_mb: float = 1024.0,
+        query_cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize ColPali retriever.
@@ -35,7 +41,19 @@ class ColPaliRetriever:
             model_name: HuggingFace model name for ColPali
             device: Device to use (cuda/cpu), auto-detected if None
             use_half_precision: Use FP16 for faster inference
+            index_type: FAISS index type: 'auto' (chosen by page count),
+                'flat', 'hnsw' or 'ivfpq'
+            index_latency_target_ms: Per-query search latency 'auto' aims for
+            index_memory_budget_mb: Memory a page index may use
+            query_cache: Query embedding cache, e.g. shared with a QAEngine
+                (a private one is created if None)
         """
+        self.index_type = index_type
+        self.index_latency_target_ms = index_latency_target_ms
+        self.index_memory_budget_mb = index_memory_budget_mb
+        self.query_cache = query_cache if query_cache is not None else EmbeddingCache()
+        self.model_name = model_name
+
         if device is None:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
         else:
@@ -69,6 +87,7 @@ class ColPaliRetriever:
 
             model_name = "openai/clip-vit-large-patch14"
             logger.info(f"Loading fallback CLIP model: {model_name}")
+            self.model_name = model_name
 
             self.processor = CLIPProcessor.from_pretrained(model_name)
             self.model = CLIPModel.from_pretrained(model_name).to(self.device)
@@ -155,7 +174,7 @@ class ColPaliRetriever:
 
     def encode_query(self, query: str) -> np.ndarray:
         """
-        Encode text query to embedding.
+        Encode text query to embedding, reusing cached embeddings of repeated queries.
 
         Args:
             query: Text query
@@ -163,6 +182,17 @@ class ColPaliRetriever:
         Returns:
             Query embedding
         """
+        embedding = self.query_cache.get(query, self.model_name)
+        if embedding is not None:
+            return embedding
+
+        embedding = self._encode_query(query)
+        if embedding.size:
+            self.query_cache.put(query, self.model_name, embedding)
+        return embedding
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Run the model on a text query (empty array if encoding fails)."""
         try:
             if hasattr(self, 'is_fallback') and self.is_fallback:
                 # CLIP text encoding
@@ -196,7 +226,8 @@ class ColPaliRetriever:
         page_images: List[str],
         session_id: str,
         data_dir: str = "data",
-        use_faiss: bool = True
+        use_faiss: bool = True,
+        page_numbers: Optional[List[int]] = None
     ) -> bool:
         """
         Create visual index from page images.
@@ -206,6 +237,8 @@ class ColPaliRetriever:
             session_id: Session identifier
             data_dir: Directory to save index
             use_faiss: Use FAISS for efficient search
+            page_numbers: 1-based page number of each image when only part of
+                the PDF was indexed (defaults to 1..N)
 
         Returns:
             True if successful
@@ -228,23 +261,26 @@ class ColPaliRetriever:
             data_path.mkdir(exist_ok=True)
 
             if use_faiss:
-                # Create FAISS index
-                import faiss
+                # Create FAISS index (inner product for cosine similarity)
+                from vector_index import choose_index, build_index, save_index
 
-                dimension = embeddings.shape[1]
-                index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-                index.add(embeddings.astype('float32'))
+                params = choose_index(
+                    embeddings.shape[0], embeddings.shape[1], self.index_type,
+                    self.index_latency_target_ms, self.index_memory_budget_mb
+                )
+                index = build_index(embeddings, params)
 
-                # Save index
+                # Save index with its parameters
                 index_path = data_path / f"{session_id}_colpali.faiss"
-                faiss.write_index(index, str(index_path))
-                logger.info(f"Saved FAISS index to {index_path}")
+                save_index(index, index_path, params)
+                logger.info(f"Saved {params['type']} FAISS index to {index_path}")
 
             # Save page paths and embeddings
             metadata = {
                 'page_images': page_images,
                 'embeddings': embeddings,
-                'num_pages': len(page_images)
+                'num_pages': len(page_images),
+                'page_numbers': page_numbers or list(range(1, len(page_images) + 1))
             }
 
             metadata_path = data_path / f"{session_id}_colpali_meta.pkl"
@@ -302,19 +338,22 @@ class ColPaliRetriever:
             # Search with FAISS if available
             index_path = data_path / f"{session_id}_colpali.faiss"
             if index_path.exists():
-                import faiss
+                from vector_index import load_index
 
-                index = faiss.read_index(str(index_path))
+                index = load_index(index_path)
                 scores, indices = index.search(
                     query_embedding.reshape(1, -1).astype('float32'),
                     top_k
                 )
 
+                # Indexes written before page selection existed cover every page
+                page_numbers = metadata.get('page_numbers') or list(range(1, len(metadata['page_images']) + 1))
+
                 results = []
                 for idx, score in zip(indices[0], scores[0]):
-                    if idx < len(metadata['page_images']):
+                    if 0 <= idx < len(metadata['page_images']):
                         results.append({
-                            'page': idx + 1,
+                            'page': page_numbers[idx],
                             'image_path': metadata['page_images'][idx],
                             'score': float(score),
                             'rank': len(results) + 1
@@ -329,11 +368,12 @@ class ColPaliRetriever:
 
                 # Get top-k indices
                 top_indices = np.argsort(similarities)[::-1][:top_k]
+                page_numbers = metadata.get('page_numbers') or list(range(1, len(metadata['page_images']) + 1))
 
                 results = []
                 for rank, idx in enumerate(top_indices, 1):
                     results.append({
-                        'page': idx + 1,
+                        'page': page_numbers[idx],
                         'image_path': metadata['page_images'][idx],
                         'score': float(similarities[idx]),
                         'rank': rank
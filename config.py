@@ -20,8 +20,60 @@ QA_CONFIG = {
     # Number of top chunks to retrieve (only used if use_full_context=False)
     'top_k_chunks': 10,
 
+    # What the advanced QA model reads: 'document' (the whole document, truncated
+    # to 8,000 characters) or 'chunks' (the top retrieved chunks in one batch, best
+    # span wins; latency no longer grows with document length)
+    'advanced_qa_scope': 'document',
+    # Chunks the advanced QA model reads per question when advanced_qa_scope='chunks'
+    'advanced_qa_top_k': 5,
+
     # Maximum answer length
     'max_answer_length': 3000,
+
+    # Memory budget (MB) and idle timeout (seconds) for loaded session indexes/chunks
+    'session_cache_mb': 512,
+    'session_cache_ttl': 1800,
+
+    # Chunk retrieval: 'dense' (embeddings only) or 'hybrid' (embeddings + BM25,
+    # better recall on part numbers, codes and other exact identifiers)
+    'retrieval_mode': 'hybrid',
+
+    # Hybrid fusion: 'rrf' (reciprocal rank fusion) or 'weighted' (weighted scores)
+    'fusion': 'rrf',
+
+    # Weight of BM25 scores when fusion='weighted' (embeddings get 1 - bm25_weight)
+    'bm25_weight': 0.5,
+
+    # Vector index: 'auto' picks flat (exact), hnsw or ivfpq per document from its
+    # size and the targets below; or force one of 'flat', 'hnsw', 'ivfpq'
+    'index_type': 'auto',
+    'index_latency_target_ms': 20,
+    'index_memory_budget_mb': 1024,
+
+    # Number of query embeddings kept in memory for repeated questions (0 = off)
+    'query_cache_size': 1024,
+
+    # Number of answers kept for repeated questions on the same document; a
+    # session's answers are dropped when it is re-indexed or reset (0 = off)
+    'answer_cache_size': 256,
+
+    # Load each model on its first use (or via POST /warmup) instead of at startup,
+    # so a restarted worker answers /health immediately
+    'lazy_model_loading': True,
+
+    # Models to load in the background right after startup, e.g. ['embedder']
+    'warmup_models': [],
+
+    # CPU inference precision: 'none' (fp32) or 'int8' (dynamic quantization of
+    # linear layers; ~4x smaller and faster, see benchmark_quantization.py)
+    'quantization': 'none',
+    # Models quantization applies to: 'embedder', 'qa', 'generator'
+    'quantized_models': ['embedder', 'qa', 'generator'],
+
+    # Embedder runtime on CPU: 'pytorch', or an exported graph cached next to the
+    # model: 'onnx' (needs onnxruntime + onnx), 'torchscript', or 'auto' (onnx if
+    # onnxruntime is installed, else torchscript). Falls back to pytorch on failure.
+    'embedder_backend': 'pytorch',
 }
 
 # Embedding Model Configuration
@@ -37,8 +89,19 @@ GENERATOR_CONFIG = {
 
 # PDF Processing Configuration
 PDF_CONFIG = {
+    'backend': 'pymupdf',  # 'pymupdf' (fast) or 'pypdf'; falls back to whichever is installed
     'chunk_size': 400,  # words per chunk
     'chunk_overlap': 50,  # overlapping words between chunks
+    'chunk_unit': 'tokens',  # 'words', or 'tokens' to size chunks with the embedder's tokenizer
+    'chunk_size_tokens': 256,  # tokens per chunk (capped at the embedder's max_seq_length)
+    'chunk_overlap_tokens': 32,  # overlapping tokens between chunks
+    'extraction_workers': 0,  # text extraction processes (0 = one per CPU, 1 = serial)
+    'parallel_min_pages': 50,  # smaller PDFs are always extracted serially
+    'lazy_images': True,  # only inventory images at upload; extract on first /images request
+    'dedupe_images': True,  # store repeated images (logos, footer graphics) once
+    'min_image_area': 1024,  # skip decorative images smaller than this many pixels (0 = keep all)
+    'strip_repeated_lines': False,  # remove running headers/footers before chunking (first occurrence kept)
+    'repeated_line_ratio': 0.5,  # share of pages a top/bottom line must repeat on to be stripped
 }
 
 # Flask Configuration
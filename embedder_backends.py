@@ -0,0 +1,382 @@
+"""
+Embedder Backends
+Exported-graph backends for the sentence transformer, so chunk and query
+encoding on CPU skips the Python overhead of eager PyTorch. The transformer
+is exported once and cached next to the model; tokenization and the
+pooling/normalization modules still come from the SentenceTransformer, so
+embeddings match the PyTorch path.
+
+Backends:
+    pytorch     - SentenceTransformer.encode as-is
+    onnx        - ONNX Runtime (needs onnxruntime, and onnx to export)
+    torchscript - traced TorchScript module (needs only torch)
+    auto        - onnx if onnxruntime is installed, else torchscript
+
+Any backend that cannot be exported, loaded or verified falls back to the
+next one and finally to pytorch.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Union
+import numpy as np
+import torch
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDER_BACKENDS = ('pytorch', 'onnx', 'torchscript', 'auto')
+
+# Exported artifacts go in this subdirectory of the model directory
+EXPORT_DIR_NAME = 'exported'
+
+# Largest embedding difference from the PyTorch path accepted after export
+VERIFY_TOLERANCE = 1e-3
+VERIFY_SENTENCES = [
+    "What is the total amount due on this invoice?",
+    "Tighten the cylinder head bolts to 45 Nm.",
+    "ok",
+]
+
+# Tokenizer outputs the exported graph may take, in argument order
+MODEL_INPUTS = ('input_ids', 'attention_mask', 'token_type_ids')
+
+
+class _TokenEmbeddings(torch.nn.Module):
+    """Transformer forward pass returning only the token embeddings (for export)."""
+
+    def __init__(self, auto_model: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.auto_model = auto_model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        kwargs = dict(zip(self.input_names, inputs))
+        return self.auto_model(**kwargs, return_dict=False)[0]
+
+
+class ExportedEmbedder:
+    """
+    SentenceTransformer stand-in that runs the transformer from an exported graph.
+
+    Implements encode() like SentenceTransformer; any other attribute
+    (tokenizer, max_seq_length, get_sentence_embedding_dimension, ...) is
+    read from the wrapped model.
+    """
+
+    backend = 'base'
+
+    def __init__(self, model: Any, input_names: List[str]):
+        """
+        Args:
+            model: Loaded SentenceTransformer
+            input_names: Tokenizer outputs the exported graph takes
+        """
+        self.model = model
+        self.input_names = input_names
+        # Pooling, dense and normalize modules after the transformer
+        self.head = list(model)[1:]
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not found on the wrapper itself
+        if name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def _token_embeddings(self, features: Dict[str, torch.Tensor]) -> torch.Tensor:
+        raise NotImplementedError
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> Union[np.ndarray, torch.Tensor]:
+        """
+        Encode sentences like SentenceTransformer.encode.
+
+        Args:
+            sentences: Sentence or list of sentences
+            batch_size: Sentences per forward pass
+            show_progress_bar: Ignored
+            convert_to_numpy: Return a numpy array (default)
+            convert_to_tensor: Return a torch tensor instead
+            normalize_embeddings: L2-normalize the embeddings
+
+        Returns:
+            Embeddings, one row per sentence (1-D for a single string)
+        """
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        # Similar lengths share a batch so little padding is computed
+        order = np.argsort([-len(sentence) for sentence in sentences], kind='stable')
+        embeddings = [None] * len(sentences)
+
+        for start in range(0, len(sentences), batch_size):
+            batch_ids = order[start:start + batch_size]
+            batch = [sentences[i] for i in batch_ids]
+
+            encoded = self.model.tokenizer(
+                batch,
+                padding=True,
+                truncation='longest_first',
+                max_length=self.model.max_seq_length,
+                return_tensors='pt'
+            )
+            features = {name: encoded[name] for name in self.input_names}
+
+            with torch.no_grad():
+                features['token_embeddings'] = self._token_embeddings(features)
+                for module in self.head:
+                    features = module(features)
+                batch_embeddings = features['sentence_embedding']
+                if normalize_embeddings:
+                    batch_embeddings = torch.nn.functional.normalize(batch_embeddings, p=2, dim=1)
+
+            for i, embedding in zip(batch_ids, batch_embeddings):
+                embeddings[i] = embedding
+
+        if convert_to_tensor:
+            result = torch.stack(embeddings) if embeddings else torch.empty(0)
+        else:
+            result = np.stack([e.numpy() for e in embeddings]) if embeddings else np.empty((0,), dtype=np.float32)
+
+        return result[0] if single else result
+
+
+class OnnxEmbedder(ExportedEmbedder):
+    """Transformer run by ONNX Runtime."""
+
+    backend = 'onnx'
+    suffix = '.onnx'
+
+    def __init__(self, model: Any, input_names: List[str], path: Path):
+        super().__init__(model, input_names)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Same CPU thread budget as torch in this process
+        options.intra_op_num_threads = torch.get_num_threads()
+        self.session = onnxruntime.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+
+    @staticmethod
+    def export(module: torch.nn.Module, example: tuple, input_names: List[str], path: Path):
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['token_embeddings'] = {0: 'batch', 1: 'sequence'}
+        kwargs = dict(
+            input_names=input_names,
+            output_names=['token_embeddings'],
+            dynamic_axes=dynamic_axes,
+            opset_version=17,
+            do_constant_folding=True
+        )
+        try:
+            # The TorchScript-based exporter handles dynamic_axes directly
+            torch.onnx.export(module, example, str(path), dynamo=False, **kwargs)
+        except TypeError:
+            # torch versions without the dynamo exporter switch
+            torch.onnx.export(module, example, str(path), **kwargs)
+
+    def _token_embeddings(self, features: Dict[str, torch.Tensor]) -> torch.Tensor:
+        inputs = {name: features[name].numpy().astype(np.int64) for name in self.input_names}
+        return torch.from_numpy(self.session.run(None, inputs)[0])
+
+
+class TorchScriptEmbedder(ExportedEmbedder):
+    """Transformer run as a traced TorchScript module."""
+
+    backend = 'torchscript'
+    suffix = '.pt'
+
+    def __init__(self, model: Any, input_names: List[str], path: Path):
+        super().__init__(model, input_names)
+        self.module = torch.jit.optimize_for_inference(torch.jit.load(str(path), map_location='cpu'))
+
+    @staticmethod
+    def export(module: torch.nn.Module, example: tuple, input_names: List[str], path: Path):
+        traced = torch.jit.trace(module, example, strict=False, check_trace=False)
+        torch.jit.save(traced, str(path))
+
+    def _token_embeddings(self, features: Dict[str, torch.Tensor]) -> torch.Tensor:
+        return self.module(*(features[name] for name in self.input_names))
+
+
+BACKEND_CLASSES = {'onnx': OnnxEmbedder, 'torchscript': TorchScriptEmbedder}
+
+
+def _candidate_backends(backend: str) -> List[str]:
+    """Exported backends to try, in order."""
+    if backend == 'onnx':
+        return ['onnx', 'torchscript']
+    if backend == 'torchscript':
+        return ['torchscript']
+    if backend == 'auto':
+        return ['onnx', 'torchscript'] if onnxruntime is not None else ['torchscript']
+    return []
+
+
+def _fingerprint(model: Any, model_name: str, backend: str, input_names: List[str]) -> str:
+    """Identify an export: model config and weights sample, precision and library versions."""
+    auto_model = model[0].auto_model
+    parts = [
+        model_name,
+        backend,
+        ','.join(input_names),
+        json.dumps(auto_model.config.to_dict(), sort_keys=True, default=str),
+        torch.__version__,
+        onnxruntime.__version__ if backend == 'onnx' else '',
+    ]
+    for name, tensor in auto_model.state_dict().items():
+        if isinstance(tensor, torch.Tensor):
+            # Shape, dtype and a few values per tensor; cheap but changes with the weights
+            flat = tensor.detach().reshape(-1)
+            sample = flat[:: max(1, flat.numel() // 8)][:8]
+            if sample.is_floating_point():
+                sample = sample.float()
+            parts.append(f"{name}:{tuple(tensor.shape)}:{tensor.dtype}:{sample.tolist()}")
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _export_dirs(model: Any, model_name: str, fallback_dir: Path) -> List[Path]:
+    """Where to cache exports: next to the model if it is on disk, else fallback_dir."""
+    dirs = []
+    for candidate in (model_name, model[0].auto_model.config._name_or_path):
+        if candidate and Path(candidate).is_dir():
+            dirs.append(Path(candidate) / EXPORT_DIR_NAME)
+            break
+    safe_name = ''.join(c if c.isalnum() or c in '-_.' else '--' for c in model_name)
+    dirs.append(Path(fallback_dir) / safe_name)
+    return dirs
+
+
+def _export(cls, model: Any, input_names: List[str], path: Path):
+    """Export the transformer to path, writing through a temporary file."""
+    module = _TokenEmbeddings(model[0].auto_model, input_names).eval()
+    example_inputs = model.tokenizer(
+        VERIFY_SENTENCES[:2], padding=True, truncation=True,
+        max_length=model.max_seq_length, return_tensors='pt'
+    )
+    example = tuple(example_inputs[name] for name in input_names)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with torch.no_grad():
+            cls.export(module, example, input_names, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _verify(embedder: ExportedEmbedder, model: Any) -> bool:
+    """Check the exported path reproduces the PyTorch embeddings."""
+    expected = model.encode(VERIFY_SENTENCES, convert_to_numpy=True)
+    actual = embedder.encode(VERIFY_SENTENCES, convert_to_numpy=True)
+    difference = float(np.abs(expected - actual).max())
+    if difference > VERIFY_TOLERANCE:
+        logger.warning(f"{embedder.backend} embedder differs from PyTorch by {difference:.2e}, not using it")
+        return False
+    return True
+
+
+def load_embedder_backend(
+    model: Any,
+    backend: str,
+    model_name: str,
+    fallback_dir: Union[str, Path] = 'models'
+) -> Any:
+    """
+    Wrap a SentenceTransformer in an exported-graph backend.
+
+    The export is cached (next to the model when the model is a local
+    directory, otherwise under fallback_dir) and reused while the model,
+    its precision and the runtime versions are unchanged.
+
+    Args:
+        model: Loaded SentenceTransformer (on CPU)
+        backend: 'pytorch', 'onnx', 'torchscript' or 'auto'
+        model_name: Name or path the model was loaded from
+        fallback_dir: Cache directory for models not stored on disk
+
+    Returns:
+        An ExportedEmbedder, or model itself if no exported backend works
+    """
+    if backend not in EMBEDDER_BACKENDS:
+        logger.warning(f"Unknown embedder backend '{backend}', using pytorch")
+        return model
+
+    candidates = _candidate_backends(backend)
+    if not candidates:
+        return model
+
+    try:
+        transformer = model[0]
+        auto_model = transformer.auto_model
+    except (TypeError, IndexError, AttributeError):
+        logger.warning("Embedder has no exportable transformer module, using pytorch")
+        return model
+
+    if next(auto_model.parameters(), torch.empty(0)).device.type != 'cpu':
+        logger.info("Embedder runs on GPU, keeping the pytorch backend")
+        return model
+
+    encoded = model.tokenizer(["a"], return_tensors='pt')
+    input_names = [name for name in MODEL_INPUTS if name in encoded]
+
+    # The ONNX exporter has no int8 dynamic-quantized linear operator
+    quantized = any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in auto_model.modules())
+
+    for name in candidates:
+        if name == 'onnx' and onnxruntime is None:
+            logger.info("onnxruntime is not installed, skipping the onnx embedder backend")
+            continue
+        if name == 'onnx' and quantized:
+            logger.info("Embedder is int8-quantized, skipping the onnx embedder backend")
+            continue
+
+        cls = BACKEND_CLASSES[name]
+        artifact = f"{name}-{_fingerprint(model, model_name, name, input_names)}{cls.suffix}"
+
+        for export_dir in _export_dirs(model, model_name, Path(fallback_dir)):
+            path = export_dir / artifact
+            try:
+                if not path.exists():
+                    logger.info(f"Exporting embedder to {path}...")
+                    _export(cls, model, input_names, path)
+
+                embedder = cls(model, input_names, path)
+                if _verify(embedder, model):
+                    logger.info(f"Using {name} embedder backend ({path})")
+                    return embedder
+                break
+
+            except OSError as e:
+                # e.g. read-only model directory: try the next location
+                logger.warning(f"Could not write {name} embedder export to {export_dir}: {str(e)}")
+
+            except Exception as e:
+                # Export/load errors (e.g. unsupported operators) repeat anywhere: next backend
+                message = str(e).splitlines()[0] if str(e) else type(e).__name__
+                logger.warning(f"Could not use {name} embedder backend: {message}")
+                break
+
+    logger.warning("No exported embedder backend available, using pytorch")
+    return model
+
+
+def embedder_backend_name(embedder: Any) -> str:
+    """Backend an embedder returned by load_embedder_backend runs on."""
+    return embedder.backend if isinstance(embedder, ExportedEmbedder) else 'pytorch'
@@ -0,0 +1,151 @@
+"""
+Query Embedding Cache
+Bounded LRU cache of query embeddings keyed by embedding model and
+normalized question text, so common questions ("what is the total amount?")
+skip the encoder. Shared by QAEngine and ColPaliRetriever.
+"""
+
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize a question for cache lookup.
+
+    Lowercases, collapses whitespace and drops trailing punctuation, so
+    "What is the total amount?" and "what is the  total amount" share an
+    entry. The embedding stored is that of the first spelling seen.
+
+    Args:
+        text: Question text
+
+    Returns:
+        Normalized text
+    """
+    return WHITESPACE.sub(' ', text.lower()).strip().rstrip('?!. ')
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of query embeddings."""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize embedding cache.
+
+        Args:
+            max_entries: Maximum number of cached embeddings
+        """
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # (model_name, normalized text) -> embedding
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str, model_name: str) -> Optional[np.ndarray]:
+        """
+        Look up a query embedding.
+
+        Args:
+            text: Question text
+            model_name: Embedding model that produced the embedding
+
+        Returns:
+            Cached embedding (read-only) or None
+        """
+        key = (model_name, normalize_query(text))
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, text: str, model_name: str, embedding: np.ndarray):
+        """
+        Store a query embedding.
+
+        Args:
+            text: Question text
+            model_name: Embedding model that produced the embedding
+            embedding: 1-D embedding vector
+        """
+        # Stored read-only so no caller can change the shared copy
+        embedding = np.array(embedding, copy=True)
+        embedding.setflags(write=False)
+
+        key = (model_name, normalize_query(text))
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def encode(
+        self,
+        texts: List[str],
+        model_name: str,
+        encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Embed texts, encoding only the ones not in the cache (in one batch).
+
+        Args:
+            texts: Question texts
+            model_name: Embedding model name
+            encode_fn: Encodes a list of texts into a 2-D array, one row per text
+
+        Returns:
+            2-D array of embeddings in the order of texts
+        """
+        embeddings = [self.get(text, model_name) for text in texts]
+
+        # Each distinct miss is encoded once, even if repeated in this batch
+        missing = OrderedDict()
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(normalize_query(texts[i]), []).append(i)
+
+        if missing:
+            positions = list(missing.values())
+            encoded = encode_fn([texts[group[0]] for group in positions])
+            for group, embedding in zip(positions, encoded):
+                self.put(texts[group[0]], model_name, embedding)
+                for i in group:
+                    embeddings[i] = embedding
+
+        return np.vstack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+
+    def clear(self):
+        """Drop every cached embedding."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and max_entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
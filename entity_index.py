@@ -0,0 +1,353 @@
+"""
+Entity Table
+Amounts, dates and names found in a document, extracted once at indexing time
+and stored with their positions so invoice-style questions ("What is the
+total?", "When is the date?", "Who is the vendor?") are answered by lookup
+instead of running the extractors over the full text on every question.
+Extraction streams over the chunks, so the document is never joined.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Patterns for amounts: ₹123.45, $123.45, 123.45, Rs. 123, etc.
+AMOUNT_PATTERNS = [
+    r'(?:₹|Rs\.?|INR)\s*(\d+(?:,\d+)*(?:\.\d+)?)',  # ₹1,234.56
+    r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:₹|Rs\.?|INR)',  # 1,234.56 ₹
+    r'\$\s*(\d+(?:,\d+)*(?:\.\d+)?)',                # $1,234.56
+    r'(?:Total|Amount|Grand Total|Net)[:\s]+(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
+]
+
+# Common date patterns
+DATE_PATTERNS = [
+    r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',           # 12/31/2023, 12-31-23
+    r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',             # 2023-12-31
+    r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}',  # 31 Dec 2023
+]
+
+# Sequences of capitalized words (likely names/companies)
+NAME_PATTERN = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Pvt\.?|Ltd\.?|Inc\.?|Corp\.?|Limited))?\b'
+COMMON_WORDS = {'The', 'This', 'That', 'With', 'From', 'To', 'For', 'And', 'Or', 'But'}
+
+# Context sizes used by the full-document answers
+AMOUNT_CONTEXT_CHARS = 200
+DATE_CONTEXT_CHARS = 250
+HEAD_CHARS = 500
+
+# Text kept past the last accepted match while streaming; longer than any
+# context above and than any realistic match, so a match still growing into
+# the next chunk is never cut short
+SCAN_MARGIN_CHARS = 256
+
+
+def find_amounts(text: str) -> List[Tuple[float, str, int]]:
+    """
+    Find monetary amounts.
+
+    Args:
+        text: Text to search
+
+    Returns:
+        List of (value, matched_text, position), largest value first
+    """
+    amounts = []
+    for pattern in AMOUNT_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            amount_str = match.group(1) if match.lastindex else match.group(0)
+            # Remove commas and convert to float
+            try:
+                amounts.append((float(amount_str.replace(',', '')), match.group(0), match.start()))
+            except ValueError:
+                continue
+
+    return sorted(amounts, key=lambda x: x[0], reverse=True)
+
+
+def find_dates(text: str) -> List[Tuple[str, int]]:
+    """
+    Find dates.
+
+    Args:
+        text: Text to search
+
+    Returns:
+        List of (matched_text, position) for every match, pattern by pattern
+    """
+    dates = []
+    for pattern in DATE_PATTERNS:
+        dates.extend((match.group(0), match.start()) for match in re.finditer(pattern, text, re.IGNORECASE))
+    return dates
+
+
+def find_names(text: str) -> List[Tuple[str, int]]:
+    """
+    Find potential names/companies (capitalized words).
+
+    Args:
+        text: Text to search
+
+    Returns:
+        List of (matched_text, position) in document order, common words removed
+    """
+    return [
+        (match.group(0), match.start()) for match in re.finditer(NAME_PATTERN, text)
+        if match.group(0) not in COMMON_WORDS
+    ]
+
+
+def context_around(text: str, match: str, context_chars: int = 150) -> str:
+    """Get text context around the first occurrence of a match."""
+    pos = text.find(match)
+    if pos == -1:
+        return text[:context_chars]
+
+    start = max(0, pos - context_chars)
+    end = min(len(text), pos + len(match) + context_chars)
+    return text[start:end].strip()
+
+
+class EntityTable:
+    """
+    Per-session table of extracted entities.
+
+    Amounts keep every match (largest first) since answers list the top few
+    including repeats; dates and names keep each distinct value once at its
+    first position. The contexts answers quote are cut while indexing, so a
+    lookup never needs the document text. Built with EntityTableWriter.
+    """
+
+    def __init__(
+        self,
+        amounts: List[Tuple[float, str, int]],
+        dates: List[Tuple[str, int]],
+        names: List[Tuple[str, int]],
+        contexts: Dict[str, str]
+    ):
+        """
+        Initialize entity table.
+
+        Args:
+            amounts: (value, text, position) tuples, largest value first
+            dates: Distinct (text, position) tuples in document order
+            names: Distinct (text, position) tuples in document order
+            contexts: Text around the largest amount ('amount') and first date
+                ('date'), and the start of the document ('head')
+        """
+        self.amounts = amounts
+        self.dates = dates
+        self.names = names
+        self.contexts = contexts
+
+    def save(self, path: Path) -> bool:
+        """
+        Save the table as JSON.
+
+        Args:
+            path: Output path
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            data = {
+                'amounts': [{'value': v, 'text': t, 'position': p} for v, t, p in self.amounts],
+                'dates': [{'text': t, 'position': p} for t, p in self.dates],
+                'names': [{'text': t, 'position': p} for t, p in self.names],
+                'contexts': self.contexts
+            }
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving entity table: {str(e)}")
+            return False
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['EntityTable']:
+        """
+        Load a table saved with save().
+
+        Args:
+            path: Path to the JSON file
+
+        Returns:
+            EntityTable instance or None if missing/unreadable
+        """
+        try:
+            if not Path(path).exists():
+                return None
+
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            return cls(
+                amounts=[(e['value'], e['text'], e['position']) for e in data['amounts']],
+                dates=[(e['text'], e['position']) for e in data['dates']],
+                names=[(e['text'], e['position']) for e in data['names']],
+                contexts=data['contexts']
+            )
+
+        except Exception as e:
+            logger.error(f"Error loading entity table: {str(e)}")
+            return None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entities of each kind."""
+        return {'amounts': len(self.amounts), 'dates': len(self.dates), 'names': len(self.names)}
+
+
+class EntityTableWriter:
+    """
+    Streams chunks through the entity extractors and saves the table on close.
+
+    Finds exactly the matches the extractors would find in " ".join(chunks)
+    (matches longer than SCAN_MARGIN_CHARS aside) while only holding a window
+    of text around the scan position.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open an entity table for writing.
+
+        Args:
+            path: Destination of the JSON table
+        """
+        self.path = Path(path)
+        self.table = None
+
+        self._scanners = (
+            [('amount', i, re.compile(pattern, re.IGNORECASE)) for i, pattern in enumerate(AMOUNT_PATTERNS)] +
+            [('date', i, re.compile(pattern, re.IGNORECASE)) for i, pattern in enumerate(DATE_PATTERNS)] +
+            [('name', 0, re.compile(NAME_PATTERN))]
+        )
+        self._resume = [0] * len(self._scanners)  # document position each scanner continues from
+
+        self._text = None  # window of the document starting at self._offset
+        self._offset = 0
+        self._head = None
+
+        self._amounts = [[] for _ in AMOUNT_PATTERNS]  # per pattern, in document order
+        self._dates = {}  # text -> first position
+        self._names = {}
+        self._contexts = {}
+        self._largest_amount = None  # (-value, pattern, position) of the amount whose context is kept
+        self._first_date = None  # position of the date whose context is kept
+
+    def add_chunk(self, chunk: str):
+        """
+        Add the next chunk of the document.
+
+        Args:
+            chunk: Chunk text
+        """
+        self._text = chunk if self._text is None else self._text + ' ' + chunk
+        if self._head is None and self._offset == 0 and len(self._text) >= HEAD_CHARS:
+            self._head = self._text[:HEAD_CHARS]
+
+        self._scan(final=False)
+
+        # Keep enough text before the earliest resume point for match contexts
+        cut = min(self._resume) - self._offset - SCAN_MARGIN_CHARS
+        if cut > 0:
+            self._text = self._text[cut:]
+            self._offset += cut
+
+    def _scan(self, final: bool):
+        """Accept every match that can no longer change as more text arrives."""
+        limit = len(self._text) if final else len(self._text) - SCAN_MARGIN_CHARS
+
+        for n, (kind, pattern_id, regex) in enumerate(self._scanners):
+            resume = self._resume[n]
+            for match in regex.finditer(self._text, resume - self._offset):
+                if match.end() > limit:
+                    resume = match.start() + self._offset
+                    break
+                self._accept(kind, pattern_id, match)
+                resume = match.end() + self._offset
+            else:
+                resume = max(resume, limit + self._offset)
+            self._resume[n] = resume
+
+    def _accept(self, kind: str, pattern_id: int, match: re.Match):
+        """Record one match at its document position."""
+        position = match.start() + self._offset
+
+        if kind == 'amount':
+            amount_str = match.group(1) if match.lastindex else match.group(0)
+            # Remove commas and convert to float
+            try:
+                value = float(amount_str.replace(',', ''))
+            except ValueError:
+                return
+            self._amounts[pattern_id].append((value, match.group(0), position))
+
+            # Same amount find_amounts would sort first
+            key = (-value, pattern_id, position)
+            if self._largest_amount is None or key < self._largest_amount:
+                self._largest_amount = key
+                self._contexts['amount'] = self._context(match, AMOUNT_CONTEXT_CHARS)
+
+        elif kind == 'date':
+            value = match.group(0)
+            if value not in self._dates or position < self._dates[value]:
+                self._dates[value] = position
+            if self._first_date is None or position < self._first_date:
+                self._first_date = position
+                self._contexts['date'] = self._context(match, DATE_CONTEXT_CHARS)
+
+        elif match.group(0) not in COMMON_WORDS:
+            self._names.setdefault(match.group(0), position)
+
+    def _context(self, match: re.Match, context_chars: int) -> str:
+        """Text around a match in the current window (see context_around)."""
+        start = max(0, match.start() - context_chars)
+        end = min(len(self._text), match.end() + context_chars)
+        return self._text[start:end].strip()
+
+    def close(self) -> EntityTable:
+        """
+        Extract the entities left in the window and save the table.
+
+        Returns:
+            The saved EntityTable
+        """
+        if self._text is not None:
+            self._scan(final=True)
+            if self._head is None:
+                self._head = self._text[:HEAD_CHARS]
+
+        amounts = sorted(
+            (amount for pattern_amounts in self._amounts for amount in pattern_amounts),
+            key=lambda x: x[0], reverse=True
+        )
+        self._contexts['head'] = self._head or ''
+        self.table = EntityTable(
+            amounts,
+            sorted(self._dates.items(), key=lambda item: item[1]),
+            sorted(self._names.items(), key=lambda item: item[1]),
+            self._contexts
+        )
+        self.table.save(self.path)
+        self._text = None
+        return self.table
+
+    def abort(self):
+        """Discard the extracted entities."""
+        self._text = None
+        self._amounts = [[] for _ in AMOUNT_PATTERNS]
+        self._dates = {}
+        self._names = {}
+
+    def __enter__(self) -> 'EntityTableWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,107 @@
+"""
+Page Range Selection
+Parses page selections such as "1-20, 35, 40-" so the processors can extract,
+render and embed only the pages a user asked for.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple, Union
+
+PageSelection = Union[str, Iterable[int], None]
+
+RANGE_PATTERN = re.compile(r'^(\d*)\s*-\s*(\d*)$')
+
+
+def parse_page_ranges(spec: Optional[str]) -> Optional[List[Tuple[int, Optional[int]]]]:
+    """
+    Parse a page selection string.
+
+    Accepts comma-separated page numbers and ranges (1-based, inclusive):
+    "5", "1-20", "40-" (to the last page) and "-10" (from the first page).
+
+    Args:
+        spec: Page selection string; empty or None selects every page
+
+    Returns:
+        List of (first_page, last_page) tuples, last_page None for open ranges,
+        or None if every page is selected
+
+    Raises:
+        ValueError: If the selection is malformed
+    """
+    if spec is None or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+
+        if part.isdigit():
+            first = last = int(part)
+        else:
+            match = RANGE_PATTERN.match(part)
+            if not match or not (match.group(1) or match.group(2)):
+                raise ValueError(f"Invalid page range: '{part}'")
+            first = int(match.group(1)) if match.group(1) else 1
+            last = int(match.group(2)) if match.group(2) else None
+
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"Invalid page range: '{part}'")
+
+        ranges.append((first, last))
+
+    return ranges or None
+
+
+def select_pages(pages: PageSelection, total_pages: int) -> List[int]:
+    """
+    Resolve a page selection against a document.
+
+    Args:
+        pages: Selection string (see parse_page_ranges), iterable of 1-based
+            page numbers, or None for every page
+        total_pages: Number of pages in the document
+
+    Returns:
+        Sorted, de-duplicated 1-based page numbers; pages past the end of the
+        document are dropped
+
+    Raises:
+        ValueError: If a selection string is malformed
+    """
+    if pages is None:
+        return list(range(1, total_pages + 1))
+
+    if isinstance(pages, str):
+        ranges = parse_page_ranges(pages)
+        if ranges is None:
+            return list(range(1, total_pages + 1))
+
+        selected = set()
+        for first, last in ranges:
+            last = total_pages if last is None else min(last, total_pages)
+            selected.update(range(first, last + 1))
+        return sorted(selected)
+
+    return sorted({int(page) for page in pages if 1 <= int(page) <= total_pages})
+
+
+def contiguous_runs(page_numbers: List[int]) -> List[Tuple[int, int]]:
+    """
+    Group sorted page numbers (or 0-based indexes) into contiguous runs.
+
+    Args:
+        page_numbers: Sorted page numbers
+
+    Returns:
+        List of (first, last) tuples, inclusive
+    """
+    runs = []
+    for page in page_numbers:
+        if runs and page == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
@@ -0,0 +1,443 @@
+"""
+PDF Backends
+Interchangeable PDF parsing backends for PDFProcessor. Each backend exposes
+per-page text extraction, image extraction and a cheap image inventory, so
+the text pipeline can switch parsers through PDF_CONFIG['backend'].
+
+Backends:
+    pypdf   - pure Python (pypdf, or PyPDF2 as a fallback)
+    pymupdf - MuPDF bindings (PyMuPDF), much faster text extraction
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Callable, Tuple
+from PIL import Image
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        PdfReader = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+if PdfReader is None and fitz is None:
+    raise ImportError("Please install pypdf or PyMuPDF: pip install pypdf")
+
+logger = logging.getLogger(__name__)
+
+
+class PdfBackend:
+    """Base class for PDF backends. One instance wraps one open document."""
+
+    name = 'base'
+
+    def __init__(self, pdf_path: str, dedupe_images: bool = True, min_image_area: int = 0):
+        """
+        Open a PDF document.
+
+        Args:
+            pdf_path: Path to the PDF file
+            dedupe_images: Store each distinct image once; repeats (logos,
+                footers) map back to the stored copy
+            min_image_area: Skip images smaller than this many pixels (width x height)
+        """
+        self.pdf_path = pdf_path
+        self.dedupe_images = dedupe_images
+        self.min_image_area = min_image_area
+
+        # Content hash -> metadata of the stored copy, and xref -> content hash
+        self.stored_images = {}
+        self._xref_hashes = {}
+
+    def __len__(self) -> int:
+        """Number of pages in the document."""
+        raise NotImplementedError
+
+    def extract_text(self, page_num: int) -> Optional[str]:
+        """
+        Extract raw text from a page.
+
+        Args:
+            page_num: Page index (0-based)
+
+        Returns:
+            Raw page text (may be empty)
+        """
+        raise NotImplementedError
+
+    def extract_images(self, page_num: int, output_path: Path) -> List[Dict[str, Any]]:
+        """
+        Extract and save the images embedded in a page.
+
+        Args:
+            page_num: Page index (0-based)
+            output_path: Directory to save extracted images
+
+        Returns:
+            List of dictionaries containing image metadata (page, filename, path)
+        """
+        raise NotImplementedError
+
+    def inventory_images(self, page_num: int) -> List[Dict[str, Any]]:
+        """
+        Record which images a page uses without decoding them.
+
+        Args:
+            page_num: Page index (0-based)
+
+        Returns:
+            A single inventory entry (page, count, xrefs), or an empty list
+        """
+        raise NotImplementedError
+
+    def collect_images(self, page_num: int, images_dir: Optional[str], lazy: bool) -> List[Dict[str, Any]]:
+        """Extract a page's images, or only inventory them in lazy mode."""
+        if not images_dir:
+            return []
+        if lazy:
+            return self.inventory_images(page_num)
+        return self.extract_images(page_num, Path(images_dir))
+
+    def _too_small(self, width, height) -> bool:
+        """Check an image against the area threshold using only its dimensions."""
+        return self.min_image_area > 0 and int(width or 0) * int(height or 0) < self.min_image_area
+
+    def _image_hash(self, xref: Optional[int], load_data: Callable[[], bytes]) -> Optional[str]:
+        """
+        Content hash of an image's (still encoded) stream data.
+
+        Hashes are cached per xref, so an object reused on every page is only
+        read and hashed once.
+        """
+        if not self.dedupe_images:
+            return None
+        if xref is not None and xref in self._xref_hashes:
+            return self._xref_hashes[xref]
+
+        digest = hashlib.sha1(load_data()).hexdigest()
+        if xref is not None:
+            self._xref_hashes[xref] = digest
+        return digest
+
+    def _duplicate_of(self, page_num: int, digest: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Metadata for a repeated image, pointing at the stored copy, or None if it is new."""
+        stored = self.stored_images.get(digest) if digest else None
+        if stored is None:
+            return None
+        return {
+            'page': page_num + 1,
+            'filename': stored['filename'],
+            'path': stored['path'],
+            'hash': digest,
+            'duplicate': True
+        }
+
+    def _register_image(self, page_num: int, img_name: str, img_path: Path, digest: Optional[str]) -> Dict[str, Any]:
+        """Metadata for a newly stored image."""
+        image_info = {
+            'page': page_num + 1,
+            'filename': img_name,
+            'path': str(img_path)
+        }
+        if digest:
+            image_info['hash'] = digest
+            self.stored_images[digest] = image_info
+        return image_info
+
+    def close(self):
+        """Release the underlying document."""
+
+    def __enter__(self) -> 'PdfBackend':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PypdfBackend(PdfBackend):
+    """Backend built on pypdf (or PyPDF2)."""
+
+    name = 'pypdf'
+
+    def __init__(self, pdf_path: str, **image_options):
+        super().__init__(pdf_path, **image_options)
+        self.reader = PdfReader(pdf_path)
+
+    def __len__(self) -> int:
+        return len(self.reader.pages)
+
+    def extract_text(self, page_num: int) -> Optional[str]:
+        return self.reader.pages[page_num].extract_text()
+
+    @classmethod
+    def _image_xobjects(cls, node, path: Tuple[str, ...] = (), seen: Optional[set] = None) -> Dict[Any, Any]:
+        """
+        Map the image XObjects of a page to their (undecoded) stream objects.
+
+        Images inside form XObjects are included, keyed like pypdf's
+        page.images: the image name for direct images, the tuple of form names
+        leading to it for nested ones.
+        """
+        images = {}
+        seen = set() if seen is None else seen
+        try:
+            if '/Resources' not in node or '/XObject' not in node['/Resources']:
+                return images
+            xobjects = node['/Resources']['/XObject'].get_object()
+
+            for name in xobjects:
+                obj = xobjects[name]
+                subtype = obj.get('/Subtype')
+                if subtype == '/Image':
+                    images[path + (name,) if path else name] = obj
+                elif subtype == '/Form':
+                    # Forms can be shared or even reference themselves
+                    xref = cls._xref_of(obj)
+                    if xref is not None and xref in seen:
+                        continue
+                    seen.add(xref)
+                    images.update(cls._image_xobjects(obj, path + (name,), seen))
+        except Exception:
+            pass
+        return images
+
+    @staticmethod
+    def _xref_of(obj) -> Optional[int]:
+        """Object number of a resolved PDF object, if known."""
+        reference = getattr(obj, 'indirect_reference', None) or getattr(obj, 'indirect_ref', None)
+        return getattr(reference, 'idnum', None)
+
+    def inventory_images(self, page_num: int) -> List[Dict[str, Any]]:
+        page = self.reader.pages[page_num]
+
+        try:
+            xrefs = [
+                self._xref_of(obj) for obj in self._image_xobjects(page).values()
+                if not self._too_small(obj.get('/Width'), obj.get('/Height'))
+            ]
+
+            if not xrefs:
+                return []
+
+            return [{'page': page_num + 1, 'count': len(xrefs), 'xrefs': xrefs}]
+
+        except Exception as e:
+            logger.warning(f"Failed to inventory images on page {page_num + 1}: {str(e)}")
+            return []
+
+    def extract_images(self, page_num: int, output_path: Path) -> List[Dict[str, Any]]:
+        page = self.reader.pages[page_num]
+        images_info = []
+
+        try:
+            # Extract images from page
+            if hasattr(page, 'images'):
+                # pypdf method; image XObjects (also inside forms) are filtered
+                # and hashed from their raw stream before anything is decoded
+                xobjects = self._image_xobjects(page)
+
+                for img_idx, name in enumerate(page.images.keys()):
+                    try:
+                        digest = None
+                        obj = xobjects.get(tuple(name) if isinstance(name, list) else name)
+                        if obj is not None:
+                            if self._too_small(obj.get('/Width'), obj.get('/Height')):
+                                continue
+                            digest = self._image_hash(self._xref_of(obj), lambda: obj._data)
+                            duplicate = self._duplicate_of(page_num, digest)
+                            if duplicate:
+                                images_info.append(duplicate)
+                                continue
+
+                        img_data = page.images[name].data
+
+                        # Inline images can only be hashed once decoded
+                        if digest is None and self.dedupe_images:
+                            digest = hashlib.sha1(img_data).hexdigest()
+                            duplicate = self._duplicate_of(page_num, digest)
+                            if duplicate:
+                                images_info.append(duplicate)
+                                continue
+
+                        img_name = f"page_{page_num + 1}_img_{img_idx + 1}.png"
+                        img_path = output_path / img_name
+
+                        # Save image
+                        with open(img_path, 'wb') as img_file:
+                            img_file.write(img_data)
+
+                        images_info.append(self._register_image(page_num, img_name, img_path, digest))
+
+                        logger.info(f"Extracted image: {img_name}")
+                    except Exception as e:
+                        logger.warning(f"Failed to extract image {img_idx} from page {page_num + 1}: {str(e)}")
+                        continue
+
+            # Alternative: Try XObject extraction (PyPDF2 method)
+            else:
+                for obj_idx, obj in enumerate(self._image_xobjects(page).values()):
+                    try:
+                        size = (obj['/Width'], obj['/Height'])
+                        if self._too_small(*size):
+                            continue
+
+                        digest = self._image_hash(self._xref_of(obj), lambda: obj._data)
+                        duplicate = self._duplicate_of(page_num, digest)
+                        if duplicate:
+                            images_info.append(duplicate)
+                            continue
+
+                        data = obj.get_data()
+
+                        # Determine image format
+                        if '/Filter' in obj:
+                            filter_type = obj['/Filter']
+                            if filter_type == '/DCTDecode':
+                                ext = 'jpg'
+                            elif filter_type == '/FlateDecode':
+                                ext = 'png'
+                            elif filter_type == '/JPXDecode':
+                                ext = 'jp2'
+                            else:
+                                ext = 'png'
+                        else:
+                            ext = 'png'
+
+                        img_name = f"page_{page_num + 1}_img_{obj_idx + 1}.{ext}"
+                        img_path = output_path / img_name
+
+                        # Try to save as image
+                        if ext == 'jpg' or ext == 'jp2':
+                            with open(img_path, 'wb') as img_file:
+                                img_file.write(data)
+                        else:
+                            # Convert to PNG using PIL
+                            try:
+                                image = Image.frombytes('RGB', size, data)
+                                image.save(img_path, 'PNG')
+                            except:
+                                # Fallback: save raw data
+                                with open(img_path, 'wb') as img_file:
+                                    img_file.write(data)
+
+                        images_info.append(self._register_image(page_num, img_name, img_path, digest))
+
+                        logger.info(f"Extracted image: {img_name}")
+                    except Exception as e:
+                        logger.warning(f"Failed to extract XObject image from page {page_num + 1}: {str(e)}")
+                        continue
+
+        except Exception as e:
+            logger.warning(f"Failed to process images on page {page_num + 1}: {str(e)}")
+
+        return images_info
+
+
+class PyMuPDFBackend(PdfBackend):
+    """Backend built on PyMuPDF."""
+
+    name = 'pymupdf'
+
+    def __init__(self, pdf_path: str, **image_options):
+        super().__init__(pdf_path, **image_options)
+        self.doc = fitz.open(pdf_path)
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def extract_text(self, page_num: int) -> Optional[str]:
+        return self.doc[page_num].get_text("text")
+
+    def inventory_images(self, page_num: int) -> List[Dict[str, Any]]:
+        try:
+            xrefs = [img[0] for img in self.doc[page_num].get_images(full=True) if not self._too_small(img[2], img[3])]
+            if not xrefs:
+                return []
+            return [{'page': page_num + 1, 'count': len(xrefs), 'xrefs': xrefs}]
+
+        except Exception as e:
+            logger.warning(f"Failed to inventory images on page {page_num + 1}: {str(e)}")
+            return []
+
+    def extract_images(self, page_num: int, output_path: Path) -> List[Dict[str, Any]]:
+        images_info = []
+
+        try:
+            for img_idx, img in enumerate(self.doc[page_num].get_images(full=True)):
+                try:
+                    xref, width, height = img[0], img[2], img[3]
+                    if self._too_small(width, height):
+                        continue
+
+                    digest = self._image_hash(xref, lambda: self.doc.xref_stream_raw(xref))
+                    duplicate = self._duplicate_of(page_num, digest)
+                    if duplicate:
+                        images_info.append(duplicate)
+                        continue
+
+                    base_image = self.doc.extract_image(xref)
+                    if not base_image:
+                        continue
+
+                    img_name = f"page_{page_num + 1}_img_{img_idx + 1}.{base_image['ext']}"
+                    img_path = output_path / img_name
+
+                    with open(img_path, 'wb') as img_file:
+                        img_file.write(base_image['image'])
+
+                    images_info.append(self._register_image(page_num, img_name, img_path, digest))
+
+                    logger.info(f"Extracted image: {img_name}")
+                except Exception as e:
+                    logger.warning(f"Failed to extract image {img_idx} from page {page_num + 1}: {str(e)}")
+                    continue
+
+        except Exception as e:
+            logger.warning(f"Failed to process images on page {page_num + 1}: {str(e)}")
+
+        return images_info
+
+    def close(self):
+        self.doc.close()
+
+
+PDF_BACKENDS = {
+    PypdfBackend.name: PypdfBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+
+def get_pdf_backend(name: str = 'pypdf') -> type:
+    """
+    Resolve a backend class by name, falling back to whichever is installed.
+
+    Args:
+        name: 'pypdf' or 'pymupdf'
+
+    Returns:
+        PdfBackend subclass
+    """
+    available = {
+        PypdfBackend.name: PdfReader is not None,
+        PyMuPDFBackend.name: fitz is not None,
+    }
+
+    name = (name or 'pypdf').lower()
+    if name not in PDF_BACKENDS:
+        logger.warning(f"Unknown PDF backend '{name}', using pypdf")
+        name = PypdfBackend.name
+
+    if not available[name]:
+        fallback = next(backend for backend, ok in available.items() if ok)
+        logger.warning(f"PDF backend '{name}' is not installed, using {fallback}")
+        name = fallback
+
+    return PDF_BACKENDS[name]
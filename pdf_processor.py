@@ -1,70 +1,632 @@
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple, Any
+from typing import List, Optional, Dict, Tuple, Any, Iterable, Iterator
 import re
 import io
-from PIL import Image
+import os
+from bisect import bisect_left
+from collections import deque
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
 
-try:
-    from pypdf import PdfReader
-except ImportError:
-    try:
-        from PyPDF2 import PdfReader
-    except ImportError:
-        raise ImportError("Please install pypdf or PyPDF2: pip install pypdf")
+from pdf_backends import get_pdf_backend
+from page_ranges import PageSelection, select_pages, contiguous_runs
 
 logger = logging.getLogger(__name__)
 
+# Splits on . ! ? followed by whitespace and a capital letter
+SENTENCE_ENDINGS = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Running headers/footers are learned from the first pages of a document,
+# looking only at the first and last few lines of each page
+REPEATED_LINE_SAMPLE_PAGES = 30
+REPEATED_LINE_EDGE = 3
+
+# A number in a header/footer only counts as a page counter when it equals the
+# page index give or take this many pages (front matter, cover pages); other
+# numbers (invoice numbers, dates, totals) have to repeat exactly
+PAGE_NUMBER_MAX_OFFSET = 50
+DIGITS = re.compile(r'\d+')
+
+
+def _extract_page_range(
+    pdf_path: str,
+    start: int,
+    end: int,
+    images_dir: Optional[str] = None,
+    lazy_images: bool = False,
+    backend: str = 'pypdf',
+    image_options: Optional[Dict[str, Any]] = None
+) -> List[Tuple[int, Optional[str], List[Dict[str, Any]]]]:
+    """
+    Extract raw text (and optionally images) for pages [start, end) in a worker process.
+
+    Each worker opens its own document, since parser objects cannot be
+    shared across processes.
+
+    Args:
+        pdf_path: Path to the PDF file
+        start: First page index (0-based, inclusive)
+        end: Last page index (0-based, exclusive)
+        images_dir: Directory to save embedded images to, or None to skip images
+        lazy_images: Only take an image inventory instead of writing images
+        backend: Name of the PDF backend to parse with
+        image_options: Image filtering options passed to the backend
+            (dedupe_images, min_image_area)
+
+    Returns:
+        List of (page_index, raw_text, images_info) tuples; raw_text is None on failure
+    """
+    results = []
+
+    with get_pdf_backend(backend)(pdf_path, **(image_options or {})) as document:
+        for page_num in range(start, end):
+            try:
+                page_text = document.extract_text(page_num)
+            except Exception as e:
+                logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
+                page_text = None
+
+            images_info = document.collect_images(page_num, images_dir, lazy_images)
+            results.append((page_num, page_text, images_info))
+
+    return results
+
 
 class PDFProcessor:
     """Handles PDF text extraction and chunking with robust error handling."""
 
-    def __init__(self, chunk_size: int = 400, chunk_overlap: int = 50, extract_images: bool = True):
+    def __init__(
+        self,
+        chunk_size: int = 400,
+        chunk_overlap: int = 50,
+        extract_images: bool = True,
+        workers: int = 1,
+        parallel_min_pages: int = 50,
+        lazy_images: bool = False,
+        backend: str = 'pypdf',
+        dedupe_images: bool = True,
+        min_image_area: int = 0,
+        strip_repeated_lines: bool = False,
+        repeated_line_ratio: float = 0.5,
+        chunk_unit: str = 'words',
+        tokenizer: Any = None,
+        max_tokens: Optional[int] = None
+    ):
         """
         Initialize PDF processor.
 
         Args:
-            chunk_size: Maximum number of words per chunk
-            chunk_overlap: Number of words to overlap between chunks
+            chunk_size: Maximum number of words (or tokens) per chunk
+            chunk_overlap: Number of words (or tokens) to overlap between chunks
             extract_images: Whether to extract images from PDFs
+            workers: Processes used for text extraction (0 = one per CPU, 1 = serial)
+            parallel_min_pages: PDFs with fewer pages are always extracted serially
+            lazy_images: Only record a per-page image inventory during extraction;
+                images are decoded later with materialize_images()
+            backend: PDF parsing backend, 'pypdf' or 'pymupdf' (see pdf_backends)
+            dedupe_images: Store each distinct image once; repeated occurrences
+                (logos, footer graphics) point at the stored copy
+            min_image_area: Skip decorative images smaller than this many pixels
+            strip_repeated_lines: Remove running headers/footers (lines repeated at
+                the top or bottom of most pages) before chunking; the first
+                occurrence of each is kept
+            repeated_line_ratio: Fraction of sampled pages a line must appear on
+                to count as a header/footer
+            chunk_unit: 'words', or 'tokens' to measure chunks with tokenizer
+            tokenizer: Embedder tokenizer used when chunk_unit is 'tokens'
+            max_tokens: Tokens the embedder actually sees per input; in token
+                mode chunk_size is capped to it
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.extract_images = extract_images
+        # Stored under a separate name so it does not shadow the extract_images() method
+        self.extract_images_enabled = extract_images
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.parallel_min_pages = parallel_min_pages
+        self.lazy_images = lazy_images
+        self.backend = get_pdf_backend(backend)
+        self.image_options = {'dedupe_images': dedupe_images, 'min_image_area': min_image_area}
+        self.strip_repeated_lines = strip_repeated_lines
+        self.repeated_line_ratio = repeated_line_ratio
+
+        if chunk_unit == 'tokens' and tokenizer is None:
+            logger.warning("Token chunking requested without a tokenizer, chunking by words")
+            chunk_unit = 'words'
+        self.chunk_unit = chunk_unit
+        self.tokenizer = tokenizer if chunk_unit == 'tokens' else None
+
+        if self.tokenizer is not None and max_tokens and self.chunk_size > max_tokens:
+            logger.info(f"Capping chunk size at the embedder limit of {max_tokens} tokens")
+            self.chunk_size = max_tokens
+            self.chunk_overlap = min(self.chunk_overlap, max_tokens // 2)
+
+        # Counters and image metadata for the most recent streaming run (iter_pages / iter_chunks)
+        self.stats = self._empty_stats()
+        self.images_info = []
+        self.image_inventory = []
+
+    def iter_pages(
+        self,
+        pdf_path: str,
+        images_dir: Optional[str] = None,
+        pages: PageSelection = None
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Stream cleaned text from a PDF one page at a time.
+
+        Pages are yielded as soon as they are extracted, so peak memory is
+        bounded by the page size (a few page ranges in parallel mode) rather
+        than by the whole document. When images_dir is given and image
+        extraction is enabled, embedded images are written to disk during the
+        same page visit and their metadata collected in self.images_info, so
+        the PDF is only parsed once. In lazy_images mode only a per-page
+        inventory is collected in self.image_inventory instead. stats['images']
+        counts distinct images.
+
+        With strip_repeated_lines, running headers and footers are removed
+        before cleaning; stats['lines_stripped'] counts removed lines and
+        stats['units_stripped'] their size in chunk units (see
+        iter_chunk_records for the estimated chunks this saves).
 
-    def extract_text(self, pdf_path: str) -> Optional[str]:
+        Args:
+            pdf_path: Path to the PDF file
+            images_dir: Directory to save embedded images to (optional)
+            pages: Pages to process, e.g. "1-20, 35" or a list of 1-based page
+                numbers (see page_ranges); every page if None. Other pages are
+                never parsed.
+
+        Yields:
+            Tuples of (page_number, cleaned_page_text); page numbers are 1-based
+            and pages without extractable text are skipped
         """
-        Extract text from a PDF file.
+        self.stats = self._empty_stats()
+        self.images_info = []
+        self.image_inventory = []
+
+        if not Path(pdf_path).exists():
+            logger.error(f"PDF file not found: {pdf_path}")
+            return
+
+        if images_dir and self.extract_images_enabled:
+            Path(images_dir).mkdir(parents=True, exist_ok=True)
+        else:
+            images_dir = None
+
+        # Content hash -> stored image, and inventoried xrefs, across all pages
+        stored_images = {}
+        seen_xrefs = set()
+
+        raw_pages = self._iter_raw_pages(pdf_path, images_dir, pages)
+        if self.strip_repeated_lines:
+            raw_pages = self._iter_stripped_pages(raw_pages)
+
+        for page_num, page_text, images_info in raw_pages:
+            if images_info and self.lazy_images:
+                self.image_inventory.extend(images_info)
+                for entry in images_info:
+                    for xref in entry['xrefs']:
+                        if xref is None or xref not in seen_xrefs:
+                            seen_xrefs.add(xref)
+                            self.stats['images'] += 1
+            elif images_info:
+                for image_info in images_info:
+                    image_info = self._merge_duplicate_image(image_info, stored_images)
+                    if not image_info.get('duplicate'):
+                        self.stats['images'] += 1
+                    self.images_info.append(image_info)
+
+            if not page_text:
+                continue
+
+            page_text = self._clean_text(page_text)
+            if not page_text:
+                continue
+
+            self.stats['pages'] += 1
+            self.stats['characters'] += len(page_text)
+            yield page_num + 1, page_text
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        """Fresh counters for a streaming run."""
+        return {
+            'pages': 0, 'characters': 0, 'chunks': 0, 'images': 0,
+            'lines_stripped': 0, 'units_stripped': 0,
+            'unstripped_chunks_estimate': 0, 'chunks_saved_estimate': 0
+        }
+
+    def _iter_stripped_pages(
+        self,
+        raw_pages: Iterable[Tuple[int, Optional[str], List[Dict[str, Any]]]]
+    ) -> Iterator[Tuple[int, Optional[str], List[Dict[str, Any]]]]:
+        """
+        Remove running headers and footers from a stream of raw pages.
+
+        The first REPEATED_LINE_SAMPLE_PAGES pages are buffered to learn which
+        lines repeat at the top or bottom of most pages. Lines must match
+        exactly, except for a page counter: a number that follows the page
+        index, so "Page 3 of 40" matches "Page 4 of 40" on the next page. The
+        first occurrence of each such line is kept, so a header that carries
+        an invoice number or date is not lost, and the repeats are stripped
+        from the edges of every later page. Only the removed lines are
+        measured, so the chunk saving can be estimated.
+
+        Args:
+            raw_pages: Tuples of (page_index, raw_text, images_info)
+
+        Yields:
+            The same tuples with repeated header/footer lines removed from raw_text
+        """
+        raw_pages = iter(raw_pages)
+        sample = []
+        for page in raw_pages:
+            sample.append(page)
+            if len(sample) >= REPEATED_LINE_SAMPLE_PAGES:
+                break
+
+        repeated = self._find_repeated_lines((page_num, page_text) for page_num, page_text, _ in sample)
+        if repeated:
+            logger.info(f"Stripping {len(repeated)} repeated header/footer lines")
+
+        kept = set()
+        for page_num, page_text, images_info in chain(sample, raw_pages):
+            if page_text and repeated:
+                page_text, removed = self._remove_edge_lines(page_text, page_num, repeated, kept)
+                if removed:
+                    self.stats['lines_stripped'] += len(removed)
+                    self.stats['units_stripped'] += self._sentence_size(self._clean_text(' '.join(removed)))
+            yield page_num, page_text, images_info
+
+    def _find_repeated_lines(self, pages: Iterable[Tuple[int, Optional[str]]]) -> set:
+        """
+        Find lines repeated at the top or bottom of most pages.
+
+        Args:
+            pages: Tuples of (page_index, raw_text) to learn from
+
+        Returns:
+            Set of header/footer line keys (see _line_keys; empty if too few pages)
+        """
+        counts = {}
+        num_pages = 0
+
+        for page_num, page_text in pages:
+            if not page_text:
+                continue
+            num_pages += 1
+
+            lines = [line for line in page_text.splitlines() if line.strip()]
+            keys = set()
+            for i in self._edge_indexes(len(lines)):
+                keys.update(self._line_keys(lines[i], page_num))
+            for key in keys:
+                counts[key] = counts.get(key, 0) + 1
+
+        # A line has to repeat on at least 3 pages to be told apart from content
+        min_pages = max(3, int(num_pages * self.repeated_line_ratio + 0.5))
+        return {key for key, count in counts.items() if count >= min_pages}
+
+    @staticmethod
+    def _edge_indexes(num_lines: int) -> List[int]:
+        """
+        Indexes of the top and bottom lines of a page that may hold headers/footers.
+
+        At most half the page counts as edge, so the body of a short page
+        (a single line of text, a slide title) is never treated as a header.
+        """
+        edge = min(REPEATED_LINE_EDGE, num_lines // 2)
+        return list(range(edge)) + list(range(num_lines - edge, num_lines))
+
+    @staticmethod
+    def _line_keys(line: str, page_num: int) -> List[str]:
+        """
+        Keys a header/footer line is matched by across pages.
+
+        The line itself (whitespace and case normalized), plus one key per
+        number that could be a page counter: it is replaced by its offset from
+        the page index, which stays the same from page to page.
+
+        Args:
+            line: Raw line
+            page_num: 0-based index of the page the line is on
+
+        Returns:
+            List of keys, the exact line first
+        """
+        line = ' '.join(line.split()).lower()
+        keys = [line]
+        for match in DIGITS.finditer(line):
+            offset = int(match.group(0)) - (page_num + 1)
+            if abs(offset) <= PAGE_NUMBER_MAX_OFFSET:
+                keys.append(f"{line[:match.start()]}\x00{offset}\x00{line[match.end():]}")
+        return keys
+
+    def _remove_edge_lines(self, page_text: str, page_num: int, repeated: set, kept: set) -> Tuple[str, List[str]]:
+        """
+        Remove repeated lines from the first and last lines of a page.
+
+        Args:
+            page_text: Raw page text
+            page_num: 0-based index of the page
+            repeated: Line keys to remove, from _find_repeated_lines
+            kept: Keys whose first occurrence was already kept; updated in place
+
+        Returns:
+            Tuple of (page_text, removed_lines)
+        """
+        lines = page_text.splitlines()
+        content = [i for i, line in enumerate(lines) if line.strip()]
+        edges = [content[i] for i in self._edge_indexes(len(content))]
+
+        drop = set()
+        for i in edges:
+            key = next((key for key in self._line_keys(lines[i], page_num) if key in repeated), None)
+            if key is None:
+                continue
+            if key in kept:
+                drop.add(i)
+            else:
+                # The first occurrence stays, so its content is still searchable once
+                kept.add(key)
+        if not drop:
+            return page_text, []
+
+        return (
+            '\n'.join(line for i, line in enumerate(lines) if i not in drop),
+            [lines[i] for i in sorted(drop)]
+        )
+
+    @staticmethod
+    def _merge_duplicate_image(image_info: Dict[str, Any], stored_images: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Map an image onto an identical one already stored for this document.
+
+        Each backend instance deduplicates on its own, so in parallel mode
+        every worker stores its own copy of a repeated image; the extra copies
+        are deleted here and their metadata pointed at the first one.
+
+        Args:
+            image_info: Image metadata from a backend
+            stored_images: Content hash -> metadata of the stored copy (updated in place)
+
+        Returns:
+            Image metadata, marked as a duplicate if a stored copy exists
+        """
+        digest = image_info.get('hash')
+        if not digest:
+            return image_info
+
+        stored = stored_images.get(digest)
+        if stored is None:
+            stored_images[digest] = image_info
+            return image_info
+
+        if image_info['filename'] == stored['filename']:
+            return image_info
+
+        if not image_info.get('duplicate'):
+            try:
+                Path(image_info['path']).unlink()
+            except OSError as e:
+                logger.warning(f"Failed to remove duplicate image {image_info['filename']}: {str(e)}")
+
+        return {
+            'page': image_info['page'],
+            'filename': stored['filename'],
+            'path': stored['path'],
+            'hash': digest,
+            'duplicate': True
+        }
+
+    def _open_document(self, pdf_path: str):
+        """Open a PDF with the configured backend and image options."""
+        return self.backend(pdf_path, **self.image_options)
+
+    def page_count(self, pdf_path: str) -> Optional[int]:
+        """
+        Count the pages of a PDF.
 
         Args:
             pdf_path: Path to the PDF file
 
         Returns:
-            Extracted text or None if extraction fails
+            Number of pages, or None if the PDF cannot be opened
         """
         try:
-            if not Path(pdf_path).exists():
-                logger.error(f"PDF file not found: {pdf_path}")
-                return None
+            with self._open_document(pdf_path) as document:
+                return len(document)
+        except Exception as e:
+            logger.error(f"Error opening PDF: {str(e)}")
+            return None
+
+    def _iter_raw_pages(
+        self,
+        pdf_path: str,
+        images_dir: Optional[str] = None,
+        pages: PageSelection = None
+    ) -> Iterator[Tuple[int, Optional[str], List[Dict[str, Any]]]]:
+        """
+        Yield raw (uncleaned) page text, plus extracted images, in page order.
 
-            reader = PdfReader(pdf_path)
-            text = ""
+        Large PDFs are split into page ranges and extracted in a process pool
+        when more than one worker is configured; small PDFs, or any failure
+        of the pool, fall back to serial extraction.
 
-            for page_num, page in enumerate(reader.pages):
+        Args:
+            pdf_path: Path to the PDF file
+            images_dir: Directory to save embedded images to, or None to skip images
+            pages: Page selection (see iter_pages); every page if None
+
+        Yields:
+            Tuples of (page_index, raw_text, images_info); page indexes are 0-based
+        """
+        try:
+            document = self._open_document(pdf_path)
+            total_pages = len(document)
+            page_indexes = [page - 1 for page in select_pages(pages, total_pages)]
+        except Exception as e:
+            logger.error(f"Error opening PDF: {str(e)}")
+            return
+
+        if pages is not None:
+            logger.info(f"Processing {len(page_indexes)} of {total_pages} pages")
+
+        with document:
+            next_page = 0
+
+            if self.workers > 1 and len(page_indexes) >= self.parallel_min_pages:
+                logger.info(f"Extracting {len(page_indexes)} pages with {self.workers} worker processes")
                 try:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                    for page_num, page_text, images_info in self._iter_raw_pages_parallel(pdf_path, page_indexes, images_dir):
+                        next_page = page_num + 1
+                        yield page_num, page_text, images_info
+                except Exception as e:
+                    logger.warning(f"Parallel extraction failed, continuing serially from page {next_page + 1}: {str(e)}")
+
+            for page_num in page_indexes[bisect_left(page_indexes, next_page):]:
+                try:
+                    page_text = document.extract_text(page_num)
                 except Exception as e:
                     logger.warning(f"Failed to extract text from page {page_num + 1}: {str(e)}")
-                    continue
+                    page_text = None
+
+                images_info = document.collect_images(page_num, images_dir, self.lazy_images)
+                yield page_num, page_text, images_info
+
+    def _iter_raw_pages_parallel(
+        self,
+        pdf_path: str,
+        page_indexes: List[int],
+        images_dir: Optional[str] = None
+    ) -> Iterator[Tuple[int, Optional[str], List[Dict[str, Any]]]]:
+        """
+        Extract page ranges in a process pool and merge them back in page order.
+
+        At most two ranges per worker are in flight, so results that finish
+        early do not pile up in memory while the consumer catches up.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_indexes: Sorted 0-based indexes of the pages to extract
+            images_dir: Directory to save embedded images to, or None to skip images
+
+        Yields:
+            Tuples of (page_index, raw_text, images_info) in ascending page order
+        """
+        # Several ranges per worker keeps the pool balanced when page cost varies;
+        # ranges never span pages outside the selection
+        range_size = max(1, -(-len(page_indexes) // (self.workers * 4)))
+        ranges = []
+        for first, last in contiguous_runs(page_indexes):
+            for start in range(first, last + 1, range_size):
+                ranges.append((start, min(start + range_size, last + 1)))
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            ranges_iter = iter(ranges)
+
+            for start, end in ranges_iter:
+                pending.append(pool.submit(
+                    _extract_page_range, pdf_path, start, end, images_dir,
+                    self.lazy_images, self.backend.name, self.image_options
+                ))
+                if len(pending) >= self.workers * 2:
+                    break
+
+            while pending:
+                results = pending.popleft().result()
+
+                next_range = next(ranges_iter, None)
+                if next_range is not None:
+                    pending.append(pool.submit(
+                        _extract_page_range, pdf_path, *next_range, images_dir,
+                        self.lazy_images, self.backend.name, self.image_options
+                    ))
+
+                yield from results
+
+    def iter_chunks(self, pages: Iterable[Tuple[int, str]]) -> Iterator[str]:
+        """
+        Split a stream of pages into overlapping chunks incrementally.
+
+        Chunks are emitted as soon as they are complete, so callers such as
+        QAEngine.create_index can embed them while extraction is still running.
+
+        Args:
+            pages: Iterable of (page_number, page_text) tuples, e.g. from iter_pages
+
+        Yields:
+            Text chunks
+        """
+        for record in self.iter_chunk_records(pages):
+            yield record['text']
+
+    def iter_chunk_records(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Dict[str, Any]]:
+        """
+        Split a stream of pages into overlapping chunks with provenance.
 
-            if not text.strip():
+        Character offsets refer to the cleaned document text, i.e. the page
+        texts joined by a single space exactly as returned by extract_text,
+        so text[char_start:char_end] == chunk text.
+
+        Args:
+            pages: Iterable of (page_number, page_text) tuples, e.g. from iter_pages
+
+        Yields:
+            Dictionaries with 'text', 'page_start', 'page_end', 'char_start' and 'char_end'
+        """
+        def sentences() -> Iterator[Tuple[str, Tuple[int, int, int]]]:
+            page_offset = 0
+            for page_num, page_text in pages:
+                for sent_start, sent_end in self._iter_sentence_spans(page_text):
+                    yield page_text[sent_start:sent_end], (page_num, page_offset + sent_start, page_offset + sent_end)
+                page_offset += len(page_text) + 1
+
+        for chunk_text, first, last in self._chunk_spans(sentences()):
+            self.stats['chunks'] += 1
+            yield {
+                'text': chunk_text,
+                'page_start': first[0],
+                'page_end': last[0],
+                'char_start': first[1],
+                'char_end': last[2]
+            }
+
+        logger.info(f"Streamed {self.stats['chunks']} chunks from {self.stats['pages']} pages")
+
+        if self.stats['units_stripped']:
+            # Estimated from the removed lines alone: past the first chunk, each
+            # chunk advances about chunk_size - chunk_overlap units, so the
+            # unstripped pages never have to be split and measured
+            stride = max(1, self.chunk_size - self.chunk_overlap)
+            self.stats['chunks_saved_estimate'] = round(self.stats['units_stripped'] / stride)
+            self.stats['unstripped_chunks_estimate'] = self.stats['chunks'] + self.stats['chunks_saved_estimate']
+            logger.info(
+                f"Header/footer stripping removed {self.stats['lines_stripped']} lines, "
+                f"saving an estimated {self.stats['chunks_saved_estimate']} of "
+                f"{self.stats['unstripped_chunks_estimate']} chunks"
+            )
+
+    def extract_text(self, pdf_path: str, pages: PageSelection = None) -> Optional[str]:
+        """
+        Extract text from a PDF file.
+
+        Args:
+            pdf_path: Path to the PDF file
+            pages: Pages to extract, e.g. "1-20, 35" (see page_ranges); every page if None
+
+        Returns:
+            Extracted text or None if extraction fails
+        """
+        try:
+            page_texts = [page_text for _, page_text in self.iter_pages(pdf_path, pages=pages)]
+
+            if not page_texts:
                 logger.error("No text could be extracted from the PDF")
                 return None
 
-            # Clean up the text
-            text = self._clean_text(text)
+            text = " ".join(page_texts)
 
             logger.info(f"Successfully extracted {len(text)} characters from PDF")
             return text
@@ -86,9 +648,6 @@ class PDFProcessor:
         # Remove excessive whitespace
         text = re.sub(r'\s+', ' ', text)
 
-        # Remove page numbers and headers/footers (basic cleanup)
-        text = re.sub(r'\n\d+\n', '\n', text)
-
         # Remove special characters but keep basic punctuation
         text = re.sub(r'[^\w\s.,!?;:()\-\'"]+', '', text)
 
@@ -110,50 +669,17 @@ class PDFProcessor:
                 return []
 
             # Split into sentences first
-            sentences = self._split_into_sentences(text)
+            if self.tokenizer is not None:
+                # Token mode also splits sentences longer than a whole chunk
+                sentences = [text[start:end] for start, end in self._iter_sentence_spans(text)]
+            else:
+                sentences = self._split_into_sentences(text)
 
             if not sentences:
                 logger.warning("No sentences found in text")
                 return [text]
 
-            chunks = []
-            current_chunk = []
-            current_word_count = 0
-
-            for sentence in sentences:
-                sentence_words = sentence.split()
-                sentence_word_count = len(sentence_words)
-
-                # If adding this sentence would exceed chunk size
-                if current_word_count + sentence_word_count > self.chunk_size and current_chunk:
-                    # Save current chunk
-                    chunk_text = ' '.join(current_chunk)
-                    chunks.append(chunk_text)
-
-                    # Start new chunk with overlap
-                    overlap_words = []
-                    overlap_count = 0
-
-                    # Add words from end of previous chunk for overlap
-                    for sent in reversed(current_chunk):
-                        sent_words = sent.split()
-                        if overlap_count + len(sent_words) <= self.chunk_overlap:
-                            overlap_words.insert(0, sent)
-                            overlap_count += len(sent_words)
-                        else:
-                            break
-
-                    current_chunk = overlap_words
-                    current_word_count = overlap_count
-
-                # Add sentence to current chunk
-                current_chunk.append(sentence)
-                current_word_count += sentence_word_count
-
-            # Add remaining chunk
-            if current_chunk:
-                chunk_text = ' '.join(current_chunk)
-                chunks.append(chunk_text)
+            chunks = list(self._chunk_sentences(sentences))
 
             logger.info(f"Split text into {len(chunks)} chunks")
             return chunks
@@ -162,6 +688,78 @@ class PDFProcessor:
             logger.error(f"Error splitting text into chunks: {str(e)}")
             return []
 
+    def _chunk_sentences(self, sentences: Iterable[str]) -> Iterator[str]:
+        """
+        Group a stream of sentences into overlapping chunks.
+
+        Args:
+            sentences: Iterable of sentences
+
+        Yields:
+            Text chunks
+        """
+        for chunk_text, _, _ in self._chunk_spans((sentence, None) for sentence in sentences):
+            yield chunk_text
+
+    def _chunk_spans(self, sentences: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[str, Any, Any]]:
+        """
+        Group a stream of sentences into overlapping chunks, tracking metadata.
+
+        Each sentence is measured exactly once. Running prefix sums of
+        sentence sizes turn the chunk-size check into one subtraction and the
+        overlap search into a bisect, so total cost is linear in the input
+        instead of growing with overlap x number of chunks.
+
+        Args:
+            sentences: Iterable of (sentence, metadata) tuples
+
+        Yields:
+            Tuples of (chunk_text, first_sentence_metadata, last_sentence_metadata)
+        """
+        window = []   # buffered sentences; the current chunk is window[start:]
+        meta = []     # metadata for each buffered sentence
+        prefix = [0]  # prefix[i] = size of window[:i] in words (or tokens)
+        start = 0
+
+        for sentence, sentence_meta in sentences:
+            size = self._sentence_size(sentence)
+            end = len(window)
+
+            # If adding this sentence would exceed chunk size
+            if prefix[end] - prefix[start] + size > self.chunk_size and end > start:
+                yield ' '.join(window[start:end]), meta[start], meta[end - 1]
+
+                # Overlap is the longest run of trailing sentences that fits in
+                # chunk_overlap, i.e. the first i with prefix[i] >= prefix[end] - overlap
+                start = bisect_left(prefix, prefix[end] - self.chunk_overlap, start, end)
+
+                # Drop consumed sentences once they dominate the buffer (amortised O(1))
+                if start > 1024 and start * 2 > end:
+                    base = prefix[start]
+                    del window[:start]
+                    del meta[:start]
+                    prefix = [total - base for total in prefix[start:]]
+                    start = 0
+
+            window.append(sentence)
+            meta.append(sentence_meta)
+            prefix.append(prefix[-1] + size)
+
+        # Emit remaining chunk
+        if len(window) > start:
+            yield ' '.join(window[start:]), meta[start], meta[-1]
+
+    def _sentence_size(self, sentence: str) -> int:
+        """
+        Size of a sentence in chunk units.
+
+        Whitespace-separated words by default; in token mode the embedder's
+        own word-pieces, so chunk_size matches what the model will encode.
+        """
+        if self.tokenizer is None:
+            return len(sentence.split())
+        return len(self.tokenizer(sentence, add_special_tokens=False, verbose=False)['input_ids'])
+
     def _split_into_sentences(self, text: str) -> List[str]:
         """
         Split text into sentences.
@@ -173,29 +771,96 @@ class PDFProcessor:
             List of sentences
         """
         # Simple sentence splitter using regex
-        # Splits on . ! ? followed by space and capital letter
-        sentence_endings = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
-        sentences = sentence_endings.split(text)
+        sentences = SENTENCE_ENDINGS.split(text)
 
         # Filter out empty sentences
         sentences = [s.strip() for s in sentences if s.strip()]
 
         return sentences
 
-    def extract_images(self, pdf_path: str, output_dir: str) -> List[Dict[str, Any]]:
+    def _iter_sentence_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (start, end) character spans of the sentences in text.
+
+        Produces the same sentences as _split_into_sentences, as offsets. In
+        token mode, sentences longer than chunk_size are further split at
+        word boundaries so no chunk exceeds what the embedder reads.
+
+        Args:
+            text: Text to split
+
+        Yields:
+            Tuples of (start, end) offsets into text
+        """
+        position = 0
+        for boundary in SENTENCE_ENDINGS.finditer(text):
+            yield from self._fit_spans(text, self._strip_span(text, position, boundary.start()))
+            position = boundary.end()
+        yield from self._fit_spans(text, self._strip_span(text, position, len(text)))
+
+    def _fit_spans(self, text: str, spans: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+        """
+        Split spans that exceed chunk_size tokens at word boundaries.
+
+        A no-op in word mode. No tokenizer emits more tokens than the text
+        has UTF-8 bytes, so spans that short are passed through without
+        tokenizing them here.
+        """
+        for start, end in spans:
+            if self.tokenizer is None or len(text[start:end].encode('utf-8')) <= self.chunk_size:
+                yield start, end
+                continue
+
+            if self._sentence_size(text[start:end]) <= self.chunk_size:
+                yield start, end
+                continue
+
+            piece_start = piece_end = start
+            piece_size = 0
+            for word in re.finditer(r'\S+', text[start:end]):
+                word_size = self._sentence_size(word.group())
+                if piece_size + word_size > self.chunk_size and piece_size:
+                    yield piece_start, piece_end
+                    piece_start, piece_size = start + word.start(), 0
+                piece_end = start + word.end()
+                piece_size += word_size
+            yield piece_start, piece_end
+
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Yield the span with surrounding whitespace removed, if anything is left."""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            yield start, end
+
+    def extract_images(
+        self,
+        pdf_path: str,
+        output_dir: str,
+        lazy: Optional[bool] = None,
+        pages: PageSelection = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract images from a PDF file.
 
         Args:
             pdf_path: Path to the PDF file
             output_dir: Directory to save extracted images
+            lazy: Only build a per-page image inventory without decoding or
+                writing anything (defaults to the lazy_images setting)
+            pages: Pages to take images from (see page_ranges); every page if None
 
         Returns:
-            List of dictionaries containing image metadata (page, filename, path)
+            List of dictionaries containing image metadata (page, filename, path),
+            or inventory entries (page, count, xrefs) in lazy mode
         """
         images_info = []
+        lazy = self.lazy_images if lazy is None else lazy
 
-        if not self.extract_images:
+        if not self.extract_images_enabled:
             return images_info
 
         try:
@@ -203,103 +868,82 @@ class PDFProcessor:
                 logger.error(f"PDF file not found: {pdf_path}")
                 return images_info
 
-            # Create output directory
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
+            with self._open_document(pdf_path) as document:
+                page_indexes = [page - 1 for page in select_pages(pages, len(document))]
 
-            reader = PdfReader(pdf_path)
+                if lazy:
+                    for page_num in page_indexes:
+                        images_info.extend(document.inventory_images(page_num))
 
-            for page_num, page in enumerate(reader.pages):
-                try:
-                    # Extract images from page
-                    if hasattr(page, 'images'):
-                        # pypdf method
-                        for img_idx, image in enumerate(page.images):
-                            try:
-                                img_data = image.data
-                                img_name = f"page_{page_num + 1}_img_{img_idx + 1}.png"
-                                img_path = output_path / img_name
-
-                                # Save image
-                                with open(img_path, 'wb') as img_file:
-                                    img_file.write(img_data)
-
-                                images_info.append({
-                                    'page': page_num + 1,
-                                    'filename': img_name,
-                                    'path': str(img_path)
-                                })
-
-                                logger.info(f"Extracted image: {img_name}")
-                            except Exception as e:
-                                logger.warning(f"Failed to extract image {img_idx} from page {page_num + 1}: {str(e)}")
-                                continue
-
-                    # Alternative: Try XObject extraction (PyPDF2 method)
-                    elif '/Resources' in page and '/XObject' in page['/Resources']:
-                        xObject = page['/Resources']['/XObject'].get_object()
-
-                        for obj_idx, obj_name in enumerate(xObject):
-                            obj = xObject[obj_name]
-
-                            if obj['/Subtype'] == '/Image':
-                                try:
-                                    size = (obj['/Width'], obj['/Height'])
-                                    data = obj.get_data()
-
-                                    # Determine image format
-                                    if '/Filter' in obj:
-                                        filter_type = obj['/Filter']
-                                        if filter_type == '/DCTDecode':
-                                            ext = 'jpg'
-                                        elif filter_type == '/FlateDecode':
-                                            ext = 'png'
-                                        elif filter_type == '/JPXDecode':
-                                            ext = 'jp2'
-                                        else:
-                                            ext = 'png'
-                                    else:
-                                        ext = 'png'
-
-                                    img_name = f"page_{page_num + 1}_img_{obj_idx + 1}.{ext}"
-                                    img_path = output_path / img_name
-
-                                    # Try to save as image
-                                    if ext == 'jpg' or ext == 'jp2':
-                                        with open(img_path, 'wb') as img_file:
-                                            img_file.write(data)
-                                    else:
-                                        # Convert to PNG using PIL
-                                        try:
-                                            image = Image.frombytes('RGB', size, data)
-                                            image.save(img_path, 'PNG')
-                                        except:
-                                            # Fallback: save raw data
-                                            with open(img_path, 'wb') as img_file:
-                                                img_file.write(data)
-
-                                    images_info.append({
-                                        'page': page_num + 1,
-                                        'filename': img_name,
-                                        'path': str(img_path)
-                                    })
-
-                                    logger.info(f"Extracted image: {img_name}")
-                                except Exception as e:
-                                    logger.warning(f"Failed to extract XObject image from page {page_num + 1}: {str(e)}")
-                                    continue
+                    total = sum(entry['count'] for entry in images_info)
+                    logger.info(f"Inventoried {total} images on {len(images_info)} pages (lazy mode)")
+                    return images_info
 
-                except Exception as e:
-                    logger.warning(f"Failed to process images on page {page_num + 1}: {str(e)}")
-                    continue
+                # Create output directory
+                output_path = Path(output_dir)
+                output_path.mkdir(parents=True, exist_ok=True)
+
+                for page_num in page_indexes:
+                    images_info.extend(document.extract_images(page_num, output_path))
 
-            logger.info(f"Successfully extracted {len(images_info)} images from PDF")
+            num_unique = sum(1 for info in images_info if not info.get('duplicate'))
+            logger.info(f"Successfully extracted {num_unique} images from PDF ({len(images_info) - num_unique} repeats)")
             return images_info
 
         except Exception as e:
             logger.error(f"Error extracting images from PDF: {str(e)}")
             return images_info
 
+    def materialize_images(
+        self,
+        pdf_path: str,
+        output_dir: str,
+        inventory: List[Dict[str, Any]],
+        pages: Optional[Iterable[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Decode and save images recorded in a lazy-mode inventory.
+
+        Only pages listed in the inventory (optionally narrowed to pages) are
+        visited, so serving one image does not walk the whole document.
+
+        Args:
+            pdf_path: Path to the PDF file
+            output_dir: Directory to save extracted images
+            inventory: Inventory entries from extract_images(lazy=True) or iter_pages
+            pages: Page numbers (1-based) to materialize; all inventoried pages if None
+
+        Returns:
+            List of dictionaries containing image metadata (page, filename, path)
+        """
+        images_info = []
+
+        try:
+            if not Path(pdf_path).exists():
+                logger.error(f"PDF file not found: {pdf_path}")
+                return images_info
+
+            wanted = {entry['page'] for entry in inventory}
+            if pages is not None:
+                wanted &= set(pages)
+
+            if not wanted:
+                return images_info
+
+            output_path = Path(output_dir)
+            output_path.mkdir(parents=True, exist_ok=True)
+
+            with self._open_document(pdf_path) as document:
+                for page_number in sorted(wanted):
+                    images_info.extend(document.extract_images(page_number - 1, output_path))
+
+            logger.info(f"Materialized {len(images_info)} images from {len(wanted)} pages")
+            return images_info
+
+        except Exception as e:
+            logger.error(f"Error materializing images from PDF: {str(e)}")
+            return images_info
+
     def save_text(self, text: str, output_path: str) -> bool:
         """
         Save extracted text to a file.
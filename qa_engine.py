@@ -1,12 +1,26 @@
 import logging
-import pickle
 import os
 import re
-from typing import List, Optional, Tuple
+import threading
+import time
+from itertools import chain
+from typing import List, Optional, Tuple, Iterable, Iterator, Union, Dict, Any
 import numpy as np
 import torch
 from pathlib import Path
 
+from chunk_provenance import ChunkProvenance
+from chunk_store import ChunkStore, ChunkStoreWriter
+from session_cache import SessionCache
+from text_index import SentenceIndex, SentenceIndexWriter
+from entity_index import EntityTable, EntityTableWriter, find_amounts, find_dates, find_names, context_around
+from bm25_index import BM25Index, BM25IndexWriter, reciprocal_rank_fusion, weighted_fusion
+from vector_index import choose_index, build_index, save_index, load_index
+from embedding_cache import EmbeddingCache
+from answer_cache import AnswerCache
+from quantization import quantize_model
+from embedder_backends import load_embedder_backend, embedder_backend_name
+
 try:
     import faiss
 except ImportError:
@@ -20,13 +34,36 @@ except ImportError:
 try:
     from transformers import (
         GPT2LMHeadModel, GPT2Tokenizer, pipeline,
-        AutoTokenizer, AutoModelForCausalLM, AutoModelForSeq2SeqLM
+        AutoTokenizer, AutoModelForCausalLM, AutoModelForSeq2SeqLM,
+        TextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
     )
 except ImportError:
     raise ImportError("Please install transformers: pip install transformers")
 
 logger = logging.getLogger(__name__)
 
+# Questions per forward pass of the advanced QA model in answer_questions
+QA_BATCH_SIZE = 8
+
+# Models the engine can load: sentence transformer, advanced QA pipeline, generator
+MODEL_NAMES = ('embedder', 'qa', 'generator')
+
+# Context the advanced QA model reads from the full document, in characters
+FULL_CONTEXT_QA_LENGTH = 8000
+
+# Start of the document returned when no sentence matches the question
+EXTRACTIVE_FALLBACK_LENGTH = 500
+
+
+class _CancelCriteria(StoppingCriteria):
+    """Stops a streamed generation once its consumer has gone away."""
+
+    def __init__(self, cancelled: threading.Event):
+        self.cancelled = cancelled
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.cancelled.is_set()
+
 
 class QAEngine:
     """Question-Answering engine using FAISS for retrieval and GPT-2 for generation."""
@@ -37,7 +74,23 @@ class QAEngine:
         gpt2_model: str = "./gpt2-medium",
         data_dir: str = "data",
         use_advanced_qa: bool = False,
-        advanced_qa_model: str = "distilbert-base-cased-distilled-squad"
+        advanced_qa_model: str = "distilbert-base-cased-distilled-squad",
+        cache_max_bytes: int = 512 * 1024 * 1024,
+        cache_ttl: Optional[float] = 1800,
+        retrieval_mode: str = 'dense',
+        fusion: str = 'rrf',
+        bm25_weight: float = 0.5,
+        index_type: str = 'auto',
+        index_latency_target_ms: float = 20.0,
+        index_memory_budget_mb: float = 1024.0,
+        query_cache_size: int = 1024,
+        answer_cache_size: int = 256,
+        lazy_load: bool = True,
+        quantization: str = 'none',
+        quantized_models: Optional[Iterable[str]] = None,
+        embedder_backend: str = 'pytorch',
+        advanced_qa_scope: str = 'document',
+        advanced_qa_top_k: int = 5
     ):
         """
         Initialize the QA Engine.
@@ -48,156 +101,535 @@ class QAEngine:
             data_dir: Directory to store session data
             use_advanced_qa: Use advanced QA model (DistilBERT/RoBERTa) for better answers
             advanced_qa_model: Which advanced QA model to use
+            cache_max_bytes: Memory budget for loaded session indexes and chunk stores
+            cache_ttl: Seconds a session's loaded data may sit unused before eviction
+            retrieval_mode: 'dense' (FAISS only) or 'hybrid' (FAISS fused with BM25)
+            fusion: How hybrid results are combined: 'rrf' (reciprocal rank
+                fusion) or 'weighted' (weighted sum of normalized scores)
+            bm25_weight: Weight of BM25 scores in 'weighted' fusion
+            index_type: FAISS index type: 'auto' (chosen per document by size),
+                'flat', 'hnsw' or 'ivfpq'
+            index_latency_target_ms: Per-query search latency 'auto' aims for
+            index_memory_budget_mb: Memory a session's vector index may use
+            query_cache_size: Number of query embeddings kept in the LRU cache (0 disables it)
+            answer_cache_size: Number of answers kept for repeated questions (0 disables it)
+            lazy_load: Load each model on first use (or via warmup) instead of here
+            quantization: 'none' (fp32) or 'int8' (dynamic quantization of linear
+                layers for CPU inference)
+            quantized_models: Models quantization applies to ('embedder', 'qa',
+                'generator'); all if None
+            embedder_backend: 'pytorch', or an exported graph for CPU encoding:
+                'onnx', 'torchscript' or 'auto' (onnx if onnxruntime is installed)
+            advanced_qa_scope: What the advanced QA model reads: 'document' (the
+                question's context, truncated) or 'chunks' (the top retrieved
+                chunks as one batch, best span wins)
+            advanced_qa_top_k: Chunks read per question when advanced_qa_scope is 'chunks'
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.use_advanced_qa = use_advanced_qa
-        self.qa_pipeline = None
+
+        # Loaded per-session indexes/chunk stores, so questions skip the disk
+        self.session_cache = SessionCache(max_bytes=cache_max_bytes, ttl=cache_ttl)
+
+        if retrieval_mode not in ('dense', 'hybrid'):
+            logger.warning(f"Unknown retrieval mode '{retrieval_mode}', using dense")
+            retrieval_mode = 'dense'
+        if fusion not in ('rrf', 'weighted'):
+            logger.warning(f"Unknown fusion '{fusion}', using rrf")
+            fusion = 'rrf'
+        self.retrieval_mode = retrieval_mode
+        self.fusion = fusion
+        self.bm25_weight = bm25_weight
+
+        if advanced_qa_scope not in ('document', 'chunks'):
+            logger.warning(f"Unknown advanced QA scope '{advanced_qa_scope}', using document")
+            advanced_qa_scope = 'document'
+        self.advanced_qa_scope = advanced_qa_scope
+        self.advanced_qa_top_k = max(1, advanced_qa_top_k)
+
+        self.index_type = index_type
+        self.index_latency_target_ms = index_latency_target_ms
+        self.index_memory_budget_mb = index_memory_budget_mb
+
+        # Repeated questions reuse their embedding instead of running the encoder
+        self.embedder_model_name = embedder_model
+        self.query_cache = EmbeddingCache(query_cache_size) if query_cache_size > 0 else None
+
+        # Repeated questions on an unchanged document reuse their answer
+        self.answer_cache = AnswerCache(answer_cache_size) if answer_cache_size > 0 else None
+        self.qa_model_name = advanced_qa_model
+        self.generator_model_name = gpt2_model
 
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         logger.info(f"Using device: {self.device}")
 
-        # Initialize models
-        self._load_models(embedder_model, gpt2_model, advanced_qa_model)
+        # Generator type follows from its name, so it is known before loading
+        generator_name = (gpt2_model or 'none').lower()
+        self.is_seq2seq = 't5' in generator_name or 'flan' in generator_name
+        self.is_gpt_oss = 'gpt-oss' in generator_name
+
+        # Models load on first use, each behind its own lock
+        self._embedder = None
+        self._qa_pipeline = None
+        self._tokenizer = None
+        self._model = None
+        self._model_loaders = {
+            'embedder': self._load_embedder,
+            'qa': self._load_qa_pipeline,
+            'generator': self._load_generator,
+        }
+        self._model_locks = {name: threading.Lock() for name in MODEL_NAMES}
+        self.quantization = quantization
+        self.quantized_models = set(MODEL_NAMES if quantized_models is None else quantized_models)
+        self.embedder_backend = embedder_backend
+        self._model_status = {
+            name: {'name': model_name, 'state': 'not_loaded', 'load_seconds': None, 'error': None,
+                   'precision': 'int8' if quantization == 'int8' and name in self.quantized_models else 'fp32'}
+            for name, model_name in zip(MODEL_NAMES, (embedder_model, advanced_qa_model, gpt2_model))
+        }
+        self._model_status['embedder']['backend'] = embedder_backend
+        if not use_advanced_qa:
+            self._model_status['qa']['state'] = 'disabled'
+        if generator_name == 'none':
+            self._model_status['generator']['state'] = 'disabled'
+            logger.info("Skipping generator model (not needed for extractive mode)")
+
+        if not lazy_load:
+            self.warmup()
+            failed = [name for name, status in self._model_status.items() if status['state'] == 'failed']
+            if failed:
+                raise RuntimeError(f"Failed to load models: {', '.join(failed)}")
+
+    def _load_embedder(self):
+        """Load the sentence transformer."""
+        logger.info("Loading sentence transformer model...")
+        embedder = SentenceTransformer(self.embedder_model_name)
+        embedder = self._quantize('embedder', embedder)
+        # Exports are cached next to the model, or under data_dir for hub models
+        embedder = load_embedder_backend(
+            embedder, self.embedder_backend, self.embedder_model_name,
+            fallback_dir=self.data_dir / 'embedders'
+        )
+        self._model_status['embedder']['backend'] = embedder_backend_name(embedder)
+        self._embedder = embedder
+        logger.info("Sentence transformer loaded successfully")
+
+    def _load_qa_pipeline(self):
+        """Load the advanced extractive QA model."""
+        logger.info(f"Loading advanced QA model: {self.qa_model_name}...")
+        qa_pipeline = pipeline(
+            "question-answering",
+            model=self.qa_model_name,
+            tokenizer=self.qa_model_name,
+            device=0 if self.device.type == "cuda" else -1
+        )
+        qa_pipeline.model = self._quantize('qa', qa_pipeline.model)
+        self._qa_pipeline = qa_pipeline
+        logger.info("Advanced QA model loaded successfully")
+
+    def _load_generator(self):
+        """Load the generator model and its tokenizer."""
+        gpt2_model = self.generator_model_name
+        logger.info(f"Loading generator model: {gpt2_model}...")
+
+        # Determine model path (local or HuggingFace)
+        model_path = gpt2_model
+        local_path = Path(gpt2_model.replace('/', '--'))
+
+        if local_path.exists():
+            model_path = str(local_path)
+            logger.info(f"Loading from local path: {model_path}")
+        elif not Path(gpt2_model).exists():
+            logger.info(f"Local model not found, will download from HuggingFace")
+
+        # Check if model needs trust_remote_code (Gemma 3, Phi-3, GPT-OSS, etc.)
+        needs_trust = 'gemma-3' in gpt2_model.lower() or 'gemma3' in gpt2_model.lower() or self.is_gpt_oss
+
+        if self.is_seq2seq:
+            # T5/FLAN-T5 models (seq2seq)
+            tokenizer = AutoTokenizer.from_pretrained(
+                model_path,
+                trust_remote_code=needs_trust
+            )
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                model_path,
+                trust_remote_code=needs_trust
+            )
+            logger.info("Loaded as Seq2Seq model (T5/FLAN-T5)")
+        else:
+            # GPT-2, OPT, Llama, Phi, StableLM, Gemma (causal LM)
+            tokenizer = AutoTokenizer.from_pretrained(
+                model_path,
+                trust_remote_code=needs_trust
+            )
+            model = AutoModelForCausalLM.from_pretrained(
+                model_path,
+                trust_remote_code=needs_trust
+            )
+            logger.info("Loaded as Causal LM model")
 
-    def _load_models(self, embedder_model: str, gpt2_model: str, advanced_qa_model: str):
-        """Load the embedding and generation models."""
-        try:
-            logger.info("Loading sentence transformer model...")
-            self.embedder = SentenceTransformer(embedder_model)
-            logger.info("Sentence transformer loaded successfully")
-
-            # Load advanced QA model if requested
-            if self.use_advanced_qa:
-                logger.info(f"Loading advanced QA model: {advanced_qa_model}...")
-                self.qa_pipeline = pipeline(
-                    "question-answering",
-                    model=advanced_qa_model,
-                    tokenizer=advanced_qa_model,
-                    device=0 if self.device.type == "cuda" else -1
-                )
-                logger.info("Advanced QA model loaded successfully")
+        # Set pad token if not present
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
 
-            # Load generator model only if not "none"
-            if gpt2_model and gpt2_model.lower() != "none":
-                logger.info(f"Loading generator model: {gpt2_model}...")
+        model.to(self.device)
+        model.eval()
+        model = self._quantize('generator', model)
 
-                # Determine model path (local or HuggingFace)
-                model_path = gpt2_model
-                local_path = Path(gpt2_model.replace('/', '--'))
+        # Published together so other threads never see a model without its tokenizer
+        self._tokenizer = tokenizer
+        self._model = model
+        logger.info("Generator model loaded successfully")
 
-                if local_path.exists():
-                    model_path = str(local_path)
-                    logger.info(f"Loading from local path: {model_path}")
-                elif not Path(gpt2_model).exists():
-                    logger.info(f"Local model not found, will download from HuggingFace")
+    def _quantize(self, name: str, model: Any) -> Any:
+        """Apply the configured quantization to a freshly loaded model."""
+        if name not in self.quantized_models:
+            return model
 
-                # Detect model type and load appropriately
-                self.is_seq2seq = 't5' in gpt2_model.lower() or 'flan' in gpt2_model.lower()
+        model, quantized = quantize_model(model, self.quantization, self.device, label=f"{name} model")
+        # Int8 may be unavailable (e.g. on GPU), in which case the model stays fp32
+        self._model_status[name]['precision'] = 'int8' if quantized else 'fp32'
+        return model
 
-                # Check if it's GPT-OSS model (special handling)
-                self.is_gpt_oss = 'gpt-oss' in gpt2_model.lower()
+    def _ensure_model(self, name: str):
+        """
+        Load a model if it has not been loaded yet.
 
-                # Check if model needs trust_remote_code (Gemma 3, Phi-3, GPT-OSS, etc.)
-                needs_trust = 'gemma-3' in gpt2_model.lower() or 'gemma3' in gpt2_model.lower() or self.is_gpt_oss
+        Concurrent callers wait for a single load. A failed load is logged
+        and not retried on use (warmup retries it), so a broken optional
+        model does not slow down every question.
 
-                if self.is_seq2seq:
-                    # T5/FLAN-T5 models (seq2seq)
-                    self.tokenizer = AutoTokenizer.from_pretrained(
-                        model_path,
-                        trust_remote_code=needs_trust
-                    )
-                    self.model = AutoModelForSeq2SeqLM.from_pretrained(
-                        model_path,
-                        trust_remote_code=needs_trust
-                    )
-                    logger.info("Loaded as Seq2Seq model (T5/FLAN-T5)")
-                else:
-                    # GPT-2, OPT, Llama, Phi, StableLM, Gemma (causal LM)
-                    self.tokenizer = AutoTokenizer.from_pretrained(
-                        model_path,
-                        trust_remote_code=needs_trust
-                    )
-                    self.model = AutoModelForCausalLM.from_pretrained(
-                        model_path,
-                        trust_remote_code=needs_trust
-                    )
-                    logger.info("Loaded as Causal LM model")
+        Args:
+            name: 'embedder', 'qa' or 'generator'
+        """
+        status = self._model_status[name]
+        if status['state'] in ('ready', 'disabled', 'failed'):
+            return
+
+        with self._model_locks[name]:
+            if status['state'] in ('ready', 'disabled', 'failed'):
+                return
+
+            status['state'] = 'loading'
+            start_time = time.perf_counter()
+            try:
+                self._model_loaders[name]()
+                status['load_seconds'] = round(time.perf_counter() - start_time, 3)
+                status['error'] = None
+                status['state'] = 'ready'
+            except Exception as e:
+                logger.error(f"Error loading {name} model: {str(e)}")
+                status['error'] = str(e)
+                status['state'] = 'failed'
+
+    @property
+    def embedder(self):
+        """Sentence transformer, loaded on first use."""
+        self._ensure_model('embedder')
+        if self._embedder is None:
+            raise RuntimeError(f"Embedding model failed to load: {self._model_status['embedder']['error']}")
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, value):
+        self._embedder = value
+        self._model_status['embedder']['state'] = 'ready'
+
+    @property
+    def qa_pipeline(self):
+        """Advanced QA pipeline, loaded on first use (None if disabled or failed)."""
+        self._ensure_model('qa')
+        return self._qa_pipeline
+
+    @qa_pipeline.setter
+    def qa_pipeline(self, value):
+        self._qa_pipeline = value
+        self._model_status['qa']['state'] = 'ready' if value is not None else 'disabled'
+
+    @property
+    def model(self):
+        """Generator model, loaded on first use (None if disabled or failed)."""
+        self._ensure_model('generator')
+        return self._model
+
+    @model.setter
+    def model(self, value):
+        self._model = value
+        self._model_status['generator']['state'] = 'ready' if value is not None else 'disabled'
+
+    @property
+    def tokenizer(self):
+        """Generator tokenizer, loaded with the generator model."""
+        self._ensure_model('generator')
+        return self._tokenizer
+
+    @tokenizer.setter
+    def tokenizer(self, value):
+        self._tokenizer = value
+
+    def warmup(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Load models ahead of the first question.
 
-                # Set pad token if not present
-                if self.tokenizer.pad_token is None:
-                    self.tokenizer.pad_token = self.tokenizer.eos_token
+        Models that previously failed to load are retried.
 
-                self.model.to(self.device)
-                self.model.eval()
-                logger.info("Generator model loaded successfully")
-            else:
-                logger.info("Skipping generator model (not needed for extractive mode)")
-                self.tokenizer = None
-                self.model = None
-                self.is_seq2seq = False
-                self.is_gpt_oss = False
+        Args:
+            names: Models to load ('embedder', 'qa', 'generator'); all enabled
+                models if None
 
-            self.models_loaded = True
+        Returns:
+            Status of the requested models (see model_status)
+        """
+        names = list(MODEL_NAMES if names is None else names)
+        unknown = [name for name in names if name not in MODEL_NAMES]
+        if unknown:
+            raise ValueError(f"Unknown models: {', '.join(unknown)}")
 
-        except Exception as e:
-            logger.error(f"Error loading models: {str(e)}")
-            self.models_loaded = False
-            raise
+        for name in names:
+            with self._model_locks[name]:
+                if self._model_status[name]['state'] == 'failed':
+                    self._model_status[name]['state'] = 'not_loaded'
+            self._ensure_model(name)
+
+        return {name: dict(self._model_status[name]) for name in names}
+
+    def model_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model readiness.
+
+        Returns:
+            Dictionary of model -> {'name', 'state', 'load_seconds', 'error'};
+            state is 'not_loaded', 'loading', 'ready', 'failed' or 'disabled'
+        """
+        return {name: dict(status) for name, status in self._model_status.items()}
 
     def is_ready(self) -> bool:
-        """Check if models are loaded and ready."""
-        return self.models_loaded
+        """Check that no model has failed to load (others load on first use)."""
+        return all(status['state'] != 'failed' for status in self._model_status.values())
+
+    def get_embedder_tokenizer(self) -> Tuple[Any, int]:
+        """
+        Get the embedder's tokenizer and how many tokens of a chunk it embeds.
 
-    def create_index(self, chunks: List[str], session_id: str) -> bool:
+        Returns:
+            Tuple of (tokenizer, max_tokens); max_tokens is the model's
+            max_seq_length minus the special tokens it adds to every input
+        """
+        tokenizer = self.embedder.tokenizer
+        special_tokens = tokenizer.num_special_tokens_to_add() if hasattr(tokenizer, 'num_special_tokens_to_add') else 2
+        return tokenizer, self.embedder.max_seq_length - special_tokens
+
+    def create_index(
+        self,
+        chunks: Iterable[Union[str, Dict[str, Any]]],
+        session_id: str,
+        batch_size: int = 64
+    ) -> bool:
         """
         Create FAISS index from text chunks.
 
+        Chunks may be a list or a lazy stream (e.g. PDFProcessor.iter_chunks);
+        they are embedded in batches as they arrive so extraction, chunking
+        and embedding overlap instead of running one after another. Chunk
+        records from PDFProcessor.iter_chunk_records additionally store page
+        and character-offset provenance next to the index. A sentence table
+        and keyword inverted index for extractive answers are built in the
+        same pass, as are a BM25 index for hybrid retrieval and an entity
+        table of amounts, dates and names.
+
         Args:
-            chunks: List of text chunks
+            chunks: Iterable of text chunks or chunk records
             session_id: Unique session identifier
+            batch_size: Number of chunks to embed per encoder call
 
         Returns:
             True if successful, False otherwise
         """
+        chunks_path = self.data_dir / f"{session_id}_chunks.bin"
+        index_path = self.data_dir / f"{session_id}_index.faiss"
+        provenance_path = self.data_dir / f"{session_id}_provenance.npz"
+        sentences_path = self.data_dir / f"{session_id}_sentences.bin"
+        sentence_index_path = self.data_dir / f"{session_id}_sentence_index.npz"
+        entities_path = self.data_dir / f"{session_id}_entities.json"
+        bm25_path = self.data_dir / f"{session_id}_bm25.npz"
+
+        # Release any loaded copy of a previous index for this session first
+        self.session_cache.invalidate(session_id)
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate(session_id)
+
         try:
-            if not chunks:
-                logger.error("Cannot create index from empty chunks")
-                return False
+            index = None
+            provenance_rows = []
+
+            # Chunks are written straight to the chunk store as they are embedded
+            with ChunkStoreWriter(chunks_path) as store, \
+                    SentenceIndexWriter(sentences_path, sentence_index_path) as sentence_index, \
+                    BM25IndexWriter(bm25_path) as bm25, \
+                    EntityTableWriter(entities_path) as entities:
+                for batch in self._batched(chunks, batch_size):
+                    if isinstance(batch[0], dict):
+                        provenance_rows.extend(
+                            (r['page_start'], r['page_end'], r['char_start'], r['char_end']) for r in batch
+                        )
+                        batch = [record['text'] for record in batch]
+
+                    # Create embeddings
+                    embeddings = self.embedder.encode(
+                        batch,
+                        show_progress_bar=False,
+                        convert_to_numpy=True
+                    )
 
-            logger.info(f"Creating embeddings for {len(chunks)} chunks...")
+                    # Normalize embeddings for cosine similarity
+                    embeddings = self._normalize_embeddings(embeddings)
 
-            # Create embeddings
-            embeddings = self.embedder.encode(
-                chunks,
-                show_progress_bar=False,
-                convert_to_numpy=True
-            )
+                    if index is None:
+                        dimension = embeddings.shape[1]
+                        index = faiss.IndexFlatIP(dimension)  # Inner Product for cosine similarity
 
-            # Normalize embeddings for cosine similarity
-            embeddings = self._normalize_embeddings(embeddings)
+                    index.add(embeddings)
+                    for chunk in batch:
+                        store.append(chunk)
+                        sentence_index.add_chunk(chunk)
+                        bm25.add_chunk(chunk)
+                        entities.add_chunk(chunk)
+                    logger.info(f"Embedded {len(store)} chunks so far...")
 
-            # Create FAISS index
-            dimension = embeddings.shape[1]
-            index = faiss.IndexFlatIP(dimension)  # Inner Product for cosine similarity
-            index.add(embeddings)
+                num_chunks = len(store)
 
-            # Save chunks and index
-            chunks_path = self.data_dir / f"{session_id}_chunks.pkl"
-            index_path = self.data_dir / f"{session_id}_index.faiss"
+            if index is None:
+                logger.error("Cannot create index from empty chunks")
+                for path in (chunks_path, sentences_path, sentence_index_path, bm25_path, entities_path):
+                    path.unlink()
+                return False
 
-            with open(chunks_path, 'wb') as f:
-                pickle.dump(chunks, f)
+            # Embeddings stream into an exact index since the final size is only
+            # known now; large documents are then rebuilt as an ANN index
+            params = choose_index(
+                index.ntotal, index.d, self.index_type,
+                self.index_latency_target_ms, self.index_memory_budget_mb
+            )
+            if params['type'] != 'flat':
+                index = build_index(index.reconstruct_n(0, index.ntotal), params)
+            save_index(index, index_path, params)
+            logger.info(f"Using {params['type']} vector index for {index.ntotal} chunks")
 
-            faiss.write_index(index, str(index_path))
+            logger.info(f"Extracted entities: {entities.table.counts()}")
 
-            logger.info(f"Created index with {len(chunks)} chunks for session {session_id}")
+            if provenance_rows:
+                ChunkProvenance(*np.array(provenance_rows, dtype=np.int64).T).save(provenance_path)
+            elif provenance_path.exists():
+                provenance_path.unlink()
+
+            logger.info(f"Created index with {num_chunks} chunks for session {session_id}")
             return True
 
         except Exception as e:
             logger.error(f"Error creating index: {str(e)}")
             return False
 
+        finally:
+            # Questions asked while indexing may have loaded the old files (or a
+            # mix of old and new) and cached answers from them; drop those now
+            # that the files are written
+            self.session_cache.invalidate(session_id)
+            if self.answer_cache is not None:
+                self.answer_cache.invalidate(session_id)
+
+    @staticmethod
+    def _batched(items: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+        """Group an iterable into lists of at most batch_size items."""
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _load_index(self, session_id: str):
+        """Get a session's FAISS index through the session cache."""
+        def load():
+            index_path = self.data_dir / f"{session_id}_index.faiss"
+            index = load_index(index_path)
+            return index, index_path.stat().st_size if index is not None else 0
+
+        return self.session_cache.get(session_id, 'index', load)
+
+    def _load_chunks(self, session_id: str) -> Optional[ChunkStore]:
+        """Get a session's chunk store through the session cache."""
+        def load():
+            chunks = ChunkStore.open(self.data_dir / f"{session_id}_chunks.bin")
+            return chunks, chunks.nbytes if chunks is not None else 0
+
+        return self.session_cache.get(session_id, 'chunks', load)
+
+    def _load_provenance(self, session_id: str) -> Optional[ChunkProvenance]:
+        """Get a session's chunk provenance table through the session cache."""
+        def load():
+            provenance = ChunkProvenance.load(self.data_dir / f"{session_id}_provenance.npz")
+            if provenance is None:
+                return None, 0
+            nbytes = sum(array.nbytes for array in (
+                provenance.page_start, provenance.page_end, provenance.char_start,
+                provenance.char_end, provenance.first_chunk, provenance.last_chunk
+            ))
+            return provenance, nbytes
+
+        return self.session_cache.get(session_id, 'provenance', load)
+
+    def _load_sentence_index(self, session_id: str) -> Optional[SentenceIndex]:
+        """Get a session's sentence inverted index through the session cache."""
+        def load():
+            sentence_index = SentenceIndex.load(
+                self.data_dir / f"{session_id}_sentences.bin",
+                self.data_dir / f"{session_id}_sentence_index.npz"
+            )
+            return sentence_index, sentence_index.nbytes if sentence_index is not None else 0
+
+        return self.session_cache.get(session_id, 'sentences', load)
+
+    def _load_bm25(self, session_id: str) -> Optional[BM25Index]:
+        """Get a session's BM25 index through the session cache."""
+        def load():
+            bm25 = BM25Index.load(self.data_dir / f"{session_id}_bm25.npz")
+            return bm25, bm25.nbytes if bm25 is not None else 0
+
+        return self.session_cache.get(session_id, 'bm25', load)
+
+    def _load_entities(self, session_id: str) -> Optional[EntityTable]:
+        """Get a session's entity table through the session cache."""
+        def load():
+            entities_path = self.data_dir / f"{session_id}_entities.json"
+            entities = EntityTable.load(entities_path)
+            return entities, entities_path.stat().st_size if entities is not None else 0
+
+        return self.session_cache.get(session_id, 'entities', load)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters of the session cache."""
+        return self.session_cache.stats()
+
+    def answer_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get answer cache counters (None if the cache is disabled)."""
+        return self.answer_cache.stats() if self.answer_cache is not None else None
+
+    def query_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get hit/miss counters of the query embedding cache (None if disabled)."""
+        return self.query_cache.stats() if self.query_cache is not None else None
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, through the query embedding cache when enabled."""
+        def encode(texts):
+            return self.embedder.encode(texts, convert_to_numpy=True)
+
+        if self.query_cache is None:
+            return encode(queries)
+        return self.query_cache.encode(queries, self.embedder_model_name, encode)
+
     def _normalize_embeddings(self, embeddings: np.ndarray) -> np.ndarray:
         """Normalize embeddings to unit length."""
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
@@ -208,57 +640,166 @@ class QAEngine:
         query: str,
         session_id: str,
         top_k: int = 3,
-        score_threshold: float = 0.3
-    ) -> Optional[List[Tuple[str, float]]]:
+        score_threshold: float = 0.3,
+        include_pages: bool = False
+    ) -> Optional[List[Tuple]]:
         """
         Retrieve relevant chunks for a query with similarity scores.
 
+        In hybrid retrieval mode the dense results above score_threshold are
+        fused with the BM25 results, and scores are fusion scores.
+
         Args:
             query: User question
             session_id: Session identifier
             top_k: Number of chunks to retrieve
             score_threshold: Minimum similarity score to include chunk
+            include_pages: Also return the (first_page, last_page) each chunk came
+                from, or None if the session has no provenance
+
+        Returns:
+            List of tuples (chunk, score), or (chunk, score, pages) when
+            include_pages is True, or None if error
+        """
+        results = self.get_relevant_chunks_batch([query], session_id, top_k, score_threshold, include_pages)
+        return results[0] if results is not None else None
+
+    def get_relevant_chunks_batch(
+        self,
+        queries: List[str],
+        session_id: str,
+        top_k: int = 3,
+        score_threshold: float = 0.3,
+        include_pages: bool = False
+    ) -> Optional[List[List[Tuple]]]:
+        """
+        Retrieve relevant chunks for several queries with one embedding batch
+        and one FAISS search.
+
+        Args:
+            queries: User questions
+            session_id: Session identifier
+            top_k: Number of chunks to retrieve per query
+            score_threshold: Minimum similarity score to include chunk
+            include_pages: Also return the page range of each chunk
 
         Returns:
-            List of tuples (chunk, score) or None if error
+            One get_relevant_chunks result list per query, in order, or None if error
         """
         try:
-            # Load session data
-            chunks_path = self.data_dir / f"{session_id}_chunks.pkl"
-            index_path = self.data_dir / f"{session_id}_index.faiss"
+            # Load session data (cached in memory after the first question)
+            index = self._load_index(session_id)
+            chunks = self._load_chunks(session_id)
 
-            if not chunks_path.exists() or not index_path.exists():
+            if index is None or chunks is None:
                 logger.error(f"Session data not found for {session_id}")
                 return None
 
-            with open(chunks_path, 'rb') as f:
-                chunks = pickle.load(f)
-
-            index = faiss.read_index(str(index_path))
+            if not queries:
+                return []
 
-            # Create query embedding
-            query_embedding = self.embedder.encode([query], convert_to_numpy=True)
-            query_embedding = self._normalize_embeddings(query_embedding)
+            # Create query embeddings
+            query_embeddings = self._normalize_embeddings(self._encode_queries(queries))
 
             # Search - get more chunks initially
-            search_k = min(len(chunks), max(top_k * 2, 10))
-            scores, indices = index.search(query_embedding, search_k)
+            search_k = min(index.ntotal, max(top_k * 2, 10))
+            scores, indices = index.search(query_embeddings, search_k)
+
+            provenance = self._load_provenance(session_id) if include_pages else None
+
+            results = []
+            for query, row_scores, row_indices in zip(queries, scores, indices):
+                # Filter by score threshold (approximate indexes pad missing results with -1)
+                hits = [
+                    (int(idx), float(score)) for score, idx in zip(row_scores, row_indices)
+                    if idx >= 0 and score >= score_threshold
+                ]
+
+                if self.retrieval_mode == 'hybrid':
+                    hits = self._fuse_with_bm25(query, session_id, hits, search_k)
+
+                # If no chunks meet threshold, take top k anyway
+                if not hits:
+                    hits = [(int(i), float(s)) for s, i in zip(row_scores[:top_k], row_indices[:top_k]) if i >= 0]
+
+                # Only the hit chunks are read from the memory-mapped store
+                if include_pages:
+                    results.append([
+                        (chunks[idx], score, provenance.pages(idx) if provenance is not None else None)
+                        for idx, score in hits
+                    ])
+                else:
+                    results.append([(chunks[idx], score) for idx, score in hits])
+
+            logger.info(
+                f"Retrieved {sum(len(r) for r in results)} chunks for {len(queries)} "
+                f"{'query' if len(queries) == 1 else 'queries'} (threshold: {score_threshold})"
+            )
+            return results
+
+        except Exception as e:
+            logger.error(f"Error retrieving chunks: {str(e)}")
+            return None
 
-            # Filter by score threshold and get chunks with scores
-            relevant_chunks = []
-            for score, idx in zip(scores[0], indices[0]):
-                if score >= score_threshold:
-                    relevant_chunks.append((chunks[idx], float(score)))
+    def _fuse_with_bm25(
+        self,
+        query: str,
+        session_id: str,
+        dense_hits: List[Tuple[int, float]],
+        search_k: int
+    ) -> List[Tuple[int, float]]:
+        """
+        Fuse dense hits with BM25 results for the same query.
 
-            # If no chunks meet threshold, take top k anyway
-            if not relevant_chunks:
-                relevant_chunks = [(chunks[i], float(s)) for s, i in zip(scores[0][:top_k], indices[0][:top_k])]
+        Args:
+            query: User question
+            session_id: Session identifier
+            dense_hits: (chunk_id, cosine similarity), best first
+            search_k: Number of results to keep
 
-            logger.info(f"Retrieved {len(relevant_chunks)} chunks for query (threshold: {score_threshold})")
-            return relevant_chunks
+        Returns:
+            Fused (chunk_id, score) list, best first; dense_hits unchanged if
+            the session has no BM25 index
+        """
+        bm25 = self._load_bm25(session_id)
+        if bm25 is None:
+            return dense_hits
+
+        lexical_hits = bm25.search(query, search_k)
+        if self.fusion == 'weighted':
+            fused = weighted_fusion(dense_hits, lexical_hits, self.bm25_weight)
+        else:
+            fused = reciprocal_rank_fusion([
+                [idx for idx, _ in dense_hits],
+                [idx for idx, _ in lexical_hits]
+            ])
+
+        return fused[:search_k]
+
+    def get_chunks_for_pages(self, session_id: str, first_page: int, last_page: int) -> Optional[List[str]]:
+        """
+        Get the chunks that overlap a page range, using the provenance table.
+
+        Args:
+            session_id: Session identifier
+            first_page: First page (1-based, inclusive)
+            last_page: Last page (1-based, inclusive)
+
+        Returns:
+            List of chunks in document order or None if error
+        """
+        try:
+            chunks = self._load_chunks(session_id)
+            provenance = self._load_provenance(session_id)
+
+            if chunks is None or provenance is None:
+                logger.error(f"Session provenance not found for {session_id}")
+                return None
+
+            return [chunks[idx] for idx in provenance.chunks_for_pages(first_page, last_page)]
 
         except Exception as e:
-            logger.error(f"Error retrieving chunks: {str(e)}")
+            logger.error(f"Error retrieving chunks for pages: {str(e)}")
             return None
 
     def get_all_chunks(self, session_id: str) -> Optional[str]:
@@ -272,15 +813,12 @@ class QAEngine:
             Full document text or None if error
         """
         try:
-            chunks_path = self.data_dir / f"{session_id}_chunks.pkl"
+            chunks = self._load_chunks(session_id)
 
-            if not chunks_path.exists():
+            if chunks is None:
                 logger.error(f"Session data not found for {session_id}")
                 return None
 
-            with open(chunks_path, 'rb') as f:
-                chunks = pickle.load(f)
-
             # Combine all chunks into full text
             full_text = " ".join(chunks)
             logger.info(f"Retrieved full document with {len(chunks)} chunks")
@@ -290,6 +828,68 @@ class QAEngine:
             logger.error(f"Error retrieving full document: {str(e)}")
             return None
 
+    def _document_head(self, session_id: str, length: int) -> Optional[str]:
+        """
+        Get the first characters of the full document text.
+
+        Reads chunks from the start only until length characters are covered,
+        so this is usually chunk 0 alone.
+
+        Args:
+            session_id: Session identifier
+            length: Number of characters wanted
+
+        Returns:
+            get_all_chunks(session_id)[:length] or None if error
+        """
+        try:
+            chunks = self._load_chunks(session_id)
+
+            if chunks is None:
+                logger.error(f"Session data not found for {session_id}")
+                return None
+
+            head = []
+            head_length = -1
+            for chunk in chunks:
+                if head_length >= length:
+                    break
+                head.append(chunk)
+                head_length += len(chunk) + 1
+            return " ".join(head)[:length]
+
+        except Exception as e:
+            logger.error(f"Error retrieving start of document: {str(e)}")
+            return None
+
+    def _document_context(
+        self,
+        session_id: str,
+        question: str,
+        max_length: int,
+        sentence_index: SentenceIndex
+    ) -> Optional[str]:
+        """
+        Full-document context for a question, truncated like _smart_truncate.
+
+        Built from the sentence index and the start of the document, so the
+        full text is never joined: a document that fits in max_length is
+        returned whole, otherwise the best-scoring sentences are.
+
+        Args:
+            session_id: Session identifier
+            question: User's question
+            max_length: Maximum character length
+            sentence_index: Sentence index of the document
+
+        Returns:
+            Context text or None if error
+        """
+        head = self._document_head(session_id, max_length + 1)
+        if not head:
+            return None
+        return self._smart_truncate(head, question, max_length, sentence_index)
+
     def answer_question(
         self,
         question: str,
@@ -317,62 +917,351 @@ class QAEngine:
         Returns:
             Generated answer or None if error
         """
+        return self.answer_question_with_cache_info(
+            question, session_id, use_extractive, use_full_context,
+            max_new_tokens, temperature, top_k, top_p
+        )[0]
+
+    def answer_question_with_cache_info(
+        self,
+        question: str,
+        session_id: str,
+        use_extractive: bool = True,
+        use_full_context: bool = True,
+        max_new_tokens: int = 150,
+        temperature: float = 0.7,
+        top_k: int = 50,
+        top_p: float = 0.92
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Answer a question like answer_question, also reporting whether the
+        answer came from the answer cache.
+
+        Returns:
+            Tuple of (answer or None if error, True if served from the cache)
+        """
+        answers, cached = self._answer_questions_cached(
+            [question], session_id, use_extractive, use_full_context,
+            max_new_tokens, temperature, top_k, top_p
+        )
+        return answers[0], cached[0]
+
+    def answer_question_stream(
+        self,
+        question: str,
+        session_id: str,
+        use_extractive: bool = True,
+        use_full_context: bool = True,
+        max_new_tokens: int = 150,
+        temperature: float = 0.7,
+        top_k: int = 50,
+        top_p: float = 0.92
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a question, streaming generated text as it is produced.
+
+        Only generative answers are streamed token by token; extractive,
+        conversational and cached answers arrive as a single piece.
+
+        Args:
+            question: User question
+            session_id: Session identifier
+            use_extractive: If True, return relevant chunks directly (more accurate)
+            use_full_context: If True, use full document for QA (better accuracy)
+            max_new_tokens: Maximum tokens to generate (if use_extractive=False)
+            temperature: Sampling temperature
+            top_k: Top-k sampling parameter
+            top_p: Top-p (nucleus) sampling parameter
+
+        Yields:
+            {'token': text} for each piece of the answer, then a final
+            {'answer': cleaned answer or None, 'cached': bool}
+        """
+        if use_extractive or self.model is None or self._is_conversational_question(question):
+            answer, cached = self.answer_question_with_cache_info(
+                question, session_id, use_extractive, use_full_context,
+                max_new_tokens, temperature, top_k, top_p
+            )
+            if answer:
+                yield {'token': answer}
+            yield {'answer': answer, 'cached': cached}
+            return
+
+        settings = self._answer_settings(use_extractive, use_full_context, max_new_tokens, temperature, top_k, top_p)
+        generation = None
+        if self.answer_cache is not None:
+            generation = self.answer_cache.generation()
+            answer = self.answer_cache.get(session_id, question, settings)
+            if answer is not None:
+                yield {'token': answer}
+                yield {'answer': answer, 'cached': True}
+                return
+
+        # Same context as answer_questions builds for the generative path
+        if use_full_context:
+            context = self.get_all_chunks(session_id)
+        else:
+            relevant_chunks_with_scores = self.get_relevant_chunks(question, session_id, top_k=10)
+            if relevant_chunks_with_scores:
+                context = " ".join(chunk for chunk, score in relevant_chunks_with_scores[:5])
+            else:
+                context = None
+
+        if not context:
+            logger.error("Failed to retrieve context for streamed answer")
+            yield {'answer': None, 'cached': False}
+            return
+
+        pieces = []
+        prompt = self._create_prompt(context, question)
+        for text in self._generate_answer_stream(
+            prompt,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_k=top_k,
+            top_p=top_p
+        ):
+            pieces.append(text)
+            yield {'token': text}
+
+        answer = self._clean_answer("".join(pieces)) if pieces else None
+        if answer and self.answer_cache is not None:
+            self.answer_cache.put(session_id, question, settings, answer, generation)
+        yield {'answer': answer, 'cached': False}
+
+    def answer_questions(
+        self,
+        questions: List[str],
+        session_id: str,
+        use_extractive: bool = True,
+        use_full_context: bool = True,
+        max_new_tokens: int = 150,
+        temperature: float = 0.7,
+        top_k: int = 50,
+        top_p: float = 0.92
+    ) -> List[Optional[str]]:
+        """
+        Answer several questions about one document.
+
+        Session data is loaded once, all questions are embedded in one batch
+        and searched with one FAISS call, and the advanced QA model (if
+        enabled) runs on batched inputs. Generated answers are still produced
+        one question at a time.
+
+        Args:
+            questions: User questions
+            session_id: Session identifier
+            use_extractive: If True, return relevant chunks directly (more accurate)
+            use_full_context: If True, use full document for QA (better accuracy)
+            max_new_tokens: Maximum tokens to generate (if use_extractive=False)
+            temperature: Sampling temperature
+            top_k: Top-k sampling parameter
+            top_p: Top-p (nucleus) sampling parameter
+
+        Returns:
+            Answers in question order; None for questions that failed
+        """
+        return self._answer_questions_cached(
+            questions, session_id, use_extractive, use_full_context,
+            max_new_tokens, temperature, top_k, top_p
+        )[0]
+
+    def _answer_settings(
+        self,
+        use_extractive: bool,
+        use_full_context: bool,
+        max_new_tokens: int,
+        temperature: float,
+        top_k: int,
+        top_p: float
+    ) -> Tuple:
+        """Everything besides the question and document that shapes an answer (the answer cache key)."""
+        qa_model = self.qa_model_name if self.use_advanced_qa and self.qa_pipeline else None
+        settings = (use_extractive, use_full_context, self.embedder_model_name, qa_model)
+        if qa_model:
+            settings += (self.advanced_qa_scope, self.advanced_qa_top_k)
+        if not use_full_context or (qa_model and self.advanced_qa_scope == 'chunks'):
+            settings += (self.retrieval_mode, self.fusion, self.bm25_weight)
+        if not use_extractive:
+            settings += (self.generator_model_name, max_new_tokens, temperature, top_k, top_p)
+        return settings
+
+    def _answer_questions_cached(
+        self,
+        questions: List[str],
+        session_id: str,
+        use_extractive: bool,
+        use_full_context: bool,
+        max_new_tokens: int,
+        temperature: float,
+        top_k: int,
+        top_p: float
+    ) -> Tuple[List[Optional[str]], List[bool]]:
+        """
+        Answer questions through the answer cache; only misses are answered.
+
+        Returns:
+            Tuple of (answers in question order, whether each came from the cache)
+        """
+        args = (use_extractive, use_full_context, max_new_tokens, temperature, top_k, top_p)
+        if self.answer_cache is None:
+            return self._answer_questions(questions, session_id, *args), [False] * len(questions)
+
+        settings = self._answer_settings(*args)
+        generation = self.answer_cache.generation()
+
+        answers = [self.answer_cache.get(session_id, question, settings) for question in questions]
+        cached = [answer is not None for answer in answers]
+
+        missing = [i for i, hit in enumerate(cached) if not hit]
+        if missing:
+            fresh = self._answer_questions([questions[i] for i in missing], session_id, *args)
+            for i, answer in zip(missing, fresh):
+                answers[i] = answer
+                if answer:
+                    self.answer_cache.put(session_id, questions[i], settings, answer, generation)
+
+        return answers, cached
+
+    def _answer_questions(
+        self,
+        questions: List[str],
+        session_id: str,
+        use_extractive: bool,
+        use_full_context: bool,
+        max_new_tokens: int,
+        temperature: float,
+        top_k: int,
+        top_p: float
+    ) -> List[Optional[str]]:
+        """Answer questions without the answer cache (see answer_questions)."""
+        answers = [None] * len(questions)
+
         try:
-            # Check if this is a conversational/greeting question
-            if self._is_conversational_question(question):
-                return self._handle_conversational_question(question)
+            # Conversational/greeting questions are answered without the document
+            pending = []
+            for i, question in enumerate(questions):
+                if self._is_conversational_question(question):
+                    answers[i] = self._handle_conversational_question(question)
+                else:
+                    pending.append(i)
+
+            if not pending:
+                return answers
 
             # Get context - either full document or top chunks
-            if use_full_context:
-                full_text = self.get_all_chunks(session_id)
-                if not full_text:
-                    logger.error("Failed to retrieve full document")
-                    return None
-                context_text = full_text
-                relevant_chunks_list = [full_text]  # Treat as single chunk for QA
-            else:
-                # Get relevant chunks with scores
-                relevant_chunks_with_scores = self.get_relevant_chunks(question, session_id, top_k=10)
+            sentence_index = None
+            entities = None
+            chunk_lists = {}
+            contexts = {}
 
-                if not relevant_chunks_with_scores:
+            if not use_full_context:
+                # Get relevant chunks with scores
+                retrieved = self.get_relevant_chunks_batch(
+                    [questions[i] for i in pending], session_id, top_k=10
+                )
+                if retrieved is None:
                     logger.error("Failed to retrieve relevant chunks")
-                    return None
+                    return answers
+
+                for i, relevant_chunks_with_scores in zip(pending, retrieved):
+                    if not relevant_chunks_with_scores:
+                        logger.error("Failed to retrieve relevant chunks")
+                        continue
+                    # Extract just the chunks (remove scores)
+                    chunk_lists[i] = [chunk for chunk, score in relevant_chunks_with_scores]
 
-                # Extract just the chunks (remove scores)
-                relevant_chunks_list = [chunk for chunk, score in relevant_chunks_with_scores]
-                context_text = " ".join(relevant_chunks_list[:5])
+                pending = [i for i in pending if i in chunk_lists]
+                contexts = {i: " ".join(chunk_lists[i][:5]) for i in pending}
 
             # Use extractive approach (return actual text from PDF)
             if use_extractive:
                 # Try advanced QA model first if available
-                if self.use_advanced_qa and self.qa_pipeline:
-                    answer = self._answer_with_advanced_qa(context_text, question, use_full_context)
-                    if answer:
-                        return answer
+                if self.use_advanced_qa and self.qa_pipeline and pending:
+                    if self.advanced_qa_scope == 'chunks':
+                        # Reads retrieved chunks only, so the document is not joined here
+                        qa_pending = pending
+                        qa_answers = self._answer_with_advanced_qa_chunks(
+                            self._advanced_qa_chunks(pending, questions, session_id, chunk_lists, use_full_context),
+                            [questions[i] for i in pending]
+                        )
+                    else:
+                        qa_pending = pending
+                        if use_full_context:
+                            # Each question reads its best sentences of the document,
+                            # picked through the sentence index
+                            sentence_index = self._load_sentence_index(session_id)
+                            if sentence_index is None:
+                                logger.error("Failed to load sentence index")
+                                qa_pending = []
+                            for i in qa_pending:
+                                contexts[i] = self._document_context(
+                                    session_id, questions[i], FULL_CONTEXT_QA_LENGTH, sentence_index
+                                )
+                            qa_pending = [i for i in qa_pending if contexts.get(i)]
+                        qa_answers = self._answer_with_advanced_qa(
+                            [contexts[i] for i in qa_pending], [questions[i] for i in qa_pending],
+                            use_full_context
+                        ) if qa_pending else []
+                    for i, answer in zip(qa_pending, qa_answers):
+                        answers[i] = answer
 
                 # Fall back to extractive approach
-                answer = self._format_extractive_answer(relevant_chunks_list, question, use_full_context)
-                return answer
+                fallback = [i for i in pending if not answers[i]]
+                if use_full_context and fallback:
+                    # Invoice-style questions are looked up in the entity table
+                    # without reading the document
+                    entities = self._load_entities(session_id)
+                    if entities is not None:
+                        for i in fallback:
+                            specific_answer = self._extract_specific_info_from_entities(entities, questions[i].lower())
+                            if specific_answer:
+                                answers[i] = self._preserve_list_formatting(specific_answer)
+                        fallback = [i for i in fallback if not answers[i]]
+
+                if use_full_context and fallback:
+                    # Precomputed sentences of the document, so only keyword matches
+                    # get scored and the full text is never joined
+                    if sentence_index is None:
+                        sentence_index = self._load_sentence_index(session_id)
+                    if sentence_index is None:
+                        logger.error("Failed to load sentence index")
+                        fallback = []
+                    head = self._document_head(session_id, EXTRACTIVE_FALLBACK_LENGTH) if fallback else None
+                    if not head:
+                        fallback = []
+                    for i in fallback:
+                        chunk_lists[i] = [head]
+                for i in fallback:
+                    answers[i] = self._format_extractive_answer(
+                        chunk_lists[i], questions[i], use_full_context, sentence_index, entities
+                    )
 
             # Use generative approach (GPT-2 generation)
             else:
-                # Create prompt
-                prompt = self._create_prompt(context_text, question)
-
-                # Generate answer
-                answer = self._generate_answer(
-                    prompt,
-                    max_new_tokens=max_new_tokens,
-                    temperature=temperature,
-                    top_k=top_k,
-                    top_p=top_p
-                )
+                if use_full_context:
+                    # The model is prompted with the whole document
+                    full_text = self.get_all_chunks(session_id)
+                    if not full_text:
+                        logger.error("Failed to retrieve full document")
+                        pending = []
+                    for i in pending:
+                        contexts[i] = full_text
+                for i in pending:
+                    prompt = self._create_prompt(contexts[i], questions[i])
+                    answers[i] = self._generate_answer(
+                        prompt,
+                        max_new_tokens=max_new_tokens,
+                        temperature=temperature,
+                        top_k=top_k,
+                        top_p=top_p
+                    )
 
-                return answer
+            return answers
 
         except Exception as e:
             logger.error(f"Error generating answer: {str(e)}")
-            return None
+            return answers
 
     def _is_conversational_question(self, question: str) -> bool:
         """
@@ -434,47 +1323,150 @@ class QAEngine:
         # Default response for other conversational inputs
         return "I'm here to help you understand your PDF document. Please ask me a specific question about the document content."
 
-    def _answer_with_advanced_qa(self, context: str, question: str, use_full_context: bool = False) -> Optional[str]:
+    def _answer_with_advanced_qa(
+        self,
+        contexts: List[str],
+        questions: List[str],
+        use_full_context: bool = False
+    ) -> List[Optional[str]]:
         """
-        Use advanced QA model (DistilBERT/RoBERTa) to answer the question.
+        Use advanced QA model (DistilBERT/RoBERTa) to answer questions in one batch.
 
         Args:
-            context: Text context (can be full document or chunks)
-            question: The user's question
+            contexts: Text context of each question (see _document_context for
+                the full document, or chunks)
+            questions: The user's questions
             use_full_context: Whether using full document context
 
         Returns:
-            Answer from the QA model or None
+            Answer from the QA model for each question, None where it is not confident
         """
         try:
             # Truncate if too long (BERT models have max length limits)
-            max_context_length = 8000 if use_full_context else 4000
-            if len(context) > max_context_length:
+            max_context_length = FULL_CONTEXT_QA_LENGTH if use_full_context else 4000
+            contexts = [
                 # Smart truncation: try to keep relevant parts
-                context = self._smart_truncate(context, question, max_context_length)
+                self._smart_truncate(context, question, max_context_length)
+                if len(context) > max_context_length else context
+                for context, question in zip(contexts, questions)
+            ]
+
+            # Use the QA pipeline (a single input returns a dict instead of a list)
+            results = self.qa_pipeline(question=questions, context=contexts, batch_size=QA_BATCH_SIZE)
+            if isinstance(results, dict):
+                results = [results]
+
+            return [self._format_advanced_qa_answer(context, result) for context, result in zip(contexts, results)]
+
+        except Exception as e:
+            logger.error(f"Error with advanced QA model: {str(e)}")
+            return [None] * len(questions)
 
-            # Use the QA pipeline
-            result = self.qa_pipeline(question=question, context=context)
+    def _advanced_qa_chunks(
+        self,
+        pending: List[int],
+        questions: List[str],
+        session_id: str,
+        chunk_lists: Dict[int, List[str]],
+        use_full_context: bool
+    ) -> List[List[str]]:
+        """
+        Get the chunks the advanced QA model reads for each pending question.
 
-            # Check confidence score
-            if result['score'] > 0.05:  # Lower threshold for full context
-                answer = result['answer']
-                score = result['score']
+        Args:
+            pending: Indexes of the questions to answer
+            questions: All questions
+            session_id: Session identifier
+            chunk_lists: Retrieved chunks per question (the full document when use_full_context)
+            use_full_context: Whether chunk_lists holds the full document instead of retrieved chunks
 
-                # Get surrounding context for the answer
-                answer_context = self._get_context_around_match(context, answer, 200)
+        Returns:
+            Top advanced_qa_top_k chunks of each pending question, best first
+        """
+        if not use_full_context:
+            return [chunk_lists[i][:self.advanced_qa_top_k] for i in pending]
 
-                # Add confidence indicator
-                confidence = "High" if score > 0.5 else "Medium" if score > 0.3 else "Low"
+        retrieved = self.get_relevant_chunks_batch(
+            [questions[i] for i in pending], session_id, top_k=self.advanced_qa_top_k
+        )
+        if retrieved is None:
+            return [[] for _ in pending]
+        return [[chunk for chunk, score in hits[:self.advanced_qa_top_k]] for hits in retrieved]
 
-                return f"{answer}\n\nContext: {answer_context}\n\n[Confidence: {confidence} ({score:.2f})]"
+    def _answer_with_advanced_qa_chunks(
+        self,
+        chunk_lists: List[List[str]],
+        questions: List[str]
+    ) -> List[Optional[str]]:
+        """
+        Run the advanced QA model over each question's retrieved chunks and keep the best span.
 
-            return None
+        Every (question, chunk) pair goes through the model in one padded batch,
+        so the work is bounded by advanced_qa_top_k chunks per question however
+        long the document is.
+
+        Args:
+            chunk_lists: Retrieved chunks of each question
+            questions: The user's questions
+
+        Returns:
+            Highest-scoring answer across each question's chunks, None where it is not confident
+        """
+        try:
+            pairs = [(i, chunk) for i, chunks in enumerate(chunk_lists) for chunk in chunks]
+            if not pairs:
+                return [None] * len(questions)
+
+            # A single input returns a dict instead of a list
+            results = self.qa_pipeline(
+                question=[questions[i] for i, _ in pairs],
+                context=[chunk for _, chunk in pairs],
+                batch_size=max(QA_BATCH_SIZE, self.advanced_qa_top_k)
+            )
+            if isinstance(results, dict):
+                results = [results]
+
+            best = {}
+            for (i, chunk), result in zip(pairs, results):
+                if i not in best or result['score'] > best[i][1]['score']:
+                    best[i] = (chunk, result)
+
+            logger.info(f"Advanced QA read {len(pairs)} chunks for {len(questions)} questions")
+            return [
+                self._format_advanced_qa_answer(*best[i]) if i in best else None
+                for i in range(len(questions))
+            ]
 
         except Exception as e:
             logger.error(f"Error with advanced QA model: {str(e)}")
+            return [None] * len(questions)
+
+    def _format_advanced_qa_answer(self, context: str, result: Dict[str, Any]) -> Optional[str]:
+        """
+        Format a QA pipeline result with its surrounding context and confidence.
+
+        Args:
+            context: Text the answer was extracted from
+            result: QA pipeline output with 'answer' and 'score'
+
+        Returns:
+            Formatted answer, or None if the model is not confident
+        """
+        # Check confidence score
+        if result['score'] <= 0.05:  # Lower threshold for full context
             return None
 
+        answer = result['answer']
+        score = result['score']
+
+        # Get surrounding context for the answer
+        answer_context = self._get_context_around_match(context, answer, 200)
+
+        # Add confidence indicator
+        confidence = "High" if score > 0.5 else "Medium" if score > 0.3 else "Low"
+
+        return f"{answer}\n\nContext: {answer_context}\n\n[Confidence: {confidence} ({score:.2f})]"
+
     def _preserve_list_formatting(self, text: str) -> str:
         """
         Preserve and enhance list formatting in text.
@@ -504,14 +1496,24 @@ class QAEngine:
 
         return text.strip()
 
-    def _smart_truncate(self, text: str, question: str, max_length: int) -> str:
+    def _smart_truncate(
+        self,
+        text: str,
+        question: str,
+        max_length: int,
+        sentence_index: Optional[SentenceIndex] = None
+    ) -> str:
         """
         Smart truncation that tries to keep text relevant to the question.
 
         Args:
-            text: Text to truncate
+            text: Text to truncate; with a sentence index, only its first
+                max_length + 1 characters are needed
             question: User's question
             max_length: Maximum character length
+            sentence_index: Precomputed sentences of the text; only sentences
+                with a question keyword are scored, and the rest are read in
+                document order only while they still fit
 
         Returns:
             Truncated text
@@ -531,6 +1533,9 @@ class QAEngine:
         question_words.discard('is')
         question_words.discard('are')
 
+        if sentence_index is not None:
+            return self._smart_truncate_indexed(text, question_words, max_length, sentence_index)
+
         # Split into sentences
         sentences = re.split(r'(?<=[.!?])\s+', text)
 
@@ -560,14 +1565,72 @@ class QAEngine:
 
         return " ".join(result)
 
-    def _format_extractive_answer(self, chunks: List[str], question: str, use_full_context: bool = False) -> str:
+    def _smart_truncate_indexed(
+        self,
+        text: str,
+        question_words: set,
+        max_length: int,
+        sentence_index: SentenceIndex
+    ) -> str:
+        """
+        _smart_truncate over a sentence index; returns the same result.
+
+        Sentences without a keyword score 0 and keep document order after the
+        scored ones, so they are read lazily and only until one does not fit.
+        """
+        candidate_ids = sentence_index.candidates(question_words)
+
+        scored_sentences = []
+        for sentence_id in candidate_ids:
+            sent = sentence_index[int(sentence_id)]
+            sent_lower = sent.lower()
+            score = sum(1 for word in question_words if word in sent_lower)
+            scored_sentences.append((score, sent))
+
+        # Sort by score (descending)
+        scored_sentences.sort(key=lambda x: x[0], reverse=True)
+
+        candidates = set(candidate_ids.tolist())
+        unscored = (
+            sentence_index[sentence_id] for sentence_id in range(len(sentence_index))
+            if sentence_id not in candidates
+        )
+
+        # Take top sentences until we hit max_length
+        result = []
+        current_length = 0
+        for sent in chain((sent for _, sent in scored_sentences), unscored):
+            if current_length + len(sent) <= max_length:
+                result.append(sent)
+                current_length += len(sent)
+            else:
+                break
+
+        # If we got nothing, just take first max_length characters
+        if not result:
+            return text[:max_length]
+
+        return " ".join(result)
+
+    def _format_extractive_answer(
+        self,
+        chunks: List[str],
+        question: str,
+        use_full_context: bool = False,
+        sentence_index: Optional[SentenceIndex] = None,
+        entities: Optional[EntityTable] = None
+    ) -> str:
         """
         Format relevant chunks as an extractive answer.
 
         Args:
-            chunks: List of relevant text chunks or full document
+            chunks: List of relevant text chunks or full document; with a
+                sentence index just the start of the document (see
+                _extract_relevant_section)
             question: The user's question
             use_full_context: Whether using full document context
+            sentence_index: Sentence index of the full document (full context only)
+            entities: Entity table of the full document (full context only)
 
         Returns:
             Formatted answer from the chunks
@@ -579,12 +1642,18 @@ class QAEngine:
             full_text = chunks[0] if len(chunks) == 1 else " ".join(chunks)
 
             # Check if question is asking for specific information
-            specific_answer = self._extract_specific_info_from_text(full_text, question_lower)
+            if entities is not None:
+                specific_answer = self._extract_specific_info_from_entities(entities, question_lower)
+            elif sentence_index is None:
+                specific_answer = self._extract_specific_info_from_text(full_text, question_lower)
+            else:
+                # full_text is only the start of the document
+                specific_answer = None
             if specific_answer:
                 return self._preserve_list_formatting(specific_answer)
 
             # Use smart extraction based on question keywords
-            answer = self._extract_relevant_section(full_text, question_lower)
+            answer = self._extract_relevant_section(full_text, question_lower, sentence_index)
             return self._preserve_list_formatting(answer)
 
         # Original chunked approach for backward compatibility
@@ -617,13 +1686,21 @@ class QAEngine:
 
         return answer.strip()
 
-    def _extract_relevant_section(self, text: str, question_lower: str) -> str:
+    def _extract_relevant_section(
+        self,
+        text: str,
+        question_lower: str,
+        sentence_index: Optional[SentenceIndex] = None
+    ) -> str:
         """
         Extract the most relevant section from full text based on question.
 
         Args:
-            text: Full document text
+            text: Full document text; with a sentence index only its first
+                EXTRACTIVE_FALLBACK_LENGTH characters are read
             question_lower: Lowercase question
+            sentence_index: Precomputed sentences of the text; when given only
+                sentences containing a keyword are scored
 
         Returns:
             Most relevant section (concise)
@@ -649,8 +1726,12 @@ class QAEngine:
         if not keywords or len(keywords) < 2:
             return "Please ask a specific question about the document content (e.g., 'What is the total amount?', 'When is the date?', 'Who is the vendor?')."
 
-        # Split into sentences for more precise extraction
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        # Split into sentences for more precise extraction; with an index, every
+        # sentence that could score above zero, in document order
+        if sentence_index is not None:
+            sentences = (sentence_index[int(i)] for i in sentence_index.candidates(keywords))
+        else:
+            sentences = re.split(r'(?<=[.!?])\s+', text)
 
         # Score each sentence
         scored_sentences = []
@@ -688,7 +1769,7 @@ class QAEngine:
             return answer.strip()
 
         # Fallback: return beginning of document
-        return text[:500].strip() + "..."
+        return text[:EXTRACTIVE_FALLBACK_LENGTH].strip() + "..."
 
     def _extract_specific_info_from_text(self, text: str, question_lower: str) -> Optional[str]:
         """
@@ -736,6 +1817,42 @@ class QAEngine:
 
         return None
 
+    def _extract_specific_info_from_entities(self, entities: EntityTable, question_lower: str) -> Optional[str]:
+        """
+        Answer the same questions as _extract_specific_info_from_text by
+        looking them up in the session's entity table.
+
+        Args:
+            entities: Entity table of the full document
+            question_lower: Lowercase question
+
+        Returns:
+            Specific answer if found, None otherwise
+        """
+        # Amount/price/total questions
+        if any(word in question_lower for word in ['amount', 'total', 'price', 'cost', 'payment', 'bill', 'pay']):
+            if entities.amounts:
+                # Amounts are stored largest first (likely the total)
+                max_amount = entities.amounts[0]
+                significant_amounts = [amt for amt in entities.amounts if amt[0] > 100][:5]
+                amounts_str = ", ".join([amt[1] for amt in significant_amounts])
+
+                return f"Total/Main Amount: {max_amount[1]}\n\nAll amounts found: {amounts_str}\n\nContext: {entities.contexts['amount']}"
+
+        # Date questions
+        if any(word in question_lower for word in ['date', 'when']):
+            if entities.dates:
+                dates = [date for date, _ in entities.dates[:5]]
+                return f"Dates found: {', '.join(dates)}\n\nContext: {entities.contexts['date']}"
+
+        # Name/company questions
+        if any(word in question_lower for word in ['name', 'company', 'who', 'vendor', 'seller', 'buyer', 'customer']):
+            if entities.names:
+                names = [name for name, _ in entities.names[:10]]
+                return f"Names/Companies found: {', '.join(names)}\n\nContext: {entities.contexts['head']}"
+
+        return None
+
     def _extract_specific_info(self, chunks: List[str], question_lower: str) -> Optional[str]:
         """
         Extract specific information like amounts, dates, names based on question type.
@@ -778,68 +1895,21 @@ class QAEngine:
 
     def _extract_amounts(self, text: str) -> List[Tuple[float, str]]:
         """Extract monetary amounts from text."""
-        # Patterns for amounts: ₹123.45, $123.45, 123.45, Rs. 123, etc.
-        patterns = [
-            r'(?:₹|Rs\.?|INR)\s*(\d+(?:,\d+)*(?:\.\d+)?)',  # ₹1,234.56
-            r'(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:₹|Rs\.?|INR)',  # 1,234.56 ₹
-            r'\$\s*(\d+(?:,\d+)*(?:\.\d+)?)',                # $1,234.56
-            r'(?:Total|Amount|Grand Total|Net)[:\s]+(?:₹|Rs\.?)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-        ]
-
-        amounts = []
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                amount_str = match.group(1) if match.lastindex else match.group(0)
-                # Remove commas and convert to float
-                try:
-                    amount_clean = amount_str.replace(',', '')
-                    amount_val = float(amount_clean)
-                    amounts.append((amount_val, match.group(0)))
-                except ValueError:
-                    continue
-
-        return sorted(amounts, key=lambda x: x[0], reverse=True)
+        return [(value, match) for value, match, _ in find_amounts(text)]
 
     def _extract_dates(self, text: str) -> List[str]:
         """Extract dates from text."""
-        # Common date patterns
-        patterns = [
-            r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',           # 12/31/2023, 12-31-23
-            r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',             # 2023-12-31
-            r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}',  # 31 Dec 2023
-        ]
-
-        dates = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            dates.extend(matches)
-
+        dates = [date for date, _ in find_dates(text)]
         return list(set(dates))[:5]  # Return unique dates
 
     def _extract_names(self, text: str) -> List[str]:
         """Extract potential names/companies (capitalized words)."""
-        # Find sequences of capitalized words (likely names/companies)
-        pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Pvt\.?|Ltd\.?|Inc\.?|Corp\.?|Limited))?\b'
-        matches = re.findall(pattern, text)
-
-        # Filter out common words
-        common_words = {'The', 'This', 'That', 'With', 'From', 'To', 'For', 'And', 'Or', 'But'}
-        names = [m for m in matches if m not in common_words]
-
+        names = [name for name, _ in find_names(text)]
         return list(set(names))[:10]  # Return unique names
 
     def _get_context_around_match(self, text: str, match: str, context_chars: int = 150) -> str:
         """Get text context around a match."""
-        pos = text.find(match)
-        if pos == -1:
-            return text[:context_chars]
-
-        start = max(0, pos - context_chars)
-        end = min(len(text), pos + len(match) + context_chars)
-
-        context = text[start:end].strip()
-        return context
+        return context_around(text, match, context_chars)
 
     def _create_prompt(self, context: str, question: str) -> str:
         """Create a prompt for the language model."""
@@ -860,6 +1930,65 @@ class QAEngine:
         )
         return prompt
 
+    def _generation_kwargs(
+        self,
+        prompt,  # Can be str or list (for GPT-OSS)
+        max_new_tokens: int,
+        temperature: float,
+        top_k: int,
+        top_p: float
+    ) -> Dict[str, Any]:
+        """
+        Tokenize a prompt and build the model.generate arguments for it.
+
+        Args:
+            prompt: Input prompt (str for regular models, list for GPT-OSS)
+            max_new_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            top_k: Top-k sampling
+            top_p: Top-p sampling
+
+        Returns:
+            Keyword arguments for model.generate
+        """
+        # Handle GPT-OSS chat format
+        if self.is_gpt_oss and isinstance(prompt, list):
+            # Apply chat template for GPT-OSS
+            prompt = self.tokenizer.apply_chat_template(
+                prompt,
+                tokenize=False,
+                add_generation_prompt=True
+            )
+
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            truncation=True,
+            max_length=512,
+            padding=True
+        )
+
+        kwargs = {
+            'input_ids': inputs["input_ids"].to(self.device),
+            'attention_mask': inputs["attention_mask"].to(self.device),
+            'max_new_tokens': max_new_tokens,
+            'do_sample': True,
+            'temperature': temperature,
+            'top_k': top_k,
+            'top_p': top_p,
+            'early_stopping': True
+        }
+
+        if not self.is_seq2seq:
+            # Causal LM models (GPT-2, OPT, Llama, etc.)
+            kwargs.update(
+                eos_token_id=self.tokenizer.eos_token_id,
+                pad_token_id=self.tokenizer.pad_token_id,
+                no_repeat_ngram_size=3
+            )
+
+        return kwargs
+
     def _generate_answer(
         self,
         prompt,  # Can be str or list (for GPT-OSS)
@@ -882,68 +2011,18 @@ class QAEngine:
             Generated text or None if error
         """
         try:
-            # Handle GPT-OSS chat format
-            if self.is_gpt_oss and isinstance(prompt, list):
-                # Apply chat template for GPT-OSS
-                prompt_text = self.tokenizer.apply_chat_template(
-                    prompt,
-                    tokenize=False,
-                    add_generation_prompt=True
-                )
-                inputs = self.tokenizer(
-                    prompt_text,
-                    return_tensors="pt",
-                    truncation=True,
-                    max_length=512,
-                    padding=True
-                )
-            else:
-                # Standard tokenization for other models
-                inputs = self.tokenizer(
-                    prompt,
-                    return_tensors="pt",
-                    truncation=True,
-                    max_length=512,
-                    padding=True
-                )
-
-            input_ids = inputs["input_ids"].to(self.device)
-            attention_mask = inputs["attention_mask"].to(self.device)
+            kwargs = self._generation_kwargs(prompt, max_new_tokens, temperature, top_k, top_p)
 
-            # Generate based on model type
             with torch.no_grad():
-                if self.is_seq2seq:
-                    # T5/FLAN-T5 models generate directly without prompt in output
-                    output_ids = self.model.generate(
-                        input_ids,
-                        attention_mask=attention_mask,
-                        max_new_tokens=max_new_tokens,
-                        do_sample=True,
-                        temperature=temperature,
-                        top_k=top_k,
-                        top_p=top_p,
-                        early_stopping=True
-                    )
-                    # For seq2seq, decode the entire output
-                    answer = self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
-                else:
-                    # Causal LM models (GPT-2, OPT, Llama, etc.)
-                    output_ids = self.model.generate(
-                        input_ids,
-                        attention_mask=attention_mask,
-                        max_new_tokens=max_new_tokens,
-                        do_sample=True,
-                        temperature=temperature,
-                        top_k=top_k,
-                        top_p=top_p,
-                        eos_token_id=self.tokenizer.eos_token_id,
-                        pad_token_id=self.tokenizer.pad_token_id,
-                        no_repeat_ngram_size=3,
-                        early_stopping=True
-                    )
-                    # For causal LM, decode only the generated tokens
-                    generated_tokens = output_ids[0][input_ids.shape[-1]:]
-                    answer = self.tokenizer.decode(generated_tokens, skip_special_tokens=True)
+                output_ids = self.model.generate(**kwargs)
+
+            if self.is_seq2seq:
+                # T5/FLAN-T5 models generate directly without prompt in output
+                answer = self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
+            else:
+                # For causal LM, decode only the generated tokens
+                generated_tokens = output_ids[0][kwargs['input_ids'].shape[-1]:]
+                answer = self.tokenizer.decode(generated_tokens, skip_special_tokens=True)
 
             # Clean up the answer
             answer = self._clean_answer(answer)
@@ -954,6 +2033,68 @@ class QAEngine:
             logger.error(f"Error in text generation: {str(e)}")
             return None
 
+    def _generate_answer_stream(
+        self,
+        prompt,  # Can be str or list (for GPT-OSS)
+        max_new_tokens: int = 150,
+        temperature: float = 0.7,
+        top_k: int = 50,
+        top_p: float = 0.92
+    ) -> Iterator[str]:
+        """
+        Generate an answer, yielding text as tokens are produced.
+
+        model.generate runs in a background thread and feeds a
+        TextIteratorStreamer, so the first text arrives after the prompt's
+        forward pass instead of after all max_new_tokens. Closing the
+        generator early (e.g. the client disconnected) stops generation at
+        the next token.
+
+        Args:
+            prompt: Input prompt (str for regular models, list for GPT-OSS)
+            max_new_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            top_k: Top-k sampling
+            top_p: Top-p sampling
+
+        Yields:
+            Decoded text pieces (uncleaned; join them and pass to _clean_answer)
+        """
+        try:
+            kwargs = self._generation_kwargs(prompt, max_new_tokens, temperature, top_k, top_p)
+        except Exception as e:
+            logger.error(f"Error in text generation: {str(e)}")
+            return
+
+        # Seq2seq outputs hold no prompt; causal LM outputs start with it
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=not self.is_seq2seq,
+            skip_special_tokens=True
+        )
+        cancelled = threading.Event()
+        kwargs['streamer'] = streamer
+        kwargs['stopping_criteria'] = StoppingCriteriaList([_CancelCriteria(cancelled)])
+
+        def generate():
+            try:
+                # no_grad is thread-local, so it is entered in the worker thread
+                with torch.no_grad():
+                    self.model.generate(**kwargs)
+            except Exception as e:
+                logger.error(f"Error in text generation: {str(e)}")
+                # Unblock the consumer; the streamer never ended on its own
+                streamer.end()
+
+        thread = threading.Thread(target=generate, daemon=True)
+        thread.start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            cancelled.set()
+
     def _clean_answer(self, answer: str) -> str:
         """Clean up the generated answer."""
         # Remove extra whitespace
@@ -985,14 +2126,24 @@ class QAEngine:
             True if successful, False otherwise
         """
         try:
-            chunks_path = self.data_dir / f"{session_id}_chunks.pkl"
-            index_path = self.data_dir / f"{session_id}_index.faiss"
-
-            if chunks_path.exists():
-                chunks_path.unlink()
+            self.session_cache.invalidate(session_id)
+            if self.answer_cache is not None:
+                self.answer_cache.invalidate(session_id)
+
+            session_files = [
+                self.data_dir / f"{session_id}_chunks.bin",
+                self.data_dir / f"{session_id}_index.faiss",
+                self.data_dir / f"{session_id}_index.json",
+                self.data_dir / f"{session_id}_provenance.npz",
+                self.data_dir / f"{session_id}_sentences.bin",
+                self.data_dir / f"{session_id}_sentence_index.npz",
+                self.data_dir / f"{session_id}_entities.json",
+                self.data_dir / f"{session_id}_bm25.npz",
+            ]
 
-            if index_path.exists():
-                index_path.unlink()
+            for path in session_files:
+                if path.exists():
+                    path.unlink()
 
             logger.info(f"Cleaned up session {session_id}")
             return True
@@ -0,0 +1,101 @@
+"""
+Dynamic Quantization
+Int8 dynamic quantization of a model's linear layers for CPU inference.
+Weights are stored as int8 and activations are quantized on the fly, which
+cuts the memory of the linear layers by about 4x and speeds up the matrix
+multiplications that dominate transformer inference on CPU.
+"""
+
+import logging
+from typing import Any, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ('none', 'int8')
+
+# Preferred quantized kernels, best first (x86/fbgemm on Intel/AMD, qnnpack on ARM)
+QUANTIZED_ENGINES = ('x86', 'fbgemm', 'qnnpack')
+
+
+def _select_engine():
+    """Use the best quantized kernel backend this torch build supports."""
+    supported = torch.backends.quantized.supported_engines
+    for engine in QUANTIZED_ENGINES:
+        if engine in supported:
+            if torch.backends.quantized.engine != engine:
+                torch.backends.quantized.engine = engine
+            return
+
+
+def _conv1d_to_linear(model: Any) -> int:
+    """
+    Replace transformers Conv1D layers with equivalent nn.Linear layers.
+
+    GPT-2 style models implement their projections as Conv1D (a linear layer
+    with a transposed weight), which dynamic quantization does not recognize.
+
+    Returns:
+        Number of layers replaced
+    """
+    try:
+        from transformers.pytorch_utils import Conv1D
+    except ImportError:
+        return 0
+
+    replaced = 0
+    for parent in list(model.modules()):
+        for child_name, child in list(parent.named_children()):
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(parent, child_name, linear)
+                replaced += 1
+    return replaced
+
+
+def quantize_model(model: Any, mode: str, device: torch.device, label: str = "model") -> Tuple[Any, bool]:
+    """
+    Quantize the linear layers of a model in place.
+
+    Conv1D projections (GPT-2 family) are first turned into linear layers so
+    they are quantized too.
+
+    Quantized kernels only run on CPU, so on other devices, with mode
+    'none', or if quantization fails, the model is returned unchanged.
+
+    Args:
+        model: torch.nn.Module (e.g. a SentenceTransformer or transformers model)
+        mode: 'none' or 'int8'
+        device: Device the model runs on
+        label: Name used in log messages
+
+    Returns:
+        Tuple of (model, True if its linear layers are now int8)
+    """
+    if mode == 'none':
+        return model, False
+
+    if mode not in QUANTIZATION_MODES:
+        logger.warning(f"Unknown quantization mode '{mode}', keeping {label} in fp32")
+        return model, False
+
+    if device.type != 'cpu':
+        logger.warning(f"Int8 dynamic quantization needs CPU, keeping {label} in fp32 on {device}")
+        return model, False
+
+    try:
+        _select_engine()
+        _conv1d_to_linear(model)
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+        logger.info(f"Quantized {label} linear layers to int8")
+        return model, True
+
+    except Exception as e:
+        logger.warning(f"Could not quantize {label}, keeping fp32: {str(e)}")
+        return model, False
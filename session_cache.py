@@ -0,0 +1,168 @@
+"""
+Session Cache
+In-memory LRU cache of per-session resources (FAISS indexes, chunk stores,
+provenance tables) so repeated questions on the same document do not reload
+them from disk. Entries are evicted by a total byte budget and by idle time.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCache:
+    """
+    Byte-budgeted LRU cache keyed by (session_id, resource name).
+
+    Evicted and invalidated entries are simply dropped, so a resource still in
+    use by another request stays valid until that request releases it; memory
+    maps are closed by the garbage collector once the last reader is done. A
+    load that started before its session was invalidated is returned to its
+    caller but not cached. A single epoch counter covers every session, so
+    an invalidation also keeps loads of other sessions that are in flight at
+    that moment out of the cache; they are simply loaded again next time.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, ttl: Optional[float] = 1800):
+        """
+        Initialize session cache.
+
+        Args:
+            max_bytes: Total size budget of cached resources
+            ttl: Seconds an entry may sit unused before it is evicted (None = no limit)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries = OrderedDict()  # (session_id, name) -> [value, nbytes, last_used]
+        self._bytes = 0
+        self._epoch = 0  # number of invalidations so far, across all sessions
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, session_id: str, name: str, loader: Callable[[], Tuple[Any, int]]) -> Any:
+        """
+        Get a session resource, loading it on a miss.
+
+        Args:
+            session_id: Session identifier
+            name: Resource name (e.g. 'index', 'chunks')
+            loader: Called on a miss; returns (value, size_in_bytes). A None
+                value is returned to the caller but not cached.
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        key = (session_id, name)
+        now = time.monotonic()
+
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = now
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            epoch = self._epoch
+
+        # Load outside the lock so a slow load does not block other sessions
+        value, nbytes = loader()
+        if value is None:
+            return None
+
+        with self._lock:
+            if self._epoch != epoch:
+                # Files may have been replaced or deleted while loading
+                return value
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Another request loaded it first; keep that copy
+                return entry[0]
+
+            if nbytes > self.max_bytes:
+                logger.warning(f"Session resource {name} ({nbytes} bytes) exceeds the cache budget, not cached")
+                return value
+
+            self._entries[key] = [value, nbytes, now]
+            self._bytes += nbytes
+            self._evict_to_budget()
+
+        return value
+
+    def invalidate(self, session_id: str):
+        """
+        Drop every cached resource of a session.
+
+        Resources are not closed here, since requests that already hold them
+        may still be reading.
+
+        Args:
+            session_id: Session identifier
+        """
+        with self._lock:
+            self._epoch += 1
+            keys = [key for key in self._entries if key[0] == session_id]
+            for key in keys:
+                self._pop(key)
+
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached resources for session {session_id}")
+
+    def clear(self):
+        """Drop every cached resource."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+    def _pop(self, key: Tuple[str, str]) -> list:
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+        return entry
+
+    def _expire(self, now: float):
+        """Evict entries idle for longer than ttl (caller holds the lock)."""
+        if self.ttl is None:
+            return
+
+        # Entries are in LRU order, so idle ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if now - entry[2] <= self.ttl:
+                break
+            self._pop(key)
+            self.evictions += 1
+
+    def _evict_to_budget(self):
+        """Evict least recently used entries until within max_bytes (caller holds the lock)."""
+        while self._bytes > self.max_bytes and self._entries:
+            self._pop(next(iter(self._entries)))
+            self.evictions += 1
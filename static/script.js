@@ -277,7 +277,7 @@ async function checkHealth() {
         const data = await response.json();
 
         if (!data.models_loaded) {
-            showStatus('Warning: AI models are still loading. Please wait...', 'error');
+            showStatus('Warning: some AI models failed to load. Check the server logs.', 'error');
         }
     } catch (error) {
         console.error('Health check failed:', error);
@@ -0,0 +1,209 @@
+"""
+Sentence Text Index
+Per-session sentence table plus a keyword -> sentence inverted index, built
+once at indexing time so extractive answers only score the sentences that
+contain a query keyword instead of re-splitting the whole document for every
+question.
+
+Files (next to the FAISS index):
+    {session_id}_sentences.bin       sentences in chunk store format
+    {session_id}_sentence_index.npz  vocabulary + CSR postings (sentence ids)
+"""
+
+import logging
+import re
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional, Union
+import numpy as np
+
+from chunk_store import ChunkStore, ChunkStoreWriter
+
+logger = logging.getLogger(__name__)
+
+# Same sentence split the extractive answer code applies to the full document text
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+TERM_PATTERN = re.compile(r'\w+')
+
+
+class SentenceIndexWriter:
+    """
+    Streams chunks into a sentence table and builds its inverted index.
+
+    Sentences are exactly SENTENCE_SPLIT.split(" ".join(chunks)), computed
+    without building the joined text: only the trailing partial sentence of
+    each chunk is carried over to the next one.
+    """
+
+    def __init__(self, sentences_path: Union[str, Path], index_path: Union[str, Path]):
+        """
+        Open a sentence index for writing.
+
+        Args:
+            sentences_path: Destination of the sentence store
+            index_path: Destination of the postings archive (.npz)
+        """
+        self.index_path = Path(index_path)
+        self._store = ChunkStoreWriter(sentences_path)
+        self._postings = {}  # term -> array of sentence ids
+        self._carry = None
+
+    def add_chunk(self, chunk: str):
+        """
+        Add the next chunk of the document.
+
+        Args:
+            chunk: Chunk text
+        """
+        text = chunk if self._carry is None else self._carry + ' ' + chunk
+        starts = [0] + [match.end() for match in SENTENCE_SPLIT.finditer(text)]
+
+        # A text ending in a separator may continue it with the next chunk's
+        # leading whitespace, so the last full sentence is carried along with it
+        keep = 2 if len(starts) > 1 and starts[-1] == len(text) else 1
+        pieces = SENTENCE_SPLIT.split(text[:starts[-keep]]) if len(starts) > keep else []
+        for sentence in pieces[:-1]:
+            self._add_sentence(sentence)
+        self._carry = text[starts[-keep]:]
+
+    def _add_sentence(self, sentence: str):
+        sentence_id = self._store.append(sentence)
+        for term in set(TERM_PATTERN.findall(sentence.lower())):
+            ids = self._postings.get(term)
+            if ids is None:
+                ids = self._postings[term] = array('I')
+            ids.append(sentence_id)
+
+    def close(self):
+        """Write the postings and publish both files."""
+        if self._carry is not None:
+            for sentence in SENTENCE_SPLIT.split(self._carry):
+                self._add_sentence(sentence)
+            self._carry = None
+
+        terms = sorted(self._postings)
+        counts = np.array([len(self._postings[term]) for term in terms], dtype=np.int64)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        ids = np.empty(int(offsets[-1]), dtype=np.uint32)
+        for i, term in enumerate(terms):
+            ids[offsets[i]:offsets[i + 1]] = np.frombuffer(self._postings[term], dtype=np.uint32)
+
+        # Terms never contain newlines (\w+), so the vocabulary is one newline-joined blob
+        vocabulary = np.frombuffer('\n'.join(terms).encode('utf-8'), dtype=np.uint8)
+
+        with open(self.index_path, 'wb') as f:
+            np.savez(f, vocabulary=vocabulary, offsets=offsets, ids=ids)
+
+        num_sentences = len(self._store)
+        self._store.close()
+        self._postings = {}
+        logger.info(f"Built sentence index: {num_sentences} sentences, {len(terms)} terms")
+
+    def abort(self):
+        """Discard the partially written index."""
+        self._store.abort()
+        self._postings = {}
+
+    def __enter__(self) -> 'SentenceIndexWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SentenceIndex:
+    """Read-only sentence table with keyword lookup."""
+
+    def __init__(self, sentences: ChunkStore, vocabulary: str, offsets: np.ndarray, ids: np.ndarray):
+        """
+        Initialize sentence index.
+
+        Args:
+            sentences: Sentence store
+            vocabulary: Newline-joined sorted terms
+            offsets: Postings offsets per term (len(terms) + 1)
+            ids: Concatenated sentence-id postings
+        """
+        self.sentences = sentences
+        self.offsets = offsets
+        self.ids = ids
+
+        # One blob plus term start offsets lets substring lookups run as a
+        # single C-level search over the vocabulary
+        self._vocabulary = '\n' + vocabulary + '\n'
+        starts = [0] + [match.end() for match in re.finditer('\n', vocabulary)]
+        self._term_starts = np.array(starts, dtype=np.int64) + 1
+
+        self.nbytes = (
+            sentences.nbytes + offsets.nbytes + ids.nbytes
+            + len(self._vocabulary) * 2 + self._term_starts.nbytes
+        )
+
+    @classmethod
+    def load(cls, sentences_path: Union[str, Path], index_path: Union[str, Path]) -> Optional['SentenceIndex']:
+        """
+        Load an index written by SentenceIndexWriter.
+
+        Args:
+            sentences_path: Path to the sentence store
+            index_path: Path to the postings archive
+
+        Returns:
+            SentenceIndex instance or None if missing/unreadable
+        """
+        try:
+            if not Path(index_path).exists():
+                return None
+
+            sentences = ChunkStore.open(sentences_path)
+            if sentences is None:
+                return None
+
+            with np.load(index_path, allow_pickle=False) as data:
+                vocabulary = data['vocabulary'].tobytes().decode('utf-8')
+                return cls(sentences, vocabulary, data['offsets'], data['ids'])
+
+        except Exception as e:
+            logger.error(f"Error loading sentence index: {str(e)}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.sentences)
+
+    def __getitem__(self, sentence_id: int) -> str:
+        return self.sentences[sentence_id]
+
+    def candidates(self, keywords: Iterable[str]) -> np.ndarray:
+        """
+        Find sentences containing any keyword.
+
+        Matches have the same meaning as `keyword in sentence.lower()`: a
+        keyword consists of word characters only, so it can only occur inside
+        a single term, and every term containing it is looked up.
+
+        Args:
+            keywords: Lowercase keywords
+
+        Returns:
+            Sorted array of sentence ids
+        """
+        positions = []
+        for keyword in keywords:
+            if keyword and '\n' not in keyword:
+                positions.extend(match.start() for match in re.finditer(re.escape(keyword), self._vocabulary))
+
+        if not positions:
+            return np.empty(0, dtype=np.int64)
+
+        term_ids = np.unique(np.searchsorted(self._term_starts, positions, side='right') - 1)
+        postings = [self.ids[self.offsets[t]:self.offsets[t + 1]] for t in term_ids]
+        return np.unique(np.concatenate(postings)).astype(np.int64)
+
+    def close(self):
+        """Unmap the sentence store."""
+        self.sentences.close()
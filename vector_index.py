@@ -0,0 +1,252 @@
+"""
+Vector Index Factory
+Picks the FAISS index type for a corpus from its size and the configured
+latency and memory targets:
+
+    flat   exact inner-product scan; used while a scan is fast enough
+    hnsw   graph index; fast approximate search, full vectors kept in memory
+    ivfpq  inverted lists of product-quantized codes; smallest footprint,
+           for corpora whose vectors would not fit the memory budget
+
+The chosen type and its parameters are saved next to the index as JSON
+({index}.json) so loaders and reports know how it was built.
+"""
+
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('flat', 'hnsw', 'ivfpq')
+
+# Rough single-core throughput of an exact scan, used to estimate its latency
+FLAT_SCAN_BYTES_PER_MS = 4 * 1024 * 1024
+
+# HNSW graph parameters
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+HNSW_EF_SEARCH = 64
+
+# IVF-PQ needs enough vectors to train 256 codewords per subquantizer; the PQ
+# codebooks are trained on this many points however large the corpus, since
+# their training dominates build time and more points do not improve recall
+IVFPQ_MIN_VECTORS = 10000
+IVFPQ_NBITS = 8
+# Coarse quantizer training sample per inverted list (the k-means minimum)
+IVF_TRAINING_POINTS_PER_LIST = 39
+
+
+def estimate_memory(index_type: str, num_vectors: int, dimension: int) -> int:
+    """
+    Estimate the memory footprint of an index in bytes.
+
+    Args:
+        index_type: 'flat', 'hnsw' or 'ivfpq'
+        num_vectors: Number of vectors
+        dimension: Vector dimension
+
+    Returns:
+        Estimated size in bytes
+    """
+    if index_type == 'hnsw':
+        # Full vectors plus 2*M neighbor ids on the base layer
+        return num_vectors * (dimension * 4 + HNSW_M * 2 * 4)
+    if index_type == 'ivfpq':
+        params = _ivfpq_params(num_vectors, dimension)
+        # Codes and ids per vector, plus coarse centroids and PQ codebooks
+        return (
+            num_vectors * (params['m'] + 8)
+            + params['nlist'] * dimension * 4
+            + (1 << IVFPQ_NBITS) * dimension * 4
+        )
+    return num_vectors * dimension * 4
+
+
+def _pq_subquantizers(dimension: int) -> Optional[int]:
+    """Number of PQ subquantizers: a divisor of dimension giving ~4 dims each."""
+    # 4 dims per one-byte code: coarser codes (8 dims) cost far more recall
+    # than the bytes they save, see benchmark_ann_index.py
+    for dims_per_code in (4, 6, 8, 3, 2, 12, 16):
+        if dimension % dims_per_code == 0:
+            return dimension // dims_per_code
+    return None
+
+
+def _ivfpq_params(num_vectors: int, dimension: int) -> Dict[str, Any]:
+    """IVF-PQ parameters for a corpus size."""
+    nlist = int(4 * math.sqrt(num_vectors))
+    nlist = max(16, min(nlist, num_vectors // 39))
+    return {
+        'type': 'ivfpq',
+        'nlist': nlist,
+        'm': _pq_subquantizers(dimension),
+        'nbits': IVFPQ_NBITS,
+        'nprobe': min(nlist, max(16, nlist // 16)),
+    }
+
+
+def choose_index(
+    num_vectors: int,
+    dimension: int,
+    index_type: str = 'auto',
+    latency_target_ms: float = 20.0,
+    memory_budget_mb: float = 1024.0
+) -> Dict[str, Any]:
+    """
+    Choose an index type and its parameters.
+
+    Flat is kept while its estimated scan time is within latency_target_ms and
+    its vectors fit memory_budget_mb. Otherwise HNSW is used if it fits the
+    budget, and IVF-PQ when it does not (and the corpus is large enough to
+    train it).
+
+    Args:
+        num_vectors: Number of vectors to index
+        dimension: Vector dimension
+        index_type: 'auto', or force 'flat', 'hnsw' or 'ivfpq'
+        latency_target_ms: Target per-query search latency
+        memory_budget_mb: Memory the index may use
+
+    Returns:
+        Index parameters dictionary with at least a 'type' key
+    """
+    if index_type not in ('auto',) + INDEX_TYPES:
+        logger.warning(f"Unknown index type '{index_type}', choosing automatically")
+        index_type = 'auto'
+
+    budget = memory_budget_mb * 1024 * 1024
+    ivfpq_possible = num_vectors >= IVFPQ_MIN_VECTORS and _pq_subquantizers(dimension) is not None
+
+    if index_type == 'auto':
+        flat_bytes = estimate_memory('flat', num_vectors, dimension)
+        if flat_bytes / FLAT_SCAN_BYTES_PER_MS <= latency_target_ms and flat_bytes <= budget:
+            index_type = 'flat'
+        elif estimate_memory('hnsw', num_vectors, dimension) <= budget or not ivfpq_possible:
+            index_type = 'hnsw'
+        else:
+            index_type = 'ivfpq'
+    elif index_type == 'ivfpq' and not ivfpq_possible:
+        logger.warning(f"IVF-PQ needs at least {IVFPQ_MIN_VECTORS} vectors, using HNSW for {num_vectors}")
+        index_type = 'hnsw'
+
+    if index_type == 'hnsw':
+        params = {'type': 'hnsw', 'm': HNSW_M, 'ef_construction': HNSW_EF_CONSTRUCTION, 'ef_search': HNSW_EF_SEARCH}
+    elif index_type == 'ivfpq':
+        params = _ivfpq_params(num_vectors, dimension)
+    else:
+        params = {'type': 'flat'}
+
+    params['num_vectors'] = num_vectors
+    params['dimension'] = dimension
+    params['estimated_bytes'] = estimate_memory(params['type'], num_vectors, dimension)
+    return params
+
+
+def build_index(vectors: np.ndarray, params: Dict[str, Any]) -> faiss.Index:
+    """
+    Build an inner-product index of the chosen type.
+
+    Args:
+        vectors: Normalized float32 vectors, one per row
+        params: Parameters from choose_index
+
+    Returns:
+        FAISS index containing all vectors
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dimension = vectors.shape[1]
+
+    if params['type'] == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, params['m'], faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = params['ef_construction']
+    elif params['type'] == 'ivfpq':
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFPQ(
+            quantizer, dimension, params['nlist'], params['m'], params['nbits'], faiss.METRIC_INNER_PRODUCT
+        )
+        # Train the coarse centroids and the PQ codebooks on fixed random samples
+        num_train = min(len(vectors), max(params['nlist'] * IVF_TRAINING_POINTS_PER_LIST, IVFPQ_MIN_VECTORS))
+        sample = vectors[np.random.default_rng(0).permutation(len(vectors))[:num_train]]
+
+        kmeans = faiss.Kmeans(dimension, params['nlist'], niter=20, spherical=True, seed=0)
+        kmeans.train(sample)
+        quantizer.add(kmeans.centroids)
+        # With a filled quantizer, train() only fits the PQ codebooks on residuals
+        index.train(sample[:IVFPQ_MIN_VECTORS])
+    else:
+        index = faiss.IndexFlatIP(dimension)
+
+    index.add(vectors)
+    _apply_search_params(index, params)
+    return index
+
+
+def _apply_search_params(index: faiss.Index, params: Dict[str, Any]):
+    """Set search-time parameters (efSearch, nprobe) on an index."""
+    if params.get('type') == 'hnsw':
+        index.hnsw.efSearch = params['ef_search']
+    elif params.get('type') == 'ivfpq':
+        index.nprobe = params['nprobe']
+
+
+def _metadata_path(index_path: Path) -> Path:
+    return index_path.with_suffix('.json')
+
+
+def save_index(index: faiss.Index, index_path: Union[str, Path], params: Dict[str, Any]):
+    """
+    Write an index and its parameters ({index_path stem}.json).
+
+    Args:
+        index: FAISS index
+        index_path: Output path of the index
+        params: Parameters from choose_index
+    """
+    index_path = Path(index_path)
+    faiss.write_index(index, str(index_path))
+    with open(_metadata_path(index_path), 'w') as f:
+        json.dump(params, f)
+
+
+def load_index(index_path: Union[str, Path]) -> Optional[faiss.Index]:
+    """
+    Read an index written by save_index (or a bare faiss.write_index).
+
+    Args:
+        index_path: Path of the index
+
+    Returns:
+        FAISS index or None if missing
+    """
+    index_path = Path(index_path)
+    if not index_path.exists():
+        return None
+
+    index = faiss.read_index(str(index_path))
+    params = load_index_metadata(index_path)
+    if params:
+        _apply_search_params(index, params)
+    return index
+
+
+def load_index_metadata(index_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+    """
+    Read the parameters saved with an index.
+
+    Args:
+        index_path: Path of the index
+
+    Returns:
+        Parameters dictionary or None if the index predates index selection
+    """
+    metadata_path = _metadata_path(Path(index_path))
+    if not metadata_path.exists():
+        return None
+
+    with open(metadata_path, 'r') as f:
+        return json.load(f)
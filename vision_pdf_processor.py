@@ -13,6 +13,8 @@ from PIL import Image
 import fitz  # PyMuPDF for better image handling
 from tqdm import tqdm
 
+from page_ranges import PageSelection, select_pages
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,18 +45,39 @@ class VisionPDFProcessor:
         self.extract_text = extract_text
         self.batch_size = batch_size
 
-    def process_pdf(self, pdf_path: str, output_dir: str) -> Dict[str, Any]:
+    def page_count(self, pdf_path: str) -> Optional[int]:
+        """
+        Count the pages of a PDF.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Number of pages, or None if the PDF cannot be opened
+        """
+        try:
+            with fitz.open(str(pdf_path)) as doc:
+                return len(doc)
+        except Exception as e:
+            logger.error(f"Error opening PDF: {str(e)}")
+            return None
+
+    def process_pdf(self, pdf_path: str, output_dir: str, pages: PageSelection = None) -> Dict[str, Any]:
         """
-        Process entire PDF: convert pages to images, extract text and embedded images.
+        Process PDF: convert pages to images, extract text and embedded images.
 
         Args:
             pdf_path: Path to PDF file
             output_dir: Directory to save outputs
+            pages: Pages to process, e.g. "1-20, 35" or a list of 1-based page
+                numbers (see page_ranges); every page if None. Other pages are
+                neither rendered nor extracted.
 
         Returns:
             Dictionary containing:
                 - page_images: List of paths to rendered page images
                 - page_text: List of extracted text per page
+                - page_numbers: 1-based page number of each processed page
                 - embedded_images: List of extracted images with metadata
                 - metadata: PDF metadata
         """
@@ -70,15 +93,18 @@ class VisionPDFProcessor:
             # Open PDF with PyMuPDF
             doc = fitz.open(str(pdf_path))
             total_pages = len(doc)
+            page_numbers = select_pages(pages, total_pages)
 
-            logger.info(f"Processing PDF with {total_pages} pages...")
+            logger.info(f"Processing {len(page_numbers)} of {total_pages} PDF pages...")
 
             result = {
                 'page_images': [],
                 'page_text': [],
+                'page_numbers': page_numbers,
                 'embedded_images': [],
                 'metadata': {
                     'total_pages': total_pages,
+                    'processed_pages': len(page_numbers),
                     'title': doc.metadata.get('title', ''),
                     'author': doc.metadata.get('author', ''),
                     'producer': doc.metadata.get('producer', ''),
@@ -86,7 +112,7 @@ class VisionPDFProcessor:
             }
 
             # Process pages with progress bar
-            for page_num in tqdm(range(total_pages), desc="Processing PDF pages"):
+            for page_num in tqdm([number - 1 for number in page_numbers], desc="Processing PDF pages"):
                 page = doc[page_num]
 
                 # Convert page to image
@@ -113,7 +139,7 @@ class VisionPDFProcessor:
 
             doc.close()
 
-            logger.info(f"Successfully processed {total_pages} pages")
+            logger.info(f"Successfully processed {len(page_numbers)} pages")
             logger.info(f"Extracted {len(result['page_images'])} page images")
             logger.info(f"Extracted {len(result['embedded_images'])} embedded images")
 
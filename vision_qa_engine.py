@@ -14,6 +14,8 @@ from PIL import Image
 import chromadb
 from chromadb.config import Settings
 
+from embedding_cache import EmbeddingCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +30,8 @@ class VisionQAEngine:
         ollama_url: str = "http://localhost:11434",
         model_name: str = "llama3.2-vision:11b",
         chroma_persist_dir: str = "chroma_db",
-        use_colpali: bool = True
+        use_colpali: bool = True,
+        query_cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize Vision QA Engine.
@@ -38,6 +41,8 @@ class VisionQAEngine:
             model_name: Llama vision model name in Ollama
             chroma_persist_dir: Directory for ChromaDB persistence
             use_colpali: Use ColPali for visual retrieval
+            query_cache: EmbeddingCache for ColPali query embeddings, e.g. shared
+                with a QAEngine (a private one is created if None)
         """
         self.ollama_url = ollama_url
         self.model_name = model_name
@@ -55,7 +60,7 @@ class VisionQAEngine:
         if use_colpali:
             try:
                 from colpali_retriever import ColPaliRetriever
-                self.colpali = ColPaliRetriever()
+                self.colpali = ColPaliRetriever(query_cache=query_cache)
                 logger.info("ColPali retriever initialized")
             except Exception as e:
                 logger.warning(f"Failed to initialize ColPali: {str(e)}")
@@ -98,7 +103,8 @@ class VisionQAEngine:
         session_id: str,
         page_images: List[str],
         page_texts: List[Dict[str, Any]],
-        metadata: Dict[str, Any]
+        metadata: Dict[str, Any],
+        page_numbers: Optional[List[int]] = None
     ) -> bool:
         """
         Create ChromaDB collection with page data.
@@ -108,6 +114,8 @@ class VisionQAEngine:
             page_images: List of page image paths
             page_texts: List of page text data
             metadata: PDF metadata
+            page_numbers: 1-based page number of each entry when only part of
+                the PDF was processed (defaults to 1..N)
 
         Returns:
             True if successful
@@ -133,7 +141,7 @@ class VisionQAEngine:
             ids = []
 
             for i, (img_path, text_data) in enumerate(zip(page_images, page_texts)):
-                page_num = i + 1
+                page_num = page_numbers[i] if page_numbers else i + 1
 
                 # Combine text and image path
                 doc_text = text_data.get('text', '')
@@ -163,7 +171,7 @@ class VisionQAEngine:
 
             # Create ColPali index if enabled
             if self.colpali:
-                self.colpali.create_index(page_images, session_id)
+                self.colpali.create_index(page_images, session_id, page_numbers=page_numbers)
 
             return True
 